@@ -0,0 +1,100 @@
+#! /usr/bin/env python3
+"""Measure "ssl_config" import time and command line startup time
+
+Exit with an error if modules that should be lazily loaded are imported by a
+plain "import ssl_config".
+"""
+from json import dumps
+from os.path import dirname, realpath
+from statistics import median
+from subprocess import run, PIPE
+import sys
+
+#: Repository root
+ROOT = dirname(dirname(realpath(__file__)))
+
+#: Modules that must not be imported by "import ssl_config"
+LAZY_MODULES = (
+    'pybars', 'json', 'hashlib', 'datetime', 'ssl_config._helpers',
+    'ssl_config._versions', 'ssl_config._batch')
+
+
+def import_time():
+    """
+    Measure import time with "python -X importtime".
+
+    Returns:
+        tuple: "ssl_config" cumulative import time in microseconds,
+            list of imported modules.
+    """
+    result = run([sys.executable, '-X', 'importtime', '-c',
+                  'import ssl_config'], stderr=PIPE, universal_newlines=True,
+                 cwd=ROOT, check=True)
+    modules = dict()
+    for line in result.stderr.splitlines():
+        # Lines format:
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split(':', 1)[1].split('|')
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:
+            # Header line
+            continue
+    return modules['ssl_config'], list(modules)
+
+
+def help_time():
+    """
+    Measure "ssl-config --help" wall time.
+
+    Returns:
+        float: Time in seconds.
+    """
+    result = run([sys.executable, '-c', (
+        'from time import perf_counter;'
+        'start = perf_counter();'
+        'import sys;'
+        'sys.argv = ["ssl-config", "--help"];'
+        'from ssl_config.__main__ import _run_command\n'
+        'try:\n'
+        '    _run_command()\n'
+        'except SystemExit:\n'
+        '    pass\n'
+        'print(perf_counter() - start, file=sys.stderr)')],
+        stdout=PIPE, stderr=PIPE, universal_newlines=True, cwd=ROOT,
+        check=True)
+    return float(result.stderr.strip().splitlines()[-1])
+
+
+def main(repeat=10):
+    """
+    Run measurements and print results as JSON.
+
+    Args:
+        repeat (int): Number of measurements.
+
+    Returns:
+        int: Exit code.
+    """
+    import_times = []
+    modules = []
+    for _ in range(repeat):
+        duration, modules = import_time()
+        import_times.append(duration / 1e6)
+
+    loaded = sorted(
+        name for name in modules
+        if any(name == lazy or name.startswith(lazy + '.')
+               for lazy in LAZY_MODULES))
+
+    print(dumps(dict(
+        import_ssl_config=median(import_times),
+        cli_help=median(help_time() for _ in range(repeat)),
+        unexpected_imports=loaded), indent=2))
+    return 1 if loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
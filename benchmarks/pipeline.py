@@ -0,0 +1,198 @@
+#! /usr/bin/env python3
+"""Benchmark configuration generation pipeline stages
+
+Runs offline, using data of the local "ssl_config" package. Results are
+printed as JSON, and can be saved as baseline or compared to a baseline.
+Exit with status 1 if a stage is slower than the baseline, over tolerance.
+
+run "./benchmarks/pipeline.py --help" for help.
+"""
+from argparse import ArgumentParser
+from json import dump, dumps, load
+from math import inf
+from os.path import dirname, join, realpath
+from time import perf_counter
+import sys
+
+#: Repository root
+ROOT = dirname(dirname(realpath(__file__)))
+sys.path.insert(0, ROOT)
+
+from importtime import import_time  # noqa: E402
+
+#: Default baseline file
+BASELINE = join(dirname(realpath(__file__)), 'baseline.json')
+
+
+def measure(func, setup=None, number=100, repeat=5):
+    """
+    Measure a function execution time.
+
+    Args:
+        func (function): Function to measure.
+        setup (function): Function called before each "func" call, not
+            measured.
+        number (int): Number of calls per measurement.
+        repeat (int): Number of measurements.
+
+    Returns:
+        float: Best mean time per call, in seconds.
+    """
+    best = inf
+    for _ in range(repeat):
+        total = 0.0
+        for _ in range(number):
+            if setup is not None:
+                setup()
+            start = perf_counter()
+            func()
+            total += perf_counter() - start
+        best = min(best, total / number)
+    return best
+
+
+def run_benchmarks(number=100, repeat=5):
+    """
+    Run all benchmarks.
+
+    Args:
+        number (int): Number of calls per measurement.
+        repeat (int): Number of measurements.
+
+    Returns:
+        dict: Time per call in seconds, by stage name.
+    """
+    import ssl_config
+    from ssl_config import (
+        CONFIGS, SERVERS, UnsupportedConfiguration, clear_cache, generate)
+    from ssl_config._configs import parse
+    from ssl_config._helpers import HELPERS
+    from ssl_config._renderer import compile_template
+    from ssl_config._versions import Version, _parse
+
+    server = 'nginx' if 'nginx' in SERVERS else SERVERS[0]
+    source = ssl_config._get_template_source(server)
+    with open(join(ssl_config._DATA_DIR, 'configs.js'), 'rt') as js_file:
+        configs_js = js_file.read()
+    template = compile_template(source)
+    state = ssl_config._get_state(server, date='2019-01-01')
+
+    def matrix():
+        """Generate all configurations"""
+        for matrix_server in SERVERS:
+            for config in CONFIGS:
+                try:
+                    generate(matrix_server, config, date='2019-01-01')
+                except UnsupportedConfiguration:
+                    continue
+
+    results = dict(
+        import_ssl_config=min(
+            import_time()[0] for _ in range(repeat)) / 1e6,
+        get_configs_cold=measure(
+            ssl_config._get_configs, clear_cache, number, repeat),
+        get_configs_warm=measure(
+            ssl_config._get_configs, None, number, repeat),
+        parse_configs_js=measure(
+            lambda: parse(configs_js), None, number, repeat),
+        get_state=measure(
+            lambda: ssl_config._get_state(server, date='2019-01-01'),
+            None, number, repeat),
+        template_compile=measure(
+            lambda: compile_template(source), None, number, repeat),
+        get_template_cold=measure(
+            lambda: ssl_config._get_template(server), clear_cache, number,
+            repeat),
+        get_template_warm=measure(
+            lambda: ssl_config._get_template(server), None, number, repeat),
+        template_render=measure(
+            lambda: template(state, helpers=HELPERS), None, number, repeat),
+        version_parse_cold=measure(
+            lambda: Version('1.1.1d'), _parse.cache_clear, number, repeat),
+        version_parse_warm=measure(
+            lambda: Version('1.1.1d'), None, number, repeat),
+        matrix_cold=measure(matrix, clear_cache, max(number // 10, 1), repeat),
+        matrix_warm=measure(matrix, None, number, repeat))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results to baseline.
+
+    Args:
+        results (dict): Results.
+        baseline (dict): Baseline results.
+        tolerance (float): Allowed slowdown ratio before considering a stage
+            as regressed.
+
+    Returns:
+        dict: Ratio to baseline and regression status, by stage name.
+    """
+    comparison = dict()
+    for stage, duration in results.items():
+        try:
+            ratio = duration / baseline[stage]
+        except (KeyError, ZeroDivisionError):
+            continue
+        comparison[stage] = dict(
+            ratio=ratio, regression=ratio > 1 + tolerance)
+    return comparison
+
+
+def main():
+    """
+    Command line entry point.
+
+    Returns:
+        int: Exit code, 1 if a regression is detected.
+    """
+    parser = ArgumentParser(
+        description='Benchmark configuration generation pipeline stages.')
+    parser.add_argument(
+        '--number', type=int, default=100,
+        help='Number of calls per measurement.')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='Number of measurements.')
+    parser.add_argument(
+        '--baseline', default=BASELINE,
+        help='Baseline JSON file (Default to "%s").' % BASELINE)
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Save results as baseline.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='Allowed slowdown ratio compared to baseline '
+             '(Default to 0.2, for 20%%).')
+    parser.add_argument(
+        '--output', '-o', help='Output JSON file. Default to standard output.')
+    args = parser.parse_args()
+
+    report = dict(results=run_benchmarks(args.number, args.repeat))
+
+    if args.save_baseline:
+        with open(args.baseline, 'wt') as json_file:
+            dump(report['results'], json_file, indent=2, sort_keys=True)
+    else:
+        try:
+            with open(args.baseline, 'rt') as json_file:
+                baseline = load(json_file)
+        except FileNotFoundError:
+            pass
+        else:
+            report['comparison'] = compare(
+                report['results'], baseline, args.tolerance)
+
+    output = dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'wt') as json_file:
+            json_file.write(output)
+    else:
+        print(output)
+
+    return 1 if any(stage['regression'] for stage in report.get(
+        'comparison', dict()).values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#! /usr/bin/env python3
+"""Benchmark multi-threaded configuration generation throughput
+
+Runs offline, using data of the local "ssl_config" package. Threads call
+"ssl_config.generate" concurrently, like a web backend thread pool. On
+free-threaded CPython (3.13+, "python3.13t"), throughput scales with the
+number of threads up to the number of CPU. With the GIL, it does not.
+
+Results are printed as JSON: Calls per second and speedup compared to a single
+thread, by number of threads.
+
+run "./benchmarks/threads.py --help" for help.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps
+from os import cpu_count
+from os.path import dirname, realpath
+from threading import Barrier
+from time import perf_counter
+import sys
+
+#: Repository root
+ROOT = dirname(dirname(realpath(__file__)))
+sys.path.insert(0, ROOT)
+
+#: Benchmark modes: "cached" generates configurations already in renders
+#: caches, "uncached" generates configurations with a different date on each
+#: call, to render templates each time
+MODES = ('cached', 'uncached')
+
+
+def requests():
+    """
+    Get generation arguments of all supported configurations.
+
+    Returns:
+        list of tuple: "ssl_config.generate" arguments.
+    """
+    from ssl_config import CONFIGS, SERVERS, UnsupportedConfiguration, generate
+
+    supported = []
+    for server in SERVERS:
+        for config in CONFIGS:
+            for hsts in (True, False):
+                try:
+                    generate(server, config, hsts=hsts, date='2019-01-01')
+                except UnsupportedConfiguration:
+                    continue
+                supported.append((server, config, None, None, hsts))
+    return supported
+
+
+def worker(barrier, calls, mode, offset):
+    """
+    Generate configurations.
+
+    Args:
+        barrier (threading.Barrier): Barrier to start all workers together.
+        calls (list of tuple): "ssl_config.generate" arguments.
+        mode (str): Benchmark mode.
+        offset (int): Worker index, used to not share dates between workers.
+    """
+    from ssl_config import generate
+
+    barrier.wait()
+    if mode == 'cached':
+        for args in calls:
+            generate(*args, date='2019-01-01')
+    else:
+        for index, args in enumerate(calls):
+            # Distinct dates defeat renders and states caches
+            generate(*args, date='%04d-01-01' % (
+                1000 + (offset * len(calls) + index) % 9000))
+
+
+def measure(threads, calls, mode, repeat):
+    """
+    Measure generation throughput.
+
+    Args:
+        threads (int): Number of threads.
+        calls (list of tuple): "ssl_config.generate" arguments of each call
+            of each thread.
+        mode (str): Benchmark mode.
+        repeat (int): Number of measurements.
+
+    Returns:
+        float: Best throughput, in calls per second.
+    """
+    best = 0.0
+    with ThreadPoolExecutor(threads) as pool:
+        for _ in range(repeat):
+            # The start time is taken when all workers are ready, before
+            # any of them starts
+            starts = []
+            barrier = Barrier(
+                threads, action=lambda: starts.append(perf_counter()))
+            futures = [pool.submit(worker, barrier, calls, mode, offset)
+                       for offset in range(threads)]
+            for future in futures:
+                future.result()
+            best = max(best, threads * len(calls) / (
+                perf_counter() - starts[0]))
+    return best
+
+
+def run_benchmarks(threads, calls_per_thread, modes, repeat):
+    """
+    Run all benchmarks.
+
+    Args:
+        threads (list of int): Numbers of threads.
+        calls_per_thread (int): Number of "generate" calls per thread.
+        modes (iterable of str): Benchmark modes.
+        repeat (int): Number of measurements.
+
+    Returns:
+        dict: Throughput in calls per second and speedup compared to a single
+            thread, by mode and number of threads.
+    """
+    from ssl_config import warmup
+
+    warmup(freeze=False)
+    supported = requests()
+    calls = [supported[index % len(supported)]
+             for index in range(calls_per_thread)]
+
+    results = dict()
+    for mode in modes:
+        single = measure(1, calls, mode, repeat)
+        results[mode] = dict()
+        for count in threads:
+            throughput = single if count == 1 else measure(
+                count, calls, mode, repeat)
+            results[mode][str(count)] = dict(
+                calls_per_second=throughput, speedup=throughput / single)
+    return results
+
+
+def main():
+    """
+    Command line entry point.
+
+    Returns:
+        int: Exit code.
+    """
+    default_threads = sorted({1, 2, 4, 8, cpu_count() or 1})
+    parser = ArgumentParser(
+        description='Benchmark multi-threaded configuration generation '
+                    'throughput.')
+    parser.add_argument(
+        '--threads', type=int, nargs='+', default=default_threads,
+        help='Numbers of threads to measure (Default to %s).' %
+             ' '.join(str(count) for count in default_threads))
+    parser.add_argument(
+        '--calls', type=int, default=2000,
+        help='Number of "generate" calls per thread.')
+    parser.add_argument(
+        '--mode', choices=MODES, nargs='+', default=list(MODES),
+        help='Benchmark modes (Default to all).')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='Number of measurements.')
+    args = parser.parse_args()
+
+    try:
+        gil = sys._is_gil_enabled()
+    except AttributeError:
+        # Before Python 3.13
+        gil = True
+
+    print(dumps(dict(
+        python=sys.version, gil=gil, cpu_count=cpu_count(),
+        results=run_benchmarks(
+            sorted(set(args.threads) | {1}), args.calls, args.mode,
+            args.repeat)), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@ run "./setup.py --help-commands" for help.
 from datetime import datetime
 from os import chdir
 from os.path import dirname, abspath, join
+import sys
 
 from setuptools import setup, find_packages
 
@@ -26,8 +27,6 @@ PACKAGE_INFO = dict(
         'Topic :: Internet :: WWW/HTTP :: HTTP Servers',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Operating System :: OS Independent'
@@ -40,7 +39,7 @@ PACKAGE_INFO = dict(
         'Download': 'https://pypi.org/project/ssl_config',
     },
     license='MPL-2.0',
-    python_requires='>=3.5',
+    python_requires='>=3.7',
     install_requires=[
         'pybars3>0.9.6',
     ],
@@ -54,12 +53,11 @@ PACKAGE_INFO = dict(
         'ssl-config=ssl_config.__main__:_run_command']})
 
 # Gets package __version__ from package
+# (Computed from data, importing the package does not import dependencies)
 SETUP_DIR = abspath(dirname(__file__))
-with open(join(SETUP_DIR, 'ssl_config', '__init__.py')) as source_file:
-    for line in source_file:
-        if line.rstrip().startswith('__version__'):
-            PACKAGE_INFO['version'] = line.split('=', 1)[1].strip(" \"\'\n")
-            break
+sys.path.insert(0, SETUP_DIR)
+from ssl_config import __version__  # noqa: E402
+PACKAGE_INFO['version'] = __version__
 
 # Gets long description from readme
 with open(join(SETUP_DIR, 'README.md')) as source_file:
@@ -9,87 +9,571 @@ __licence__ = "MPL-2.0"
 __copyright__ = "The SSL configurations are copyright Mozilla\n" \
                 "The Python library is copyright J.Goutin"
 
-from datetime import date as _date
-from json import load as _load, loads as _loads
-from os import listdir as _listdir
+# Only modules already imported by the Python interpreter startup are imported
+# here. Data and other dependencies are loaded on first use to keep the import
+# fast. See "__getattr__" for the lazily loaded public attributes.
+from os import listdir as _listdir, stat as _stat
 from os.path import dirname as _dirname, join as _join, splitext as _splitext
 
-from pybars import Compiler as _Compiler
-from ssl_config._helpers import HELPERS as _HELPERS
-from ssl_config._versions import Version as _Version
+from _thread import allocate_lock as _allocate_lock, RLock as _RLock
+
+from ssl_config._cache import LRUCache as _LRUCache
 
 _DATA_DIR = _join(_dirname(__file__), '_data')
 
-#: Supported server software
-SERVERS = tuple(sorted(
-    _splitext(name)[0] for name in _listdir(_join(_DATA_DIR, 'templates'))))
-
-with open(_join(_DATA_DIR, 'guidelines.json'), 'rt') as json_file:
-    #: Guidelines information as dict
-    GUIDELINES = _load(json_file)
-
-#: Mozilla SSL configuration levels
-#:
-#: Modern:
-#:     Services with clients that support TLS 1.3 and don't need
-#:     backward compatibility.
-#:
-#: Intermediate
-#:     General-purpose servers with a variety of clients, recommended for
-#:     almost all systems.
-#:
-#: Old:
-#:     Compatible with a number of very old clients, and should be used only as
-#:     a last resort.
-CONFIGS = tuple(sorted(GUIDELINES['configurations']))
-
-#: Mozilla SSL guidelines version
-#: https://wiki.mozilla.org/Security/Server_Side_TLS
-GUIDELINES_VERSION = GUIDELINES['version']
-
-#: Python edition major and minor versions match with Mozilla SSL guidelines
-#: version.
-__version__ = '%s.0-beta.1' % GUIDELINES_VERSION
+#: Precompiled data bundle format version
+_BUNDLE_FORMAT = 1
 
+#: Precompiled data bundle, if loaded
+_BUNDLE = dict()
 
-def _get_configs():
+#: Lock serializing data loading and cached data updates. Loaded values are
+#: read without locking
+_DATA_LOCK = _RLock()
+
+#: Timing statistics collection status. See "enable_stats"
+_STATS = dict(enabled=False)
+
+
+class _NoTiming:
+    """
+    Timing context used while statistics are disabled: Does nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+#: Shared timing context used while statistics are disabled
+_NO_TIMING = _NoTiming()
+
+
+def _timing(stage):
+    """
+    Time a stage, if timing statistics are enabled.
+
+    Stages are timed with explicit "with _timing(stage):" blocks. While
+    statistics are disabled, the cost is a flag check.
+
+    Args:
+        stage (str): Stage name. See "stats".
+
+    Returns:
+        context manager: Timing context.
+    """
+    if _STATS['enabled']:
+        from ssl_config._stats import Timing
+        return Timing(stage)
+    return _NO_TIMING
+
+
+def _is_current(bundle):
+    """
+    Check if the precompiled data bundle matches the data files it was built
+    from, if available.
+
+    Files signatures are compared to signatures stored in the bundle. Files
+    are only read and hashed if their signature changed without changing
+    their size, to compare their digest.
+
+    Args:
+        bundle (dict): Bundle.
+
+    Returns:
+        bool: False if a data file was added, removed or modified since the
+            bundle was built.
     """
-    Get supported pieces of software configurations
+    index = bundle['index']
+    digests = index['digests']
+    signatures = index.get('signatures', dict())
+    try:
+        templates = {'templates/' + name for name in _listdir(
+            _join(_DATA_DIR, 'templates')) if name.endswith('.hbs')}
+    except FileNotFoundError:
+        # Only the bundle is available
+        return True
+    if templates != {name for name in digests if name.startswith(
+            'templates/')}:
+        return False
+
+    for name in sorted(templates) + ['guidelines.json', 'configs.js']:
+        path = _join(_DATA_DIR, name)
+        try:
+            signature = _file_signature(path)
+        except FileNotFoundError:
+            continue
+        known_signature = signatures.get(name)
+        if known_signature is not None:
+            if tuple(known_signature) == signature:
+                continue
+            elif known_signature[1] != signature[1]:
+                return False
+
+        from hashlib import sha256
+        with open(path, 'rb') as file:
+            if sha256(file.read()).hexdigest() != digests.get(name):
+                return False
+    return True
+
+
+def _get_bundle():
+    """
+    Get the precompiled data bundle built by "update_config.py".
+
+    The bundle is checked once against data files digests, to never use a
+    bundle that was not rebuilt after data files were updated.
 
     Returns:
-        dict: configurations.
+        dict or None: Bundle, None if not available, not compatible or
+            outdated, in this case data files are used directly.
     """
-    lines = []
-    with open(_join(_DATA_DIR, 'configs.js'), 'rt') as file:
-        for line in file:
-            # Remove comments
-            line = line.split('//')[0].strip()
+    try:
+        return _BUNDLE['value']
+    except KeyError:
+        pass
+
+    with _DATA_LOCK:
+        # Loaded by another thread while waiting for the lock
+        try:
+            return _BUNDLE['value']
+        except KeyError:
+            pass
 
+        from json import loads
+        with _timing('bundle'):
             try:
-                key, value = line.split(':', 1)
-            except ValueError:
-                pass
+                with open(_join(_DATA_DIR, 'bundle.json'), 'rb') as file:
+                    bundle = loads(file.read())
+            except FileNotFoundError:
+                bundle = None
             else:
-                line = '"%s":%s' % (key.strip(), value.strip())
+                if (bundle.get('format') != _BUNDLE_FORMAT or
+                        not _is_current(bundle)):
+                    bundle = None
+
+        _BUNDLE['value'] = bundle
+        return bundle
+
+
+def _load_servers():
+    """
+    Supported server software.
+
+    Returns:
+        tuple of str: Servers names.
+    """
+    bundle = _get_bundle()
+    if bundle is not None:
+        return tuple(bundle['index']['servers'])
+    return tuple(sorted(
+        _splitext(name)[0]
+        for name in _listdir(_join(_DATA_DIR, 'templates'))))
+
+
+def _load_guidelines():
+    """
+    Guidelines information.
+
+    Returns:
+        mapping: Read-only guidelines.
+    """
+    from ssl_config._configs import freeze
+    bundle = _get_bundle()
+    if bundle is not None:
+        return freeze(bundle['guidelines'])
+
+    from json import load
+    with open(_join(_DATA_DIR, 'guidelines.json'), 'rt') as json_file:
+        return freeze(load(json_file))
+
+
+def _load_configs():
+    """
+    Mozilla SSL configuration levels.
+
+    Modern:
+        Services with clients that support TLS 1.3 and don't need
+        backward compatibility.
+
+    Intermediate
+        General-purpose servers with a variety of clients, recommended for
+        almost all systems.
+
+    Old:
+        Compatible with a number of very old clients, and should be used only
+        as a last resort.
+
+    Returns:
+        tuple of str: Configurations names.
+    """
+    return tuple(sorted(_get('GUIDELINES')['configurations']))
+
+
+def _load_guidelines_version():
+    """
+    Mozilla SSL guidelines version.
+    https://wiki.mozilla.org/Security/Server_Side_TLS
+
+    Returns:
+        float: Version.
+    """
+    return _get('GUIDELINES')['version']
+
+
+def _load_version():
+    """
+    Python edition version.
+
+    Major and minor versions match with Mozilla SSL guidelines version.
+
+    Returns:
+        str: Version.
+    """
+    return '%s.0-beta.1' % _get('GUIDELINES_VERSION')
+
+
+def _load_server_configs():
+    """
+    Supported pieces of software configurations (Server name, capabilities,
+    versions supporting TLSv1.3, ...).
+
+    Returns:
+        collections.abc.Mapping: Read-only configurations.
+    """
+    from ssl_config._configs import ServerConfigs
+    return ServerConfigs(_get_configs)
+
+
+def _load_generate_many():
+    """
+    Batch generation function.
+
+    Returns:
+        function: ssl_config._batch.generate_many
+    """
+    from ssl_config._batch import generate_many
+    return generate_many
+
+
+def _load_agenerate():
+    """
+    Asyncio generation function.
+
+    Returns:
+        function: ssl_config._async.agenerate
+    """
+    from ssl_config._async import agenerate
+    return agenerate
+
+
+def _load_agenerate_many():
+    """
+    Asyncio batch generation function.
+
+    Returns:
+        function: ssl_config._async.agenerate_many
+    """
+    from ssl_config._async import agenerate_many
+    return agenerate_many
+
+
+def _load_write_if_changed():
+    """
+    Conditional output file writing function.
+
+    Returns:
+        function: ssl_config._output.write_if_changed
+    """
+    from ssl_config._output import write_if_changed
+    return write_if_changed
+
+
+def _load_export():
+    """
+    Configurations export function.
+
+    Returns:
+        function: ssl_config._export.export
+    """
+    from ssl_config._export import export
+    return export
+
+
+def _load_render_inventory():
+    """
+    Inventory configurations generation function.
+
+    Returns:
+        function: ssl_config._inventory.render_inventory
+    """
+    from ssl_config._inventory import render_inventory
+    return render_inventory
+
+
+def _load_lint():
+    """
+    Server configuration files checking function.
+
+    Returns:
+        function: ssl_config._lint.lint
+    """
+    from ssl_config._lint import lint
+    return lint
+
+
+#: Lazily loaded public attributes loaders
+_LAZY = {
+    'SERVERS': _load_servers,
+    'GUIDELINES': _load_guidelines,
+    'CONFIGS': _load_configs,
+    'GUIDELINES_VERSION': _load_guidelines_version,
+    '__version__': _load_version,
+    'SERVER_CONFIGS': _load_server_configs,
+    'generate_many': _load_generate_many,
+    'agenerate': _load_agenerate,
+    'agenerate_many': _load_agenerate_many,
+    'write_if_changed': _load_write_if_changed,
+    'export': _load_export,
+    'render_inventory': _load_render_inventory,
+    'lint': _load_lint,
+}
+
+
+def _get(name):
+    """
+    Get a lazily loaded attribute, loading it if not already done.
+
+    Args:
+        name (str): Attribute name.
+
+    Returns:
+        object: Attribute value.
+    """
+    namespace = globals()
+    try:
+        return namespace[name]
+    except KeyError:
+        pass
+
+    with _DATA_LOCK:
+        try:
+            return namespace[name]
+        except KeyError:
+            value = namespace[name] = _LAZY[name]()
+            return value
+
+
+def __getattr__(name):
+    """
+    Load lazily loaded attributes on first access.
+
+    Args:
+        name (str): Attribute name.
+
+    Returns:
+        object: Attribute value.
+    """
+    if name not in _LAZY:
+        raise AttributeError(
+            'module %r has no attribute %r' % (__name__, name))
+    return _get(name)
+
 
-            # Filter lines
-            if line and not line.startswith('const '):
-                lines.append(line)
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
-    content = ''.join(lines)
-    for text, rep_text in (
-            # Remove JS variables
-            ('noSupportedVersion', 'null'),
-            ('module.exports = ', ''),
-            # Fix JSON syntax
-            (',}', '}'), ("'", '"'), (';', '')):
-        content = content.replace(text, rep_text)
 
-    return _loads(content)
+#: Compiled templates, by server name and template content digest
+_TEMPLATES = _LRUCache(maxsize=32)
+
+#: Lock serializing templates compilation, to compile each template once. The
+#: Pybars compiler is also not thread-safe
+_COMPILE_LOCK = _allocate_lock()
+
+#: Templates files signatures and cache keys, by server name
+_TEMPLATES_KEYS = dict()
+
+#: Render states, by generation parameters
+_STATES = _LRUCache(maxsize=256)
+
+#: Guidelines index, with configurations it was built from, as a single
+#: "(configs, value)" entry to be replaced atomically
+_INDEX = dict(entry=(None, None))
+
+#: Capabilities table, with configurations it was built from, as a single
+#: "(configs, value)" entry
+_CAPABILITIES = dict(entry=(None, None))
+
+#: Versions breakpoints and thresholds, by template cache key
+_BREAKPOINTS = _LRUCache(maxsize=32)
+
+#: Templates rendered with versions placeholders, by template cache key and
+#: generation parameters with versions equivalence classes
+_RENDERS = _LRUCache(maxsize=256)
+
+#: Placeholders texts replaced by versions in cached renders
+_SERVER_VERSION_PLACEHOLDER = '\x00server_version\x00'
+_OPENSSL_VERSION_PLACEHOLDER = '\x00openssl_version\x00'
+
+#: On-disk renders cache, if enabled
+_DISK_CACHE = dict(value=None)
+
+#: Data fingerprint, with data files signatures it was computed from, as a
+#: single "(signatures, value)" entry
+_FINGERPRINT = dict(entry=(None, None))
+
+#: Missing cache entry marker, for caches that may contain None
+_MISSING = object()
+
+#: Parsed "configs.js" file, with its signature and content digest. The
+#: generation is incremented each time configurations change
+_CONFIGS = dict(signature=None, digest=None, value=None, generation=0)
+
+
+def _file_signature(path):
+    """
+    Get a file signature that changes when the file is modified.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        tuple: Modification time in nanoseconds, size.
+    """
+    stat = _stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_configs():
+    """
+    Get supported pieces of software configurations.
+
+    The "configs.js" file is parsed once, and parsed again only if its content
+    changed. If the precompiled data bundle is available, configurations are
+    directly taken from it.
+
+    Returns:
+        types.MappingProxyType: configurations.
+    """
+    bundle = _get_bundle()
+    if bundle is not None:
+        cfg = _CONFIGS['value']
+        if cfg is None:
+            with _DATA_LOCK:
+                if _CONFIGS['value'] is None:
+                    from ssl_config._configs import freeze
+                    with _timing('configs'):
+                        _CONFIGS['value'] = freeze(bundle['server_configs'])
+                cfg = _CONFIGS['value']
+        return cfg
+
+    path = _join(_DATA_DIR, 'configs.js')
+    signature = _file_signature(path)
+    cfg = _CONFIGS['value']
+    if cfg is not None and signature == _CONFIGS['signature']:
+        return cfg
+
+    with _DATA_LOCK:
+        if signature != _CONFIGS['signature']:
+            from hashlib import sha256
+            from ssl_config._configs import freeze, parse
+            with open(path, 'rb') as file:
+                content = file.read()
+
+            digest = sha256(content).hexdigest()
+            if digest != _CONFIGS['digest']:
+                with _timing('configs'):
+                    _CONFIGS['value'] = freeze(parse(content.decode()))
+                _CONFIGS['digest'] = digest
+                _CONFIGS['generation'] += 1
+                # Cached values computed from previous configurations
+                _STATES.clear()
+                _BREAKPOINTS.clear()
+                _RENDERS.clear()
+            _CONFIGS['signature'] = signature
+
+        return _CONFIGS['value']
+
+
+def _store(cache, key, value, generation):
+    """
+    Cache a value computed from configurations, only if configurations did
+    not change since the computation started.
+
+    Args:
+        cache (ssl_config._cache.LRUCache): Cache.
+        key (hashable): Key.
+        value: Value.
+        generation (int): Configurations generation when the computation
+            started.
+    """
+    if generation != _CONFIGS['generation']:
+        return
+    with _DATA_LOCK:
+        # Not cleared by a configurations change since the check
+        if generation == _CONFIGS['generation']:
+            cache.set(key, value)
+
+
+def _get_index():
+    """
+    Get the guidelines index of ciphers, protocols and DH parameters by
+    server software, configuration level and TLS 1.3 support.
+
+    The index is built once, and built again only if configurations changed.
+
+    Returns:
+        types.MappingProxyType: Index. See "ssl_config._index.build".
+    """
+    cfg = _get_configs()
+    index_cfg, index = _INDEX['entry']
+    if index_cfg is not cfg:
+        with _DATA_LOCK:
+            index_cfg, index = _INDEX['entry']
+            if index_cfg is not cfg:
+                from ssl_config._index import build
+                with _timing('index'):
+                    index = build(_get('GUIDELINES'), cfg, _DATA_DIR)
+                _INDEX['entry'] = cfg, index
+    return index
+
+
+def _today():
+    """
+    Today date.
+
+    Returns:
+        str: Date in ISO format.
+    """
+    # Same as "datetime.date.today().isoformat()", without importing
+    # "datetime"
+    from time import strftime
+    return strftime('%Y-%m-%d')
+
+
+def _link(server_name, server_version, config):
+    """
+    Generator link written in configurations.
+
+    Args:
+        server_name (str): Server display name.
+        server_version (str): Server version.
+        config (str): Configuration name.
+
+    Returns:
+        str: Link.
+    """
+    return ('Mozilla SSL Generator, Python edition %s;'
+            ' %s %s; %s configuration') % (
+        _get('__version__'), server_name, server_version, config.capitalize())
 
 
 def _get_state(server, config='intermediate', server_version=None,
-               openssl_version=None, hsts=True, ocsp=True):
+               openssl_version=None, hsts=True, ocsp=True, date=None):
     """
     Generates variables used to render configuration templates.
 
@@ -100,11 +584,14 @@ def _get_state(server, config='intermediate', server_version=None,
         openssl_version (str): OpenSSL version, latest if not specified.
         hsts (bool): Enable HTTP Strict Transport Security.
         ocsp (bool): Enable OCSP stapling.
+        date (str): Generation date in ISO format, today if not specified.
 
     Returns:
         dict: state
     """
-    ssc = GUIDELINES['configurations'][config]
+    from ssl_config._versions import Version
+
+    ssc = _get('GUIDELINES')['configurations'][config]
 
     cfg = _get_configs()
     server_cfg = cfg[server]
@@ -118,32 +605,19 @@ def _get_state(server, config='intermediate', server_version=None,
     supports_ocsp = server_cfg.get('supportsOcspStapling', True)
 
     # Remove TLS 1.3 if unsupported by software
-    protocols = ssc['tls_versions'].copy()
     tls13_ver = server_cfg.get('tls13')
-    if (not tls13_ver or
-            _Version(server_ver) < _Version(tls13_ver, pre=True) or
-            _Version(openssl_ver) < _Version(openssl_cfg['tls13'], pre=True)):
-        protocols.remove('TLSv1.3')
-        if not protocols:
-            raise UnsupportedConfiguration(
-                ('%s %s does not support TLSv1.3, '
-                 'unable to generate Mozilla "%s" SSL configuration.') % (
-                    server_name, server_ver, config))
-
-    # Remove ciphers that are unsupported by software
-    ciphers = ssc['ciphers'][server_cfg.get('cipherFormat', 'openssl')]
-    supported_ciphers = server_cfg.get('supportedCiphers')
-    if supported_ciphers:
-        ciphers = [cipher for cipher in ciphers if cipher in supported_ciphers]
-
-    # Select the command to generate the DH parameters files
-    dh_param_size = ssc.get('dh_param_size')
-    if not dh_param_size:
-        dh_command = ''
-    elif dh_param_size >= 2048:
-        dh_command = 'cat ' + _join(_DATA_DIR, 'ffdhe%d.txt' % dh_param_size)
-    else:
-        dh_command = 'openssl dhparam %d' % dh_param_size
+    tls13 = bool(tls13_ver) and not (
+        Version(server_ver) < Version(tls13_ver, pre=True) or
+        Version(openssl_ver) < Version(openssl_cfg['tls13'], pre=True))
+
+    entry = _get_index()[(server, config, tls13)]
+    protocols = entry['protocols']
+    if not protocols:
+        raise UnsupportedConfiguration(
+            ('%s %s does not support TLSv1.3, '
+             'unable to generate Mozilla "%s" SSL configuration.') % (
+                server_name, server_ver, config))
+    ciphers = entry['ciphers']
 
     return {
         'form': {
@@ -158,15 +632,13 @@ def _get_state(server, config='intermediate', server_version=None,
         'output': {
             'ciphers': ciphers,
             'cipherSuites': ssc['ciphersuites'],
-            'date': _date.today().isoformat(),
-            'dhCommand': dh_command,
-            'dhParamSize': dh_param_size,
+            'date': date or _today(),
+            'dhCommand': entry['dh_command'],
+            'dhParamSize': entry['dh_param_size'],
             'hasVersions': server_cfg.get('hasVersions', True),
             'hstsMaxAge': ssc['hsts_min_age'],
             'latestVersion': server_cfg['latestVersion'],
-            'link': ('Mozilla SSL Generator, Python edition %s;'
-                     ' %s %s; %s configuration') % (
-                __version__, server_name, server_ver, config.capitalize()),
+            'link': _link(server_name, server_ver, config),
             'oldestClients': ssc['oldest_clients'],
             'opensslCiphers': ciphers,
             'opensslCipherSuites': ssc['ciphersuites'],
@@ -176,23 +648,634 @@ def _get_state(server, config='intermediate', server_version=None,
             'supportsConfigs': server_cfg.get('supportsConfigs', True),
             'supportsHsts': supports_hsts,
             'supportsOcspStapling': supports_ocsp,
-            'usesDhe': any(cipher.startswith('DHE') or
-                           '_DHE_' in cipher for cipher in ciphers),
+            'usesDhe': entry['uses_dhe'],
             'usesOpenssl': server_cfg.get('usesOpenssl', True),
         },
-        'sstls': GUIDELINES
+        'sstls': _get('GUIDELINES')
     }
 
 
+def _get_template_key(server):
+    """
+    Get template cache key.
+
+    The template file is only read again if its modification time or size
+    changed. If the precompiled data bundle is available, the template digest
+    is directly taken from it.
+
+    Args:
+        server (str): Server name.
+
+    Returns:
+        tuple: Server name, template source SHA-256 digest.
+    """
+    bundle = _get_bundle()
+    if bundle is not None:
+        return server, bundle['index']['digests']['templates/%s.hbs' % server]
+
+    signature = _file_signature(
+        _join(_DATA_DIR, 'templates', '%s.hbs' % server))
+    try:
+        known_signature, key = _TEMPLATES_KEYS[server]
+    except KeyError:
+        known_signature = key = None
+
+    if known_signature != signature:
+        from hashlib import sha256
+        key = (server, sha256(
+            _get_template_source(server).encode()).hexdigest())
+        _TEMPLATES_KEYS[server] = signature, key
+
+    return key
+
+
+def _get_template_source(server):
+    """
+    Get template source.
+
+    Args:
+        server (str): Server name.
+
+    Returns:
+        str: Template source.
+    """
+    bundle = _get_bundle()
+    if bundle is not None:
+        return bundle['templates'][server]
+
+    with open(_join(_DATA_DIR, 'templates', '%s.hbs' % server),
+              'rb') as hbs_file:
+        return hbs_file.read().decode()
+
+
+def _get_template(server):
+    """
+    Get compiled template.
+
+    Templates are only compiled again if their content changed. Templates are
+    compiled with the native renderer if they only use supported constructs,
+    else Pybars is used: Ahead of time compiled templates are used if
+    available and matching the template source.
+
+    Args:
+        server (str): Server name.
+
+    Returns:
+        function: Compiled template.
+    """
+    with _timing('template'):
+        key = _get_template_key(server)
+        template = _TEMPLATES.get(key)
+        if template is None:
+            with _COMPILE_LOCK:
+                # Compiled by another thread while waiting for the lock
+                template = _TEMPLATES.get(key) if key in _TEMPLATES else None
+                if template is None:
+                    source = _get_template_source(server)
+                    template = _compile_native(source)
+                    if template is None:
+                        template = _load_compiled(*key)
+                    if template is None:
+                        template = _compile(source)
+                    _TEMPLATES.set(key, template)
+
+    return template
+
+
+def _compile_native(source):
+    """
+    Compile a template with the native renderer.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        function or None: Compiled template, None if the template is not
+            supported by the native renderer.
+    """
+    from ssl_config._renderer import compile_template
+    with _timing('compile_native'):
+        return compile_template(source)
+
+
+def _compile(source):
+    """
+    Compile a template with Pybars.
+
+    The Pybars compiler is not thread-safe: "_COMPILE_LOCK" must be held.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        function: Compiled template.
+    """
+    from pybars import Compiler
+    with _timing('compile'):
+        return Compiler().compile(source)
+
+
+def _render(template, state):
+    """
+    Render a template.
+
+    Args:
+        template (function): Compiled template.
+        state (dict): Render state.
+
+    Returns:
+        str: Rendered template.
+    """
+    from ssl_config._helpers import HELPERS
+    with _timing('render'):
+        return template(state, helpers=HELPERS)
+
+
+def _load_compiled(server, digest):
+    """
+    Load ahead of time compiled template generated by "update_config.py".
+
+    Args:
+        server (str): Server name.
+        digest (str): Template source SHA-256 digest.
+
+    Returns:
+        function or None: Compiled template, None if not available or not
+            matching the template source or the installed Pybars version.
+    """
+    from importlib.util import module_from_spec, spec_from_file_location
+    from pybars import PybarsError
+
+    spec = spec_from_file_location(
+        'ssl_config._data.compiled.%s' % server,
+        _join(_DATA_DIR, 'compiled', '%s.py' % server))
+    module = module_from_spec(spec)
+    try:
+        with _timing('load_compiled'):
+            spec.loader.exec_module(module)
+    except (FileNotFoundError, PybarsError):
+        return None
+
+    if module.SOURCE_DIGEST != digest:
+        return None
+    return module.render
+
+
+def _get_breakpoints(server):
+    """
+    Get versions breakpoints of a server.
+
+    Breakpoints are extracted from the template source, and completed with
+    TLS 1.3 support versions from configurations.
+
+    Args:
+        server (str): Server name.
+
+    Returns:
+        dict or None: Sorted breakpoints and comparable thresholds, by kind
+            ("server_version", "openssl_version"). None if the template does
+            not allow versions equivalence classes.
+    """
+    key = _get_template_key(server)
+    breakpoints = _BREAKPOINTS.get(key, _MISSING)
+    if breakpoints is _MISSING:
+        generation = _CONFIGS['generation']
+        from ssl_config._breakpoints import analyze, sort_versions, thresholds
+
+        found = analyze(_get_template_source(server))
+        if found is None:
+            breakpoints = None
+        else:
+            cfg = _get_configs()
+            for kind, tls13_ver in (
+                    ('server_version', cfg[server].get('tls13')),
+                    ('openssl_version', cfg['openssl'].get('tls13'))):
+                if tls13_ver:
+                    found[kind].add(tls13_ver)
+
+            breakpoints = dict()
+            for kind, versions in found.items():
+                versions = sort_versions(versions)
+                breakpoints[kind] = versions, thresholds(versions)
+        _store(_BREAKPOINTS, key, breakpoints, generation)
+
+    return breakpoints
+
+
+def _get_version_class(server, server_ver, openssl_ver):
+    """
+    Get versions equivalence class.
+
+    Args:
+        server (str): Server name.
+        server_ver (str): Server version.
+        openssl_ver (str): OpenSSL version.
+
+    Returns:
+        tuple of int or None: Server and OpenSSL versions classes. None if
+            the template does not allow versions equivalence classes.
+    """
+    breakpoints = _get_breakpoints(server)
+    if breakpoints is None:
+        return None
+
+    from ssl_config._breakpoints import version_class
+    return (
+        version_class(breakpoints['server_version'][1], server_ver),
+        version_class(breakpoints['openssl_version'][1], openssl_ver))
+
+
+def version_breakpoints(server):
+    """
+    Get versions where the generated configuration of a server may change.
+
+    All versions between two consecutive breakpoints generate the same
+    configuration, except for the versions text itself.
+
+    Args:
+        server (str): Server name.
+
+    Returns:
+        dict or None: Sorted breakpoints versions, by kind ("server_version",
+            "openssl_version"). None if the server template uses versions in a
+            way that does not allow equivalence classes.
+    """
+    breakpoints = _get_breakpoints(server)
+    if breakpoints is None:
+        return None
+    return {kind: versions for kind, (versions, _) in breakpoints.items()}
+
+
+def version_class(server, server_version=None, openssl_version=None):
+    """
+    Get the equivalence class of versions.
+
+    Versions with the same equivalence class generate the same configuration,
+    except for the versions text itself.
+
+    Args:
+        server (str): Server name.
+        server_version (str): Server version, latest if not specified.
+        openssl_version (str): OpenSSL version, latest if not specified.
+
+    Returns:
+        tuple of int or None: Server and OpenSSL versions classes. None if the
+            server template uses versions in a way that does not allow
+            equivalence classes.
+    """
+    cfg = _get_configs()
+    return _get_version_class(
+        server, server_version or cfg[server]['latestVersion'],
+        openssl_version or cfg['openssl']['latestVersion'])
+
+
+def _get_capabilities():
+    """
+    Get the capabilities table of TLS 1.3 support breakpoints and usable
+    configurations by server software.
+
+    The table is built once, and built again only if configurations changed.
+
+    Returns:
+        types.MappingProxyType: Table. See "ssl_config._capabilities.build".
+    """
+    cfg = _get_configs()
+    table_cfg, table = _CAPABILITIES['entry']
+    if table_cfg is not cfg:
+        with _DATA_LOCK:
+            # Index and configurations are consistent while locked
+            index = _get_index()
+            cfg = _get_configs()
+            table_cfg, table = _CAPABILITIES['entry']
+            if table_cfg is not cfg:
+                from ssl_config._capabilities import build
+                table = build(cfg, index, _get('CONFIGS'))
+                _CAPABILITIES['entry'] = cfg, table
+    return table
+
+
+def classify(hosts):
+    """
+    Get capabilities of many hosts.
+
+    Capabilities are computed from configurations without rendering templates.
+    Hosts with the same software versions are only classified once.
+
+    Args:
+        hosts (iterable of tuple): Server name, server version and OpenSSL
+            version of each host. Versions may be None for latest.
+
+    Returns:
+        list of types.MappingProxyType: Read-only capabilities of each host,
+            in the same order as hosts: "tls13" support and "configs" names
+            that can be generated without "UnsupportedConfiguration".
+    """
+    from ssl_config._capabilities import classify as classify_hosts
+    return classify_hosts(_get_capabilities(), _get_configs(), hosts)
+
+
+def capabilities(server, server_version=None, openssl_version=None):
+    """
+    Get capabilities of a server software version. See "classify".
+
+    Args:
+        server (str): Server name.
+        server_version (str): Server version, latest if not specified.
+        openssl_version (str): OpenSSL version, latest if not specified.
+
+    Returns:
+        types.MappingProxyType: Read-only capabilities: "tls13" support and
+            "configs" names that can be generated without
+            "UnsupportedConfiguration".
+    """
+    return classify(((server, server_version, openssl_version),))[0]
+
+
+def _render_class(server, config, state, hsts, ocsp, date, generation):
+    """
+    Render a template, reusing renders of versions of the same equivalence
+    class.
+
+    Args:
+        server (str): Server name.
+        config (str): Configuration name.
+        state (dict): Render state.
+        hsts (bool): Enable HTTP Strict Transport Security.
+        ocsp (bool): Enable OCSP stapling.
+        date (str): Generation date in ISO format.
+        generation (int): Configurations generation the render state was
+            computed from.
+
+    Returns:
+        str or None: Configuration file content. None if versions equivalence
+            classes can't be used.
+    """
+    from ssl_config._breakpoints import VersionPlaceholder, substitutable
+
+    form = state['form']
+    server_ver = form['serverVersion']
+    openssl_ver = form['opensslVersion']
+    if not (substitutable(server_ver) and substitutable(openssl_ver)):
+        return None
+
+    classes = _get_version_class(server, server_ver, openssl_ver)
+    if classes is None:
+        return None
+
+    key = (_get_template_key(server), config, classes, hsts, ocsp, date)
+    output = _RENDERS.get(key)
+    if output is None:
+        server_placeholder = VersionPlaceholder(
+            _SERVER_VERSION_PLACEHOLDER, server_ver)
+        openssl_placeholder = VersionPlaceholder(
+            _OPENSSL_VERSION_PLACEHOLDER, openssl_ver)
+        output = _render(_get_template(server), dict(
+            state,
+            form=dict(form, serverVersion=server_placeholder,
+                      opensslVersion=openssl_placeholder),
+            output=dict(state['output'], link=_link(
+                form['serverName'], server_placeholder, config))))
+        _store(_RENDERS, key, output, generation)
+
+    return output.replace(_SERVER_VERSION_PLACEHOLDER, server_ver).replace(
+        _OPENSSL_VERSION_PLACEHOLDER, openssl_ver)
+
+
+def _data_names():
+    """
+    Data files used to generate configurations, when the precompiled data
+    bundle is not available.
+
+    Returns:
+        list of str: Files names, relative to the data directory.
+    """
+    return ['guidelines.json', 'configs.js'] + [
+        'templates/%s.hbs' % server for server in _get('SERVERS')]
+
+
+def _data_fingerprint():
+    """
+    Get a fingerprint of the package version and of all data used to generate
+    configurations.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    from hashlib import sha256
+
+    bundle = _get_bundle()
+    if bundle is not None:
+        digests = bundle['index']['digests']
+    else:
+        digests = dict()
+        for name in _data_names():
+            with open(_join(_DATA_DIR, name), 'rb') as file:
+                digests[name] = sha256(file.read()).hexdigest()
+
+    return sha256(repr((_get('__version__'), sorted(
+        digests.items()))).encode()).hexdigest()
+
+
+def _get_fingerprint():
+    """
+    Get the data fingerprint.
+
+    The fingerprint is computed once, and computed again only if data files
+    changed.
+
+    Returns:
+        str: SHA-256 hex digest. See "_data_fingerprint".
+    """
+    if _get_bundle() is not None:
+        # The bundle is loaded once
+        signatures = None
+    else:
+        signatures = tuple(_file_signature(_join(_DATA_DIR, name))
+                           for name in _data_names())
+
+    known_signatures, fingerprint = _FINGERPRINT['entry']
+    if fingerprint is None or known_signatures != signatures:
+        with _DATA_LOCK:
+            fingerprint = _data_fingerprint()
+            _FINGERPRINT['entry'] = signatures, fingerprint
+    return fingerprint
+
+
+def warmup(freeze=True):
+    """
+    Load all data and compile all templates now instead of on first use.
+
+    Intended to be called in a parent process before forking workers: Workers
+    then share loaded data and compiled templates with the parent by
+    copy-on-write and generate configurations at full speed immediately.
+
+    Args:
+        freeze (bool): Move all objects currently tracked by the garbage
+            collector to a permanent generation ignored by collections
+            ("gc.freeze"). Collections in forked workers then do not write to
+            the shared memory pages of loaded data. Objects are frozen until
+            "gc.unfreeze" is called.
+    """
+    for name in ('SERVERS', 'GUIDELINES', 'CONFIGS', 'GUIDELINES_VERSION',
+                 '__version__', 'SERVER_CONFIGS'):
+        _get(name)
+    _get_capabilities()
+    for server in _get('SERVERS'):
+        _get_template(server)
+        _get_breakpoints(server)
+
+    # Modules imported on first generation
+    import ssl_config._breakpoints  # noqa: F401
+    import ssl_config._helpers  # noqa: F401
+    import ssl_config._versions  # noqa: F401
+
+    if freeze:
+        import gc
+        # Collect first to not freeze garbage
+        gc.collect()
+        gc.freeze()
+
+
+def clear_cache(disk=False):
+    """
+    Clear all in-memory caches.
+
+    Cached values are computed again on next use.
+
+    Args:
+        disk (bool): Also clear the on-disk cache, if enabled.
+    """
+    if disk and _DISK_CACHE['value'] is not None:
+        _DISK_CACHE['value'].clear()
+    with _DATA_LOCK:
+        _TEMPLATES.clear()
+        _TEMPLATES_KEYS.clear()
+        _STATES.clear()
+        _BREAKPOINTS.clear()
+        _RENDERS.clear()
+        _CONFIGS.update(signature=None, digest=None, value=None)
+        _CONFIGS['generation'] += 1
+        _INDEX['entry'] = None, None
+        _CAPABILITIES['entry'] = None, None
+        _FINGERPRINT['entry'] = None, None
+    from ssl_config._versions import _parse
+    from ssl_config._helpers import _minpatchver, _minver, _sameminorver
+    for function in (_parse, _minpatchver, _minver, _sameminorver):
+        function.cache_clear()
+
+
+def cache_info():
+    """
+    Caches statistics.
+
+    Returns:
+        dict: Hits, misses, size and maximum size, by cache name. The on-disk
+            cache ("disk") is only included if enabled, with sizes in bytes.
+    """
+    from ssl_config._versions import _parse
+    versions = _parse.cache_info()
+    info = dict(
+        templates=_TEMPLATES.info(),
+        states=_STATES.info(),
+        renders=_RENDERS.info(),
+        versions=dict(hits=versions.hits, misses=versions.misses,
+                      size=versions.currsize, maxsize=versions.maxsize))
+    if _DISK_CACHE['value'] is not None:
+        info['disk'] = _DISK_CACHE['value'].info()
+    return info
+
+
+def enable_disk_cache(path=None, maxsize=None):
+    """
+    Enable the persistent on-disk cache of generated configurations.
+
+    The cache is shared by all processes using the same directory, and
+    outlives them: A configuration generated once is then read from the cache
+    without loading templates. Entries are keyed by generation arguments, the
+    package version and the data fingerprint, so cached configurations are
+    never outdated.
+
+    Args:
+        path (str): Cache directory. Default to "$XDG_CACHE_HOME/ssl_config"
+            or "~/.cache/ssl_config".
+        maxsize (int): Approximative maximum cache size in bytes. Default to
+            64 MiB.
+    """
+    from ssl_config._disk_cache import DiskCache, MAXSIZE
+    _DISK_CACHE['value'] = DiskCache(path, maxsize or MAXSIZE)
+
+
+def disable_disk_cache():
+    """
+    Disable the persistent on-disk cache. Cached entries are kept on disk.
+    """
+    _DISK_CACHE['value'] = None
+
+
+def enable_stats():
+    """
+    Enable collection of per-stage timing statistics. See "stats".
+
+    Stages are timed by explicit hooks, whatever the way functions are
+    referenced. While disabled, the cost is a flag check per stage.
+    """
+    _STATS['enabled'] = True
+
+
+def disable_stats():
+    """
+    Disable collection of per-stage timing statistics. Collected statistics
+    are kept.
+    """
+    _STATS['enabled'] = False
+
+
+def stats(reset=False):
+    """
+    Per-stage timing statistics snapshot.
+
+    Stages are data bundle loading ("bundle"), configurations parsing
+    ("configs"), guidelines index building ("index"), render state building
+    ("state"), template retrieval ("template") including native compilation
+    ("compile_native"), ahead of time compiled template loading
+    ("load_compiled") and Pybars compilation ("compile"), template rendering
+    ("render") and whole generation ("generate"). Stages served from caches
+    are not counted, except "template" and "generate".
+
+    Statistics are only collected in the current process, while enabled.
+
+    Args:
+        reset (bool): Reset statistics after the snapshot.
+
+    Returns:
+        dict: "enabled" status and "stages" statistics by stage name: "calls"
+            count, "total" and "mean" durations in seconds. Stages durations
+            are inclusive: For instance, "generate" includes "state" and
+            "render".
+    """
+    from ssl_config._stats import snapshot
+    return dict(enabled=_STATS['enabled'], stages=snapshot(reset))
+
+
 class UnsupportedConfiguration(Exception):
     """Unsupported Configuration Exception"""
 
 
-def generate(server, config='intermediate',
-             server_version=None, openssl_version=None, hsts=True, ocsp=True):
+def generate(server, config='intermediate', server_version=None,
+             openssl_version=None, hsts=True, ocsp=True, date=None):
     """
     Generate configuration.
 
+    The output only depends on arguments: With the same arguments, including
+    the date, the generated configuration is always the same. Renders are
+    cached by versions equivalence class (See "version_class"), and on disk
+    if enabled (See "enable_disk_cache").
+
+    This function is thread-safe. Loaded data, compiled templates and caches
+    are shared by all threads. Data is loaded and templates are compiled once,
+    even if many threads need them at the same time. Cached values are only
+    read and written under short locks, never held while rendering.
+
     Args:
         server (str): Server name.
         config (str): Configuration name.
@@ -200,14 +1283,45 @@ def generate(server, config='intermediate',
         openssl_version (str): OpenSSL version, latest if not specified.
         hsts (bool): Enable HTTP Strict Transport Security.
         ocsp (bool): Enable OCSP stapling.
+        date (datetime.date or str): Generation date written in the
+            configuration, as date or string in ISO format. Today if not
+            specified.
 
     Returns:
         str: Configuration file content.
     """
-    state = _get_state(
-        server, config, server_version, openssl_version, hsts, ocsp)
+    with _timing('generate'):
+        if date is None:
+            date = _today()
+        elif not isinstance(date, str):
+            date = date.isoformat()
+
+        key = (server, config, server_version, openssl_version, hsts, ocsp,
+               date)
+
+        disk_cache = _DISK_CACHE['value']
+        if disk_cache is not None:
+            disk_key = (_get_fingerprint(),) + key
+            output = disk_cache.get(disk_key)
+            if output is not None:
+                return output
+
+        # Configurations generation the state is computed from. Getting
+        # configurations reloads them, and clears cached states and renders,
+        # if "configs.js" changed
+        _get_configs()
+        generation = _CONFIGS['generation']
+        state = _STATES.get(key)
+        if state is None:
+            with _timing('state'):
+                state = _get_state(*key)
+            _store(_STATES, key, state, generation)
 
-    with open(_join(_DATA_DIR, 'templates/%s.hbs' % server), 'rt') as hbs_file:
-        template = hbs_file.read()
+        output = _render_class(
+            server, config, state, hsts, ocsp, date, generation)
+        if output is None:
+            output = _render(_get_template(server), state)
 
-    return _Compiler().compile(template)(state, helpers=_HELPERS)
+        if disk_cache is not None:
+            disk_cache.set(disk_key, output)
+        return output
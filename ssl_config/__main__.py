@@ -3,6 +3,504 @@
 """Command line entry point"""
 
 
+#: Batch manifest entries keys
+_MANIFEST_KEYS = ('server', 'config', 'server_version', 'openssl_version',
+                  'hsts', 'ocsp', 'date', 'output')
+
+
+def _load_manifest(path):
+    """
+    Load batch manifest.
+
+    The manifest is a JSON file containing a list of objects with
+    "ssl_config.generate" keyword arguments, and an "output" key with the
+    output file path.
+
+    Args:
+        path (str): Manifest path.
+
+    Returns:
+        list of dict: Manifest entries.
+
+    Raises:
+        ValueError: Invalid manifest.
+    """
+    from datetime import date
+    from json import load
+    from ssl_config import CONFIGS, SERVERS
+    from ssl_config._lint import check_version
+
+    with open(path, 'rt') as json_file:
+        entries = load(json_file)
+    if not isinstance(entries, list):
+        raise ValueError('Manifest: list of objects expected')
+
+    outputs = set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError('Manifest entry %d: object expected' % index)
+        unknown = sorted(set(entry) - set(_MANIFEST_KEYS))
+        if unknown:
+            raise ValueError('Manifest entry %d: unknown keys: %s' % (
+                index, ', '.join(unknown)))
+        for key in ('server', 'output'):
+            if not entry.get(key) or not isinstance(entry[key], str):
+                raise ValueError('Manifest entry %d: "%s" is required' % (
+                    index, key))
+        if entry['server'] not in SERVERS:
+            raise ValueError('Manifest entry %d: unsupported server: %s' % (
+                index, entry['server']))
+        if entry.get('config', 'intermediate') not in CONFIGS:
+            raise ValueError('Manifest entry %d: unsupported config: %s' % (
+                index, entry['config']))
+        if entry['output'] in outputs:
+            raise ValueError('Manifest entry %d: duplicate output: %s' % (
+                index, entry['output']))
+        outputs.add(entry['output'])
+
+        for key in ('server_version', 'openssl_version'):
+            value = entry.get(key)
+            if value is None:
+                continue
+            try:
+                if not isinstance(value, str):
+                    raise ValueError(value)
+                check_version(value)
+            except ValueError:
+                raise ValueError('Manifest entry %d: invalid "%s": %r' % (
+                    index, key, value))
+        for key in ('hsts', 'ocsp'):
+            if not isinstance(entry.get(key, True), bool):
+                raise ValueError(
+                    'Manifest entry %d: "%s" must be true or false' % (
+                        index, key))
+        value = entry.get('date')
+        if value is not None:
+            try:
+                if not isinstance(value, str):
+                    raise ValueError(value)
+                date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(
+                    'Manifest entry %d: invalid "date": %r, YYYY-MM-DD '
+                    'expected' % (index, value))
+    return entries
+
+
+def _make_dirs(paths):
+    """
+    Create missing parent directories of output files.
+
+    Args:
+        paths (iterable of str): Output files paths.
+    """
+    from os import makedirs
+    from os.path import dirname
+    for directory in {dirname(path) for path in paths}:
+        if directory:
+            makedirs(directory, exist_ok=True)
+
+
+def _version(value):
+    """
+    Version argument type.
+
+    Args:
+        value (str): Argument value.
+
+    Returns:
+        str: Version.
+
+    Raises:
+        argparse.ArgumentTypeError: Not a version.
+    """
+    from argparse import ArgumentTypeError
+    from ssl_config._lint import check_version
+    try:
+        check_version(value)
+    except ValueError:
+        raise ArgumentTypeError('invalid version: %r' % value)
+    return value
+
+
+def _iso_date(value):
+    """
+    ISO format date argument type.
+
+    Args:
+        value (str): Argument value.
+
+    Returns:
+        str: Date.
+
+    Raises:
+        argparse.ArgumentTypeError: Not a date in ISO format.
+    """
+    from argparse import ArgumentTypeError
+    from datetime import date
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ArgumentTypeError(
+            'invalid date: %r, YYYY-MM-DD expected' % value)
+    return value
+
+
+def _positive_int(value):
+    """
+    Strictly positive integer argument type.
+
+    Args:
+        value (str): Argument value.
+
+    Returns:
+        int: Value.
+
+    Raises:
+        argparse.ArgumentTypeError: Not a strictly positive integer.
+    """
+    from argparse import ArgumentTypeError
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ArgumentTypeError(
+            'invalid value: %r, must be an integer greater than 0' % value)
+    return number
+
+
+def _run_batch(entries, defaults, if_changed=False):
+    """
+    Generate many configurations in the current process and write outputs
+    files concurrently. Missing output directories are created.
+
+    Args:
+        entries (list of dict): "ssl_config.generate" keyword arguments, with
+            the "output" file path.
+        defaults (dict): "ssl_config.generate" default keyword arguments.
+        if_changed (bool): Only write files that content changed.
+
+    Returns:
+        tuple: Summary text, number of unsupported configurations, number of
+            written files.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from time import perf_counter
+    from ssl_config import generate_many, UnsupportedConfiguration
+    from ssl_config._output import update, write
+
+    requests = []
+    for entry in entries:
+        request = defaults.copy()
+        request.update(entry)
+        del request['output']
+        requests.append(request)
+    _make_dirs(entry['output'] for entry in entries)
+
+    lines = []
+    unsupported = 0
+    written = 0
+    start = perf_counter()
+    with ThreadPoolExecutor() as pool:
+        writes = []
+        for entry, request, output in zip(
+                entries, requests, generate_many(requests, executor='thread')):
+            if isinstance(output, UnsupportedConfiguration):
+                unsupported += 1
+                lines.append('%s: unsupported (%s)' % (
+                    entry['output'], output))
+            elif if_changed:
+                writes.append((len(lines), pool.submit(
+                    update, entry['output'], output, request)))
+                lines.append(entry['output'])
+            else:
+                writes.append((None, pool.submit(
+                    write, entry['output'], output)))
+                lines.append('%s: written' % entry['output'])
+        render_time = perf_counter() - start
+
+        for index, write in writes:
+            if write.result() is False:
+                lines[index] += ': unchanged'
+            else:
+                written += 1
+                if index is not None:
+                    lines[index] += ': written'
+    total_time = perf_counter() - start
+
+    lines.append(
+        '%d configurations generated, %d unsupported, %d written, in %.3fs '
+        '(render: %.3fs, write: %.3fs)' % (
+            len(entries) - unsupported, unsupported, written, total_time,
+            render_time, total_time - render_time))
+    return '\n'.join(lines), unsupported, written
+
+
+def _run_serve(argv):
+    """
+    "serve" command: HTTP server generating configurations.
+
+    Args:
+        argv (list of str): Command arguments.
+    """
+    from argparse import ArgumentParser
+    from ssl_config._server import make_server
+
+    parser = ArgumentParser(
+        prog='ssl-config serve',
+        description='HTTP server generating configurations. '
+                    'Endpoints: "GET /config?server=<server>&config=<config>'
+                    '&server_version=<version>&openssl_version=<version>'
+                    '&hsts=<true|false>&ocsp=<true|false>&date=<YYYY-MM-DD>" '
+                    '(Only "server" is required), "GET /metrics".')
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help='Host to listen on (Default to "127.0.0.1").')
+    parser.add_argument(
+        '--port', '-p', type=int, default=8000,
+        help='Port to listen on (Default to 8000).')
+    parser.add_argument(
+        '--quiet', '-q', action='store_true', help='Do not log requests.')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.quiet)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    parser.exit()
+
+
+def _run_export(argv):
+    """
+    "export" command: Export all supported configurations.
+
+    Args:
+        argv (list of str): Command arguments.
+    """
+    from argparse import ArgumentParser
+    import sys
+    from ssl_config._export import FORMATS, export
+
+    parser = ArgumentParser(
+        prog='ssl-config export',
+        description='Export all supported configurations, with a version of '
+                    'each range of versions generating the same '
+                    'configuration, to a tar or zip archive or to a static '
+                    'directory tree, as '
+                    '"<server>/<server_version>/<openssl_version>/'
+                    '<config>.conf" files with an "index.json" file.')
+    parser.add_argument(
+        'output',
+        help='Output directory or archive file. "-" to write the archive to '
+             'the standard output.')
+    parser.add_argument(
+        '--format', '-f', choices=FORMATS,
+        help='Export format. Guessed from the output file extension if not '
+             'specified (".tar", ".tar.gz", ".tgz", ".zip", else directory).')
+    parser.add_argument(
+        '--date', type=_iso_date,
+        help='Generation date written in configurations, in ISO format '
+             '(YYYY-MM-DD). Today if not specified.')
+    parser.add_argument(
+        '--executor', choices=('process', 'thread'), default='process',
+        help='Render configurations in parallel using processes or threads '
+             '(Default to "process").')
+    parser.add_argument(
+        '--max-workers', type=_positive_int,
+        help='Maximum number of workers. Default to the number of CPU.')
+    args = parser.parse_args(argv)
+
+    if args.output == '-':
+        if not args.format or args.format == 'dir':
+            parser.error('An archive "--format" is required to write to the '
+                         'standard output.')
+        output = sys.stdout.buffer
+    else:
+        output = args.output
+
+    try:
+        index = export(output, args.format, args.date, args.executor,
+                       args.max_workers)
+    except (OSError, ValueError) as exception:
+        parser.error(str(exception))
+    parser.exit(message='%d configurations exported, %d unsupported.\n' % (
+        len(index['configurations']), len(index['unsupported'])))
+
+
+def _run_inventory(argv):
+    """
+    "inventory" command: Generate configurations of hosts of an inventory.
+
+    Args:
+        argv (list of str): Command arguments.
+    """
+    from argparse import ArgumentParser
+    import sys
+    from ssl_config._inventory import FIELDS, FORMATS, PATTERN
+
+    parser = ArgumentParser(
+        prog='ssl-config inventory',
+        description='Generate the configuration of each host of a CSV or '
+                    'JSONL inventory, with "%s" fields (Only "hostname" and '
+                    '"server" are required). Hosts with the same parameters '
+                    'share a single generation.' % '", "'.join(FIELDS))
+    parser.add_argument(
+        'inventory', help='Inventory file. "-" to read the standard input.')
+    parser.add_argument(
+        '--output', '-o', default='.',
+        help='Output directory (Default to current directory).')
+    parser.add_argument(
+        '--format', '-f', choices=FORMATS,
+        help='Inventory format. Guessed from the inventory file extension if '
+             'not specified (".csv", ".jsonl", ".ndjson").')
+    parser.add_argument(
+        '--pattern', default=PATTERN,
+        help='Output file path pattern, relative to the output directory, '
+             'formatted with host fields (Default to "%s").' %
+             PATTERN.replace('%', '%%'))
+    parser.add_argument(
+        '--date', type=_iso_date,
+        help='Generation date written in configurations, in ISO format '
+             '(YYYY-MM-DD). Today if not specified.')
+    parser.add_argument(
+        '--if-changed', '--check', action='store_true',
+        help='Only write output files which content would change, ignoring '
+             'the generation date if "--date" is not specified. Exit with '
+             'status %d if any file was written.' % _EXIT_CHANGED)
+    parser.add_argument(
+        '--verbose', '-v', action='store_true',
+        help='Print the result of each host.')
+    args = parser.parse_args(argv)
+
+    if args.inventory == '-':
+        if not args.format:
+            parser.error('"--format" is required to read the standard input.')
+        inventory = sys.stdin
+    else:
+        inventory = args.inventory
+
+    from ssl_config import render_inventory
+
+    counts = dict(hosts=0, rendered=0, written=0, unchanged=0, unsupported=0)
+    try:
+        for result in render_inventory(
+                inventory, args.output, args.format, args.pattern, args.date,
+                args.if_changed):
+            counts['hosts'] += 1
+            counts['rendered'] += result['rendered']
+            counts[result['status']] += 1
+            if result['status'] == 'unsupported':
+                print('%s: unsupported (%s)' % (
+                    result['hostname'], result['error']), file=sys.stderr)
+            elif args.verbose:
+                print('%s: %s' % (result['path'], result['status']))
+    except ValueError as exception:
+        parser.error(str(exception))
+
+    if counts['unsupported']:
+        status = 1
+    elif counts['written'] and args.if_changed:
+        status = _EXIT_CHANGED
+    else:
+        status = 0
+    parser.exit(status, (
+        '%(hosts)d hosts, %(rendered)d configurations generated, '
+        '%(written)d written, %(unchanged)d unchanged, %(unsupported)d '
+        'unsupported.\n') % counts)
+
+
+def _run_lint(argv):
+    """
+    "lint" command: Check server configuration files against the guidelines.
+
+    Args:
+        argv (list of str): Command arguments.
+    """
+    from argparse import ArgumentParser
+    from json import dumps
+    from ssl_config import CONFIGS, lint
+    from ssl_config._lint import DIRECTIVES
+
+    parser = ArgumentParser(
+        prog='ssl-config lint',
+        description='Check TLS protocols, ciphers and server preferred order '
+                    'directives of existing %s configuration files against '
+                    'the guidelines. Violations are printed as JSON. Exit '
+                    'with status 1 if any violation is found.' %
+                    ', '.join(sorted(DIRECTIVES)))
+    parser.add_argument(
+        'paths', nargs='+',
+        help='Configuration files or directories, walked recursively.')
+    parser.add_argument(
+        '--server', '-s', choices=sorted(DIRECTIVES),
+        help='Server software. Detected from directives if not specified.')
+    parser.add_argument(
+        '--config', '-c', choices=CONFIGS, default='intermediate',
+        help='Configuration level to check against (Default to '
+             '"intermediate").')
+    parser.add_argument(
+        '--server-version', type=_version,
+        help='Server software version. Latest if not specified. Requires '
+             '"--server".')
+    parser.add_argument(
+        '--openssl-version', type=_version,
+        help='OpenSSL version. Latest if not specified')
+    parser.add_argument(
+        '--executor', choices=('process', 'thread'), default='process',
+        help='Check files in parallel using processes or threads '
+             '(Default to "process").')
+    parser.add_argument(
+        '--max-workers', type=_positive_int,
+        help='Maximum number of workers. Default to the number of CPU.')
+    args = parser.parse_args(argv)
+
+    if args.server_version and not args.server:
+        parser.error('"--server-version" requires "--server".')
+
+    files = checked = 0
+    violations = []
+    errors = []
+    for result in lint(args.paths, args.server, args.config,
+                       args.server_version, args.openssl_version,
+                       args.executor, args.max_workers):
+        files += 1
+        if result['error']:
+            errors.append(dict(path=result['path'], error=result['error']))
+        if result['server'] is None:
+            continue
+        checked += 1
+        for violation in result['violations']:
+            violations.append(dict(
+                violation, path=result['path'], server=result['server']))
+
+    print(dumps(dict(files=files, checked=checked, errors=errors,
+                     violations=violations), indent=2))
+    parser.exit(1 if violations or errors else 0)
+
+
+def _print_timings():
+    """
+    Print timing statistics to the standard error output.
+    """
+    import sys
+    from ssl_config import stats
+    from ssl_config._stats import format_stats
+    print(format_stats(stats()), file=sys.stderr)
+
+
+#: Exit status when "--if-changed" changed output files
+_EXIT_CHANGED = 3
+
+#: Commands, by name
+_COMMANDS = dict(
+    export=_run_export, inventory=_run_inventory, lint=_run_lint,
+    serve=_run_serve)
+
+
 def _run_command():
     """
     Command line entry point
@@ -14,6 +512,9 @@ def _run_command():
     import sys
     sys.path.insert(0, dirname(dirname(realpath(__file__))))
 
+    if sys.argv[1:2] and sys.argv[1] in _COMMANDS:
+        return _COMMANDS[sys.argv[1]](sys.argv[2:])
+
     from ssl_config import (
         CONFIGS, SERVERS, GUIDELINES_VERSION, GUIDELINES, generate,
         UnsupportedConfiguration)
@@ -24,7 +525,9 @@ def _run_command():
     parser = ArgumentParser(
         prog='ssl-config',
         description='SSL config generator (From Mozilla guidelines %s).' %
-                    GUIDELINES_VERSION)
+                    GUIDELINES_VERSION,
+        epilog='Other commands: %s. Run "ssl-config <command> --help" for '
+               'help.' % ', '.join(sorted(_COMMANDS)))
 
     parser.add_argument(
         '--server', '-s', choices=SERVERS,
@@ -45,7 +548,8 @@ def _run_command():
     parser.add_argument(
         '--output', '-o',
         help="Output file. If not specified, print directly in standard "
-             "output.")
+             "output. With \"--all\", output directory (Default to current "
+             "directory).")
     parser.add_argument(
         '--server-version',
         help='Server software version. Latest if not specified')
@@ -57,21 +561,105 @@ def _run_command():
         help='Disable HTTP Strict Transport Security.')
     parser.add_argument(
         '--ocsp_disable', action='store_true', help='Disable OCSP stapling.')
+    parser.add_argument(
+        '--date', type=_iso_date,
+        help='Generation date written in the configuration, in ISO format '
+             '(YYYY-MM-DD). Today if not specified. Set it to get '
+             'reproducible outputs.')
+    parser.add_argument(
+        '--if-changed', '--check', action='store_true',
+        help='Only write output files which content would change, ignoring '
+             'the generation date if "--date" is not specified. Exit with '
+             'status %d if any file was written, to allow reloading the '
+             'server only when required.' % _EXIT_CHANGED)
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='Cache generated configurations on disk, in '
+             '"$XDG_CACHE_HOME/ssl_config" by default, to get them directly '
+             'from the cache in next runs.')
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache directory. Implies "--cache".')
+    parser.add_argument(
+        '--timings', action='store_true',
+        help='Print the time spent in each generation stage to the standard '
+             'error output.')
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument(
+        '--all', action='store_true',
+        help='Generate configurations for all servers and configuration '
+             'levels, with latest versions, in the output directory as '
+             '"<server>-<config>.conf" files.')
+    batch.add_argument(
+        '--manifest',
+        help='JSON file with a list of configurations to generate. Each item '
+             'is an object with "server", "config", "server_version", '
+             '"openssl_version", "hsts", "ocsp", "date" and "output" keys. '
+             'Only "server" and "output" are required.')
 
     args = parser.parse_args()
 
+    if args.timings:
+        from atexit import register
+        from ssl_config import enable_stats
+        enable_stats()
+        register(_print_timings)
+
+    if args.cache or args.cache_dir:
+        from ssl_config import enable_disk_cache
+        enable_disk_cache(args.cache_dir)
+
     try:
+        if args.all or args.manifest:
+            if args.manifest:
+                try:
+                    entries = _load_manifest(args.manifest)
+                except (OSError, ValueError) as exception:
+                    parser.error(str(exception))
+            else:
+                from os.path import join
+                entries = [dict(
+                    server=server, config=config, output=join(
+                        args.output or '.', '%s-%s.conf' % (server, config)))
+                    for server in SERVERS for config in CONFIGS]
+
+            summary, unsupported, written = _run_batch(entries, dict(
+                hsts=not args.hsts_disable, ocsp=not args.ocsp_disable,
+                date=args.date), args.if_changed)
+            if unsupported and args.manifest:
+                status = 1
+            elif written and args.if_changed:
+                status = _EXIT_CHANGED
+            else:
+                status = 0
+            parser.exit(status, summary + '\n')
+
+        elif not args.server:
+            parser.error('"--server" is required.')
+
+        elif args.if_changed:
+            if not args.output:
+                parser.error('"--if-changed" requires "--output".')
+
+            from ssl_config import write_if_changed
+            if write_if_changed(
+                    args.output, args.server, args.config, args.server_version,
+                    args.openssl_version, not args.hsts_disable,
+                    not args.ocsp_disable, args.date):
+                parser.exit(_EXIT_CHANGED)
+            parser.exit()
+
         output = generate(args.server, args.config, args.server_version,
                           args.openssl_version, not args.hsts_disable,
-                          not args.ocsp_disable)
+                          not args.ocsp_disable, args.date)
         if args.output:
             with open(args.output, 'wt') as out_file:
                 out_file.write(output)
         else:
             print(output)
 
-    except UnsupportedConfiguration:
-        parser.error(str(UnsupportedConfiguration))
+    except (UnsupportedConfiguration, OSError) as exception:
+        parser.error(str(exception))
     except KeyboardInterrupt:
         pass
     parser.exit()
@@ -0,0 +1,150 @@
+"""
+Asyncio configurations generation.
+"""
+from asyncio import (
+    Semaphore as _Semaphore, ensure_future as _ensure_future,
+    gather as _gather, get_running_loop as _get_running_loop,
+    shield as _shield)
+from os import cpu_count as _cpu_count
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
+
+#: Per event loop default semaphore and in flight renders
+_LOOPS = _WeakKeyDictionary()
+
+
+def _get_loop_state(loop):
+    """
+    Get event loop state.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Event loop.
+
+    Returns:
+        dict: Default semaphore, in flight renders by parameters.
+    """
+    try:
+        return _LOOPS[loop]
+    except KeyError:
+        state = _LOOPS[loop] = dict(
+            semaphore=_Semaphore(_cpu_count() or 1), in_flight=dict())
+        return state
+
+
+async def _render(loop, key, executor, semaphore):
+    """
+    Generate configuration in executor.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Event loop.
+        key (tuple): "ssl_config.generate" arguments.
+        executor (concurrent.futures.Executor): Executor.
+        semaphore (asyncio.Semaphore): Semaphore limiting concurrent renders.
+
+    Returns:
+        str: Configuration file content.
+    """
+    from ssl_config import generate
+    async with semaphore:
+        return await loop.run_in_executor(executor, generate, *key)
+
+
+async def agenerate(server, config='intermediate', server_version=None,
+                    openssl_version=None, hsts=True, ocsp=True, date=None,
+                    executor=None, semaphore=None):
+    """
+    Generate configuration without blocking the event loop.
+
+    Concurrent calls with the same arguments share a single render.
+
+    Args:
+        server (str): Server name.
+        config (str): Configuration name.
+        server_version (str): Server version, latest if not specified.
+        openssl_version (str): OpenSSL version, latest if not specified.
+        hsts (bool): Enable HTTP Strict Transport Security.
+        ocsp (bool): Enable OCSP stapling.
+        date (datetime.date or str): Generation date written in the
+            configuration, as date or string in ISO format. Today if not
+            specified.
+        executor (concurrent.futures.Executor): Executor running the
+            generation. Default to the event loop default executor.
+        semaphore (asyncio.Semaphore): Semaphore limiting concurrent renders.
+            Default to a semaphore shared by all calls in the event loop,
+            allowing as many concurrent renders as CPU.
+
+    Returns:
+        str: Configuration file content.
+    """
+    from ssl_config import _today
+
+    if date is None:
+        date = _today()
+    elif not isinstance(date, str):
+        date = date.isoformat()
+    key = (server, config, server_version, openssl_version, hsts, ocsp, date)
+
+    loop = _get_running_loop()
+    state = _get_loop_state(loop)
+    in_flight = state['in_flight']
+    try:
+        task = in_flight[key]
+    except KeyError:
+        task = in_flight[key] = _ensure_future(_render(
+            loop, key, executor, semaphore or state['semaphore']))
+
+        def done(_):
+            """
+            Forget the render once done.
+            """
+            del in_flight[key]
+
+            # Mark exception as retrieved, if all callers were cancelled
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+
+    # Cancelling a caller must not cancel the render shared with other callers
+    return await _shield(task)
+
+
+async def agenerate_many(requests, executor=None, max_concurrency=None):
+    """
+    Generate many configurations without blocking the event loop.
+
+    Args:
+        requests (iterable of dict): "ssl_config.generate" keyword arguments
+            of each configuration to generate.
+        executor (concurrent.futures.Executor): Executor running the
+            generation. Default to the event loop default executor.
+        max_concurrency (int): Maximum number of concurrent renders for this
+            batch. Default to the semaphore shared by all calls in the event
+            loop.
+
+    Returns:
+        list of str or ssl_config.UnsupportedConfiguration:
+            Configuration file content, or exception if configuration is
+            unsupported. In the same order as requests.
+    """
+    from ssl_config import UnsupportedConfiguration
+
+    semaphore = _Semaphore(max_concurrency) if max_concurrency else None
+
+    async def generate_one(request):
+        """
+        Generate configuration.
+
+        Args:
+            request (dict): "ssl_config.generate" keyword arguments.
+
+        Returns:
+            str or ssl_config.UnsupportedConfiguration: Configuration file
+                content, or exception if configuration is unsupported.
+        """
+        try:
+            return await agenerate(
+                executor=executor, semaphore=semaphore, **request)
+        except UnsupportedConfiguration as exception:
+            return exception
+
+    return await _gather(*(generate_one(request) for request in requests))
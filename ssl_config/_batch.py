@@ -0,0 +1,74 @@
+"""
+Batch configurations generation.
+"""
+from collections import deque as _deque
+from concurrent.futures import (
+    ProcessPoolExecutor as _ProcessPoolExecutor,
+    ThreadPoolExecutor as _ThreadPoolExecutor)
+from os import cpu_count as _cpu_count
+
+
+def _generate(request):
+    """
+    Generate configuration.
+
+    Args:
+        request (dict): "ssl_config.generate" keyword arguments.
+
+    Returns:
+        str or ssl_config.UnsupportedConfiguration: Configuration file content,
+            or exception if configuration is unsupported.
+    """
+    from ssl_config import generate, UnsupportedConfiguration
+    try:
+        return generate(**request)
+    except UnsupportedConfiguration as exception:
+        return exception
+
+
+def generate_many(requests, executor='process', max_workers=None):
+    """
+    Generate many configurations in parallel.
+
+    Workers load data and compile all templates once on startup.
+
+    Args:
+        requests (iterable of dict): "ssl_config.generate" keyword arguments
+            of each configuration to generate.
+        executor (str): "process" to use a pool of processes, "thread" to use a
+            pool of threads.
+        max_workers (int): Maximum number of workers. Default to the number
+            of CPU.
+
+    Yields:
+        str or ssl_config.UnsupportedConfiguration: Configuration file content,
+            or exception if configuration is unsupported. In the same order
+            as requests.
+    """
+    from ssl_config import warmup
+
+    max_workers = max_workers or _cpu_count() or 1
+    if executor == 'process':
+        # Forked workers inherit the warmed up caches, other workers warm up
+        # on startup
+        warmup(freeze=False)
+        pool = _ProcessPoolExecutor(
+            max_workers, initializer=warmup, initargs=(False,))
+    elif executor == 'thread':
+        warmup(freeze=False)
+        pool = _ThreadPoolExecutor(max_workers)
+    else:
+        raise ValueError('Unsupported executor: %s' % executor)
+
+    # Limit pending requests to not consume the whole requests iterable
+    window = max_workers * 4
+
+    with pool:
+        pending = _deque()
+        for request in requests:
+            pending.append(pool.submit(_generate, request))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
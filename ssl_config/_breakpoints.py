@@ -0,0 +1,202 @@
+"""
+Versions breakpoints extracted from templates.
+
+Templates only compare versions with the "minver", "minpatchver" and
+"sameminorver" helpers. Versions between two consecutive breakpoints give the
+same comparisons results, and so the same rendered template (Except for the
+version text itself).
+"""
+from bisect import bisect_right as _bisect_right
+from re import compile as _compile, DOTALL as _DOTALL
+
+from ssl_config._versions import Version as _Version
+
+#: Handlebars tag content
+_TAG = _compile(r'{{~?(.*?)~?}}', _DOTALL)
+
+#: Handlebars expression tokens: Strings, parenthesis and others
+_TOKEN = _compile(r'"[^"]*"|\'[^\']*\'|[()]|[^\s()]+')
+
+#: Templates state paths that contains versions
+_VERSIONS_PATH = _compile(r'(?:^|[./])(serverVersion|opensslVersion|link)$')
+
+#: Versions written as is by Handlebars, even in escaped expressions
+_SAFE_VERSION = _compile(r'[0-9A-Za-z.+_~-]+$')
+
+#: Breakpoints kind, by version path last segment. The "link" contains the
+#: server version, but is never compared
+_KINDS = dict(
+    serverVersion='server_version', opensslVersion='openssl_version',
+    link=None)
+
+#: Helpers comparing a version (Second argument) to a literal version (First
+#: argument)
+_VERSIONS_HELPERS = ('minver', 'minpatchver', 'sameminorver')
+
+
+def _helper_breakpoints(helper, literal):
+    """
+    Get breakpoints of a versions helper call.
+
+    Args:
+        helper (str): Helper name.
+        literal (str): Helper literal version argument.
+
+    Returns:
+        list of str: Minimum versions (Lower than any prerelease) where the
+            helper result may change.
+    """
+    breakpoints = []
+    if helper in ('minver', 'minpatchver'):
+        breakpoints.append(literal)
+    if helper in ('sameminorver', 'minpatchver'):
+        version = _Version(literal)
+        breakpoints.append('%d.%d' % (version.major, version.minor))
+        breakpoints.append('%d.%d' % (version.major, version.minor + 1))
+    return breakpoints
+
+
+def _analyze_call(call, breakpoints):
+    """
+    Analyze an helper call, or a block tag.
+
+    Args:
+        call (list of str): Helper name and arguments tokens. Subexpressions
+            arguments are replaced by None.
+        breakpoints (dict): Breakpoints by kind, updated in place.
+
+    Returns:
+        bool: False if a version is used in a way that does not allow
+            equivalence classes.
+    """
+    matches = [_VERSIONS_PATH.search(token) if token else None
+               for token in call]
+    if not any(matches):
+        return True
+
+    helper, *args = call
+    if (helper not in _VERSIONS_HELPERS or len(args) != 2 or matches[1] or
+            not matches[2] or not _KINDS[matches[2].group(1)] or
+            args[0] is None or args[0][0] not in '"\''):
+        return False
+
+    breakpoints[_KINDS[matches[2].group(1)]].update(
+        _helper_breakpoints(helper, args[0][1:-1]))
+    return True
+
+
+def analyze(source):
+    """
+    Extract versions breakpoints from a template.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        dict or None: Set of breakpoints versions, by kind ("server_version",
+            "openssl_version"). None if the template uses versions in a way
+            that does not allow equivalence classes.
+    """
+    breakpoints = dict(server_version=set(), openssl_version=set())
+
+    for match in _TAG.finditer(source):
+        content = match.group(1).strip('{}&').strip()
+        if content.startswith('!'):
+            # Comment
+            continue
+
+        tokens = _TOKEN.findall(content.lstrip('#^'))
+        if len(tokens) == 1:
+            # Versions are only written as is
+            continue
+
+        stack = [[]]
+        for token in tokens:
+            if token == '(':
+                stack.append([])
+            elif token == ')' and len(stack) > 1:
+                call = stack.pop()
+                if not _analyze_call(call, breakpoints):
+                    return None
+                stack[-1].append(None)
+            else:
+                stack[-1].append(token)
+
+        if len(stack) != 1 or not _analyze_call(stack[0], breakpoints):
+            return None
+
+    return breakpoints
+
+
+def sort_versions(versions):
+    """
+    Sort breakpoints versions.
+
+    Args:
+        versions (iterable of str): Versions.
+
+    Returns:
+        tuple of str: Sorted versions.
+    """
+    return tuple(sorted(
+        set(versions), key=lambda version: _Version(version, pre=True)))
+
+
+def thresholds(breakpoints):
+    """
+    Get comparable breakpoints.
+
+    Args:
+        breakpoints (tuple of str): Sorted breakpoints versions.
+
+    Returns:
+        list of ssl_config._versions.Version: Breakpoints versions, lower
+            than any of their prereleases.
+    """
+    return [_Version(breakpoint, pre=True) for breakpoint in breakpoints]
+
+
+def version_class(versions_thresholds, version):
+    """
+    Get the equivalence class of a version.
+
+    Args:
+        versions_thresholds (list of ssl_config._versions.Version):
+            Comparable breakpoints, from "thresholds".
+        version (str): Version.
+
+    Returns:
+        int: Equivalence class index. Versions with the same index are
+            equivalent.
+    """
+    return _bisect_right(versions_thresholds, _Version(version))
+
+
+def substitutable(version):
+    """
+    Check if a version can be substituted to its placeholder in a rendered
+    template.
+
+    Args:
+        version (str): Version.
+
+    Returns:
+        bool: True if the version text is never escaped.
+    """
+    return _SAFE_VERSION.match(version) is not None
+
+
+class VersionPlaceholder(str):
+    """
+    Placeholder text written in place of a version when rendering a template,
+    that behaves as this version with versions helpers.
+
+    Args:
+        placeholder (str): Placeholder text.
+        version (str): Version.
+    """
+
+    def __new__(cls, placeholder, version):
+        self = str.__new__(cls, placeholder)
+        self.version = version
+        return self
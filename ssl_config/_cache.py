@@ -0,0 +1,97 @@
+"""
+In-memory caches.
+"""
+# "_thread" is a built-in module, unlike "threading"
+from _thread import allocate_lock as _allocate_lock
+
+
+class LRUCache:
+    """
+    Bounded cache that evicts least recently used entries first.
+
+    The cache is thread-safe.
+
+    Args:
+        maxsize (int): Maximum number of entries.
+    """
+
+    def __init__(self, maxsize=128):
+        self._maxsize = maxsize
+        # Relies on "dict" insertion order, and avoids importing "collections"
+        # on package import
+        self._entries = dict()
+        self._lock = _allocate_lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key (hashable): Key.
+            default: Value to return if key is not cached.
+
+        Returns:
+            object: Cached value or default.
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Cache a value.
+
+        Args:
+            key (hashable): Key.
+            value: Value.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self._maxsize:
+                del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, key):
+        """
+        Remove a cached value.
+
+        Args:
+            key (hashable): Key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all cached values and reset counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Cache statistics.
+
+        Returns:
+            dict: hits, misses, size and maxsize.
+        """
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses,
+                        size=len(self._entries), maxsize=self._maxsize)
@@ -0,0 +1,109 @@
+"""
+Capabilities of server software versions: TLS 1.3 support and usable
+configuration levels, classified without rendering templates.
+"""
+from types import MappingProxyType as _MappingProxyType
+
+from ssl_config._breakpoints import (
+    sort_versions as _sort_versions, thresholds as _thresholds,
+    version_class as _version_class)
+
+
+def build(configs, index, config_names):
+    """
+    Build the capabilities table.
+
+    Args:
+        configs (collections.abc.Mapping): Server software configurations.
+        index (types.MappingProxyType): Guidelines index. See
+            "ssl_config._index.build".
+        config_names (tuple of str): Configurations names.
+
+    Returns:
+        types.MappingProxyType: Entries, by server name. Entries are tuples
+            of TLS 1.3 support comparable breakpoints of server and OpenSSL
+            versions (None if the server does not support TLS 1.3), and of
+            capabilities without and with TLS 1.3 support. Capabilities are
+            read-only mappings with "tls13" support and usable "configs"
+            names.
+    """
+    openssl_tls13 = configs['openssl'].get('tls13')
+    table = dict()
+    for server, server_cfg in configs.items():
+        if server == 'openssl':
+            continue
+
+        capabilities = tuple(_MappingProxyType(dict(
+            tls13=tls13, configs=tuple(
+                config for config in config_names
+                if index[(server, config, tls13)]['protocols'])))
+            for tls13 in (False, True))
+
+        tls13_ver = server_cfg.get('tls13')
+        if tls13_ver and openssl_tls13:
+            breakpoints = (_thresholds(_sort_versions((tls13_ver,))),
+                           _thresholds(_sort_versions((openssl_tls13,))))
+        else:
+            breakpoints = None
+
+        table[server] = breakpoints, capabilities
+
+    return _MappingProxyType(table)
+
+
+def classify(table, configs, hosts):
+    """
+    Classify servers versions.
+
+    Args:
+        table (types.MappingProxyType): Capabilities table, from "build".
+        configs (collections.abc.Mapping): Server software configurations.
+        hosts (iterable of tuple): Server name, server version and OpenSSL
+            version of each host. Versions may be None for latest.
+
+    Returns:
+        list of types.MappingProxyType: Capabilities of each host, in the same
+            order as hosts.
+    """
+    latest_openssl = configs['openssl']['latestVersion']
+    results = []
+    append = results.append
+
+    # Inventories contain many hosts with the same software versions:
+    # Classify each host and each version once
+    seen = dict()
+    server_classes = dict()
+    openssl_classes = dict()
+
+    for host in hosts:
+        host = tuple(host)
+        try:
+            append(seen[host])
+            continue
+        except KeyError:
+            pass
+
+        server, server_ver, openssl_ver = host
+        breakpoints, capabilities = table[server]
+        tls13 = False
+        if breakpoints is not None:
+            key = server, server_ver
+            try:
+                tls13 = server_classes[key]
+            except KeyError:
+                tls13 = server_classes[key] = bool(_version_class(
+                    breakpoints[0],
+                    server_ver or configs[server]['latestVersion']))
+
+            if tls13:
+                try:
+                    tls13 = openssl_classes[openssl_ver]
+                except KeyError:
+                    tls13 = openssl_classes[openssl_ver] = bool(
+                        _version_class(breakpoints[1],
+                                       openssl_ver or latest_openssl))
+
+        seen[host] = capabilities[tls13]
+        append(capabilities[tls13])
+
+    return results
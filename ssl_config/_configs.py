@@ -0,0 +1,90 @@
+"""
+Mozilla "configs.js" server software capabilities table.
+"""
+from collections.abc import Mapping as _Mapping
+from json import loads as _loads
+from types import MappingProxyType as _MappingProxyType
+
+
+def parse(content):
+    """
+    Parse "configs.js" content.
+
+    Args:
+        content (str): "configs.js" content.
+
+    Returns:
+        dict: configurations.
+    """
+    lines = []
+    for line in content.splitlines():
+        # Remove comments
+        line = line.split('//')[0].strip()
+
+        try:
+            key, value = line.split(':', 1)
+        except ValueError:
+            pass
+        else:
+            line = '"%s":%s' % (key.strip(), value.strip())
+
+        # Filter lines
+        if line and not line.startswith('const '):
+            lines.append(line)
+
+    content = ''.join(lines)
+    for text, rep_text in (
+            # Remove JS variables
+            ('noSupportedVersion', 'null'),
+            ('module.exports = ', ''),
+            # Fix JSON syntax
+            (',}', '}'), ("'", '"'), (';', '')):
+        content = content.replace(text, rep_text)
+
+    return _loads(content)
+
+
+def freeze(value):
+    """
+    Recursively convert a JSON like value to read-only types.
+
+    Args:
+        value: Value.
+
+    Returns:
+        object: Value with "dict" converted to read-only mappings and "list"
+            converted to tuples.
+    """
+    if isinstance(value, dict):
+        return _MappingProxyType(
+            {key: freeze(item) for key, item in value.items()})
+    elif isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ServerConfigs(_Mapping):
+    """
+    Read-only view over the supported pieces of software configurations.
+
+    Always reflects the current "configs.js" file content.
+
+    Args:
+        get_configs (function): Function returning current configurations.
+    """
+
+    def __init__(self, get_configs):
+        self._get_configs = get_configs
+
+    def __getitem__(self, key):
+        return self._get_configs()[key]
+
+    def __iter__(self):
+        return iter(self._get_configs())
+
+    def __len__(self):
+        return len(self._get_configs())
+
+    def __repr__(self):
+        return '%s(%r)' % (
+            self.__class__.__name__, dict(self._get_configs()))
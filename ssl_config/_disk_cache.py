@@ -0,0 +1,256 @@
+"""
+Persistent on-disk cache, shared between processes.
+"""
+from hashlib import sha256 as _sha256
+from os import (
+    environ as _environ, getpid as _getpid, makedirs as _makedirs,
+    replace as _replace, rmdir as _rmdir, scandir as _scandir,
+    unlink as _unlink, utime as _utime)
+from os.path import (
+    dirname as _dirname, expanduser as _expanduser, join as _join)
+from _thread import allocate_lock as _allocate_lock, get_ident as _get_ident
+from time import time as _time
+
+#: Default maximum size in bytes
+MAXSIZE = 64 * 1024 * 1024
+
+#: Entries format version, part of all keys
+_FORMAT = 1
+
+#: Number of shards directories. Shards are evicted independently
+_SHARDS = 256
+
+#: Age in seconds after which a temporary file is considered abandoned by a
+#: crashed process
+_TMP_MAX_AGE = 3600
+
+
+def default_path():
+    """
+    Default cache directory, following the XDG base directory specification.
+
+    Returns:
+        str: "$XDG_CACHE_HOME/ssl_config", or "~/.cache/ssl_config" if
+            "XDG_CACHE_HOME" is not set.
+    """
+    return _join(_environ.get('XDG_CACHE_HOME') or _expanduser(
+        _join('~', '.cache')), 'ssl_config')
+
+
+class DiskCache:
+    """
+    Bounded content-addressed cache of texts in a directory, that evicts least
+    recently used entries first.
+
+    The cache can be used concurrently by many threads and processes: Entries
+    are written atomically, and entries removed by another process are
+    cache misses. Cache failures, like a read-only directory, are cache misses
+    and never errors.
+
+    Entries are distributed in shards directories by key digest. Each shard
+    is bounded to an equal part of the maximum size, and is evicted after
+    writes to it.
+
+    Args:
+        path (str): Cache directory. Default to "default_path()".
+        maxsize (int): Approximative maximum size in bytes.
+    """
+
+    def __init__(self, path=None, maxsize=MAXSIZE):
+        self._path = path or default_path()
+        self._maxsize = maxsize
+        self._lock = _allocate_lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        """
+        Cache directory.
+
+        Returns:
+            str: Path.
+        """
+        return self._path
+
+    def _entry_path(self, key):
+        """
+        Get the path of an entry.
+
+        Args:
+            key (tuple): Key, with a stable representation.
+
+        Returns:
+            str: Entry path.
+        """
+        digest = _sha256(repr((_FORMAT, key)).encode()).hexdigest()
+        return _join(self._path, digest[:2], digest)
+
+    def _count(self, hit):
+        """
+        Update counters.
+
+        Args:
+            hit (bool): True for a hit, False for a miss.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key (tuple): Key, with a stable representation.
+            default: Value to return if key is not cached.
+
+        Returns:
+            str or object: Cached value or default.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = file.read().decode()
+        except (OSError, UnicodeDecodeError):
+            self._count(False)
+            return default
+
+        # Mark the entry as recently used
+        try:
+            _utime(path)
+        except OSError:
+            pass
+        self._count(True)
+        return value
+
+    def set(self, key, value):
+        """
+        Cache a value.
+
+        Args:
+            key (tuple): Key, with a stable representation.
+            value (str): Value.
+        """
+        path = self._entry_path(key)
+        tmp_path = '%s.%d-%d.tmp' % (path, _getpid(), _get_ident())
+        try:
+            try:
+                file = open(tmp_path, 'wb')
+            except FileNotFoundError:
+                _makedirs(_dirname(path), exist_ok=True)
+                file = open(tmp_path, 'wb')
+            with file:
+                file.write(value.encode())
+            _replace(tmp_path, path)
+        except OSError:
+            try:
+                _unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self._evict(_dirname(path), path)
+
+    def _evict(self, shard, keep):
+        """
+        Evict least recently used entries of a shard, until it fits in its
+        part of the maximum size.
+
+        Args:
+            shard (str): Shard directory.
+            keep (str): Path of the entry to not evict.
+        """
+        entries = []
+        size = 0
+        now = _time()
+        try:
+            with _scandir(shard) as scanner:
+                for entry in scanner:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.name.endswith('.tmp'):
+                        if now - stat.st_mtime > _TMP_MAX_AGE:
+                            entries.append((0, entry.path, stat.st_size))
+                        continue
+                    size += stat.st_size
+                    if entry.path != keep:
+                        entries.append(
+                            (stat.st_mtime, entry.path, stat.st_size))
+        except OSError:
+            return
+
+        entries.sort()
+        max_shard_size = self._maxsize // _SHARDS
+        for mtime, path, entry_size in entries:
+            if mtime and size <= max_shard_size:
+                break
+            try:
+                _unlink(path)
+            except OSError:
+                continue
+            if mtime:
+                size -= entry_size
+
+    def _scan(self):
+        """
+        List all entries.
+
+        Yields:
+            os.DirEntry: Entries, including temporary files.
+        """
+        try:
+            with _scandir(self._path) as shards:
+                shards = [shard.path for shard in shards if shard.is_dir()]
+        except OSError:
+            return
+
+        for shard in shards:
+            try:
+                with _scandir(shard) as scanner:
+                    for entry in scanner:
+                        yield entry
+            except OSError:
+                continue
+
+    def clear(self):
+        """
+        Remove all cached values and reset counters.
+        """
+        shards = set()
+        for entry in self._scan():
+            shards.add(_dirname(entry.path))
+            try:
+                _unlink(entry.path)
+            except OSError:
+                pass
+        for shard in shards:
+            try:
+                _rmdir(shard)
+            except OSError:
+                pass
+
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Cache statistics.
+
+        Returns:
+            dict: hits, misses, size and maxsize, in bytes.
+        """
+        size = 0
+        for entry in self._scan():
+            try:
+                size += entry.stat().st_size
+            except OSError:
+                continue
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, size=size,
+                        maxsize=self._maxsize)
@@ -0,0 +1,299 @@
+"""
+Export of all supported configurations to an archive or a static directory.
+"""
+from contextlib import contextmanager as _contextmanager
+from os.path import dirname as _dirname, join as _join
+
+#: Export formats, by output file extension
+_EXTENSIONS = (('.tar.gz', 'tar.gz'), ('.tgz', 'tar.gz'), ('.tar', 'tar'),
+               ('.zip', 'zip'))
+
+#: Export formats
+FORMATS = ('dir', 'tar', 'tar.gz', 'zip')
+
+#: Index file name
+INDEX = 'index.json'
+
+
+def _previous(version):
+    """
+    Get a version lower than a version, by decrementing its last non zero part.
+
+    Args:
+        version (str): Version.
+
+    Returns:
+        str or None: Lower version, None if there is no lower version.
+    """
+    from ssl_config._versions import Version
+
+    parsed = Version(version)
+    parts = [parsed.major, parsed.minor, parsed.patch]
+    for index in reversed(range(3)):
+        if parts[index]:
+            parts[index] -= 1
+            return '.'.join(str(part) for part in parts[:index + 1])
+    return None
+
+
+def _versions(breakpoints, latest):
+    """
+    Get a version of each versions equivalence class, up to the latest version.
+
+    The breakpoint starting a class represents it, the version just below the
+    first breakpoint represents the first class, and the latest version
+    represents its own class.
+
+    Args:
+        breakpoints (tuple of str): Sorted breakpoints versions.
+        latest (str): Latest version.
+
+    Returns:
+        list of str: Versions.
+    """
+    from ssl_config._breakpoints import thresholds, version_class
+
+    versions_thresholds = thresholds(breakpoints)
+    latest_class = version_class(versions_thresholds, latest)
+
+    versions = dict()
+    for version in [_previous(breakpoints[0]) if breakpoints else None] + list(
+            breakpoints):
+        if version is None:
+            continue
+        index = version_class(versions_thresholds, version)
+        if index < latest_class:
+            versions.setdefault(index, version)
+    versions[latest_class] = latest
+
+    return [versions[index] for index in sorted(versions)]
+
+
+def matrix(date=None):
+    """
+    Get generation parameters of all supported servers and configurations,
+    with a version of each versions equivalence class.
+
+    Args:
+        date (str): Generation date in ISO format.
+
+    Returns:
+        list of dict: "ssl_config.generate" keyword arguments.
+    """
+    from ssl_config import _get, _get_configs, version_breakpoints
+
+    cfg = _get_configs()
+    requests = []
+    for server in _get('SERVERS'):
+        breakpoints = version_breakpoints(server) or dict(
+            server_version=(), openssl_version=())
+        server_versions = _versions(
+            breakpoints['server_version'], cfg[server]['latestVersion'])
+        openssl_versions = _versions(
+            breakpoints['openssl_version'], cfg['openssl']['latestVersion'])
+
+        for config in _get('CONFIGS'):
+            for server_version in server_versions:
+                for openssl_version in openssl_versions:
+                    requests.append(dict(
+                        server=server, config=config,
+                        server_version=server_version,
+                        openssl_version=openssl_version, date=date))
+    return requests
+
+
+def _path(request):
+    """
+    Get the path of a configuration in the export.
+
+    Args:
+        request (dict): "ssl_config.generate" keyword arguments.
+
+    Returns:
+        str: Relative path.
+    """
+    return ('%(server)s/%(server_version)s/%(openssl_version)s/'
+            '%(config)s.conf') % request
+
+
+@_contextmanager
+def _dir_writer(path, _):
+    """
+    Write files to a directory.
+
+    Args:
+        path (str): Directory path.
+        _: Ignored modification time.
+
+    Yields:
+        function: Function writing a file from its relative path and content.
+    """
+    from os import makedirs
+    from ssl_config._output import write
+
+    def add(name, content):
+        file_path = _join(path, *name.split('/'))
+        makedirs(_dirname(file_path), exist_ok=True)
+        write(file_path, content.decode())
+
+    makedirs(path, exist_ok=True)
+    yield add
+
+
+@_contextmanager
+def _tar_writer(fileobj, mtime, compression=''):
+    """
+    Write files to a streamed tar archive.
+
+    Args:
+        fileobj (io.BufferedIOBase): Output stream.
+        mtime (int): Files modification time.
+        compression (str): "" or "gz".
+
+    Yields:
+        function: Function writing a file from its relative path and content.
+    """
+    from io import BytesIO
+    from tarfile import open as open_tar, TarInfo
+
+    with open_tar(fileobj=fileobj, mode='w|' + compression) as archive:
+
+        def add(name, content):
+            info = TarInfo(name)
+            info.size = len(content)
+            info.mtime = mtime
+            info.mode = 0o644
+            archive.addfile(info, BytesIO(content))
+
+        yield add
+
+
+@_contextmanager
+def _zip_writer(fileobj, mtime):
+    """
+    Write files to a zip archive. The output stream does not need to be
+    seekable.
+
+    Args:
+        fileobj (io.BufferedIOBase): Output stream.
+        mtime (int): Files modification time.
+
+    Yields:
+        function: Function writing a file from its relative path and content.
+    """
+    from time import gmtime
+    from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+    date_time = gmtime(mtime)[:6]
+    with ZipFile(fileobj, 'w', ZIP_DEFLATED) as archive:
+
+        def add(name, content):
+            info = ZipInfo(name, date_time)
+            info.compress_type = ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, content)
+
+        yield add
+
+
+def guess_format(path):
+    """
+    Guess the export format from the output path.
+
+    Args:
+        path (str): Output path.
+
+    Returns:
+        str: Format, "dir" if the path has no archive extension.
+    """
+    for extension, export_format in _EXTENSIONS:
+        if path.endswith(extension):
+            return export_format
+    return 'dir'
+
+
+def export(path, export_format=None, date=None, executor='process',
+           max_workers=None):
+    """
+    Export all supported configurations, with a version of each versions
+    equivalence class, to a tar or zip archive or to a static directory tree.
+
+    Configurations are rendered in parallel and written as soon as rendered,
+    in "<server>/<server_version>/<openssl_version>/<config>.conf" files. An
+    "index.json" file lists exported configurations. Archives are streamed
+    without temporary files.
+
+    Args:
+        path (str or io.BufferedIOBase): Output directory or archive path, or
+            binary stream to write an archive to.
+        export_format (str): "dir", "tar", "tar.gz" or "zip". Guessed from
+            the path extension if not specified.
+        date (datetime.date or str): Generation date written in the
+            configurations, as date or string in ISO format. Today if not
+            specified.
+        executor (str): "process" or "thread". See "ssl_config.generate_many".
+        max_workers (int): Maximum number of workers.
+
+    Returns:
+        dict: Index content.
+
+    Raises:
+        ValueError: Invalid date, or unsupported or missing format.
+    """
+    from calendar import timegm
+    from datetime import date as date_type
+    from json import dumps
+    from ssl_config import (
+        _get, _today, generate_many, UnsupportedConfiguration)
+
+    if date is None:
+        date = _today()
+    elif not isinstance(date, str):
+        date = date.isoformat()
+    try:
+        mtime = timegm(date_type.fromisoformat(date).timetuple())
+    except ValueError:
+        raise ValueError('Invalid date, YYYY-MM-DD expected: %s' % date)
+
+    if export_format is None:
+        if not isinstance(path, str):
+            raise ValueError('Format is required to export to a stream')
+        export_format = guess_format(path)
+    if export_format not in FORMATS:
+        raise ValueError('Unsupported format: %s' % export_format)
+
+    requests = matrix(date)
+    index = dict(
+        version=_get('__version__'),
+        guidelines_version=_get('GUIDELINES_VERSION'), date=date,
+        configurations=[], unsupported=[])
+
+    if export_format == 'dir':
+        writer = _dir_writer(path, mtime)
+    else:
+        fileobj = open(path, 'wb') if isinstance(path, str) else path
+        if export_format == 'zip':
+            writer = _zip_writer(fileobj, mtime)
+        else:
+            writer = _tar_writer(fileobj, mtime, export_format[4:])
+
+    try:
+        with writer as add:
+            for request, output in zip(requests, generate_many(
+                    requests, executor, max_workers)):
+                entry = request.copy()
+                del entry['date']
+                if isinstance(output, UnsupportedConfiguration):
+                    index['unsupported'].append(entry)
+                    continue
+
+                entry['path'] = _path(request)
+                add(entry['path'], output.encode())
+                index['configurations'].append(entry)
+
+            add(INDEX, dumps(index, indent=1, sort_keys=True).encode())
+    finally:
+        if export_format != 'dir' and isinstance(path, str):
+            fileobj.close()
+
+    return index
@@ -4,6 +4,8 @@ Pybars3 helpers, called from Handlebars templates.
 This is a Pybars3 port of original Mozilla Handlebars.js helpers from
 "ssl-config-generator/src/js/helpers".
 """
+from functools import lru_cache as _lru_cache
+
 from ssl_config._versions import Version as _Version
 
 
@@ -79,7 +81,7 @@ def minpatchver(_, minimumver, curver):
     Returns:
         bool:
     """
-    return sameminorver(_, minimumver, curver) and minver(_, minimumver, curver)
+    return _minpatchver(minimumver, _unwrap(curver))
 
 
 def minver(_, minimumver, curver):
@@ -95,7 +97,7 @@ def minver(_, minimumver, curver):
     Returns:
         bool: True if fir minimum requirement.
     """
-    return _Version(curver) >= _Version(minimumver, pre=True)
+    return _minver(minimumver, _unwrap(curver))
 
 
 def replace(_, string, what_to_replace, replacement):
@@ -140,9 +142,7 @@ def sameminorver(_, minorver, curver):
     Returns:
         bool: True if same minor version.
     """
-    min_ver = _Version(minorver)
-    ver = _Version(curver)
-    return min_ver.major == ver.major and min_ver.minor == ver.minor
+    return _sameminorver(minorver, _unwrap(curver))
 
 
 def split(_, string, splitter):
@@ -160,6 +160,48 @@ def split(_, string, splitter):
     return string.split(splitter)
 
 
+def _unwrap(version):
+    """
+    Get the version represented by a version placeholder.
+
+    Args:
+        version (str or ssl_config._breakpoints.VersionPlaceholder): Version.
+
+    Returns:
+        str: Version.
+    """
+    return getattr(version, 'version', version)
+
+
+# Versions helpers results are cached since templates call them many times with
+# the same arguments. Caches are cleared by "ssl_config.clear_cache".
+
+@_lru_cache(maxsize=1024)
+def _minpatchver(minimumver, curver):
+    """
+    See "minpatchver".
+    """
+    return _sameminorver(minimumver, curver) and _minver(minimumver, curver)
+
+
+@_lru_cache(maxsize=1024)
+def _minver(minimumver, curver):
+    """
+    See "minver".
+    """
+    return _Version(curver) >= _Version(minimumver, pre=True)
+
+
+@_lru_cache(maxsize=1024)
+def _sameminorver(minorver, curver):
+    """
+    See "sameminorver".
+    """
+    min_ver = _Version(minorver)
+    ver = _Version(curver)
+    return min_ver.major == ver.major and min_ver.minor == ver.minor
+
+
 #: Helpers mapping to pass to Pybars.
 HELPERS = {name: function for name, function in locals().items()
            if not name.startswith('_')}
@@ -0,0 +1,76 @@
+"""
+Precomputed guidelines index: Ciphers, protocols and DH parameters of each
+server software and configuration level.
+"""
+from os.path import join as _join
+from types import MappingProxyType as _MappingProxyType
+
+
+def _dh_command(dh_param_size, data_dir):
+    """
+    Select the command to generate the DH parameters files.
+
+    Args:
+        dh_param_size (int or None): DH parameters size.
+        data_dir (str): Data directory containing "ffdhe" files.
+
+    Returns:
+        str: Command.
+    """
+    if not dh_param_size:
+        return ''
+    elif dh_param_size >= 2048:
+        return 'cat ' + _join(data_dir, 'ffdhe%d.txt' % dh_param_size)
+    return 'openssl dhparam %d' % dh_param_size
+
+
+def build(guidelines, configs, data_dir):
+    """
+    Build the guidelines index.
+
+    Args:
+        guidelines (collections.abc.Mapping): Guidelines.
+        configs (collections.abc.Mapping): Server software configurations.
+        data_dir (str): Data directory containing "ffdhe" files.
+
+    Returns:
+        types.MappingProxyType: Read-only entries, by server name,
+            configuration name and TLS 1.3 support. Entries contain
+            "ciphers" and "protocols" tuples, "uses_dhe" bool, "dh_param_size"
+            and "dh_command".
+    """
+    index = dict()
+    for config, ssc in guidelines['configurations'].items():
+        dh_param_size = ssc.get('dh_param_size')
+        dh_command = _dh_command(dh_param_size, data_dir)
+
+        all_protocols = tuple(ssc['tls_versions'])
+        protocols = {
+            True: all_protocols,
+            False: tuple(protocol for protocol in all_protocols
+                         if protocol != 'TLSv1.3')}
+
+        for server, server_cfg in configs.items():
+            if server == 'openssl':
+                continue
+
+            # Remove ciphers that are unsupported by software
+            ciphers = ssc['ciphers'][server_cfg.get('cipherFormat', 'openssl')]
+            supported_ciphers = server_cfg.get('supportedCiphers')
+            if supported_ciphers:
+                supported_ciphers = frozenset(supported_ciphers)
+                ciphers = tuple(cipher for cipher in ciphers
+                                if cipher in supported_ciphers)
+            else:
+                ciphers = tuple(ciphers)
+
+            uses_dhe = any(cipher.startswith('DHE') or '_DHE_' in cipher
+                           for cipher in ciphers)
+
+            for tls13 in (True, False):
+                index[(server, config, tls13)] = _MappingProxyType(dict(
+                    ciphers=ciphers, protocols=protocols[tls13],
+                    uses_dhe=uses_dhe, dh_param_size=dh_param_size,
+                    dh_command=dh_command))
+
+    return _MappingProxyType(index)
@@ -0,0 +1,374 @@
+"""
+Configurations generation from a hosts inventory, rendering each unique host
+profile once.
+"""
+from collections import deque as _deque
+from contextlib import contextmanager as _contextmanager
+from os import makedirs as _makedirs
+from os.path import (
+    dirname as _dirname, isabs as _isabs, join as _join, normpath as _normpath,
+    pardir as _pardir, sep as _sep)
+
+#: Inventory formats, by inventory file extension
+_EXTENSIONS = (('.csv', 'csv'), ('.jsonl', 'jsonl'), ('.ndjson', 'jsonl'))
+
+#: Inventory formats
+FORMATS = ('csv', 'jsonl')
+
+#: Inventory fields. Only "hostname" and "server" are required
+FIELDS = ('hostname', 'server', 'server_version', 'openssl_version', 'config',
+          'hsts', 'ocsp')
+
+#: Default output file path pattern, relative to the output directory
+PATTERN = '%(hostname)s.conf'
+
+#: Boolean values texts in CSV inventories
+_BOOLEANS = dict(
+    true=True, yes=True, on=True, false=False, no=False, off=False)
+_BOOLEANS.update({'1': True, '0': False})
+
+#: Maximum number of rendered profiles kept in memory
+_MAX_PROFILES = 1024
+
+#: Maximum number of pending file writes
+_MAX_PENDING = 256
+
+
+def guess_format(path):
+    """
+    Guess the inventory format from the inventory file extension.
+
+    Args:
+        path (str): Inventory file path.
+
+    Returns:
+        str: Inventory format.
+
+    Raises:
+        ValueError: Unknown extension.
+    """
+    for extension, inventory_format in _EXTENSIONS:
+        if path.lower().endswith(extension):
+            return inventory_format
+    raise ValueError('Unable to guess the inventory format of "%s"' % path)
+
+
+@_contextmanager
+def _open(inventory):
+    """
+    Open the inventory.
+
+    Args:
+        inventory (str or file-like object): Inventory file path or text file
+            object.
+
+    Yields:
+        file-like object: Text file object.
+    """
+    if hasattr(inventory, 'read'):
+        yield inventory
+    else:
+        with open(inventory, 'rt', newline='') as file:
+            yield file
+
+
+def _read_rows(file, inventory_format):
+    """
+    Read inventory rows.
+
+    Args:
+        file (file-like object): Inventory text file object.
+        inventory_format (str): Inventory format.
+
+    Yields:
+        tuple: Line number and row dict.
+    """
+    if inventory_format == 'csv':
+        from csv import DictReader
+        reader = DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+
+    elif inventory_format == 'jsonl':
+        from json import loads
+        for line_num, line in enumerate(file, 1):
+            if line.strip():
+                row = loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(
+                        'Inventory line %d: JSON object expected' % line_num)
+                yield line_num, row
+
+    else:
+        raise ValueError('Unsupported inventory format: %s' % inventory_format)
+
+
+def _boolean(value, line_num, field):
+    """
+    Get a boolean field value.
+
+    Args:
+        value (bool or str or None): Value.
+        line_num (int): Inventory line number.
+        field (str): Field name.
+
+    Returns:
+        bool: Value, True if not specified.
+    """
+    if value is None or value == '':
+        return True
+    elif isinstance(value, bool):
+        return value
+    try:
+        return _BOOLEANS[str(value).strip().lower()]
+    except KeyError:
+        raise ValueError('Inventory line %d: invalid "%s" value: %r' % (
+            line_num, field, value))
+
+
+def read(inventory, inventory_format=None):
+    """
+    Read a hosts inventory.
+
+    The inventory is read lazily, one host at a time.
+
+    Args:
+        inventory (str or file-like object): Inventory file path or text file
+            object. CSV inventories have a header line with fields names.
+            JSONL inventories have a JSON object by line. See "FIELDS".
+        inventory_format (str): Inventory format, "csv" or "jsonl". Guessed
+            from the inventory file extension if not specified.
+
+    Yields:
+        dict: Host, with all "FIELDS". Versions are None if not specified.
+
+    Raises:
+        ValueError: Invalid inventory.
+    """
+    if inventory_format is None:
+        inventory_format = guess_format(str(
+            getattr(inventory, 'name', '') if hasattr(inventory, 'read')
+            else inventory))
+
+    with _open(inventory) as file:
+        for line_num, row in _read_rows(file, inventory_format):
+            hostname = row.get('hostname')
+            if not hostname or hostname in ('.', '..') or '/' in hostname or (
+                    '\\' in hostname):
+                raise ValueError('Inventory line %d: invalid hostname: %r' % (
+                    line_num, hostname))
+            if not row.get('server'):
+                raise ValueError(
+                    'Inventory line %d: "server" is required' % line_num)
+
+            yield dict(
+                hostname=hostname, server=row['server'],
+                server_version=row.get('server_version') or None,
+                openssl_version=row.get('openssl_version') or None,
+                config=row.get('config') or 'intermediate',
+                hsts=_boolean(row.get('hsts'), line_num, 'hsts'),
+                ocsp=_boolean(row.get('ocsp'), line_num, 'ocsp'))
+
+
+def check_pattern(pattern):
+    """
+    Check an output file path pattern.
+
+    Args:
+        pattern (str): Output file path pattern. See "render_inventory".
+
+    Raises:
+        ValueError: Invalid pattern.
+    """
+    try:
+        pattern % dict(
+            hostname='host', server='nginx', server_version='1.0.0',
+            openssl_version='1.0.0', config='intermediate', hsts=True,
+            ocsp=True)
+    except (KeyError, TypeError, ValueError) as exception:
+        raise ValueError('Invalid output file path pattern "%s": %s%s' % (
+            pattern, 'unknown field ' if isinstance(exception, KeyError)
+            else '', exception))
+
+
+def _output_path(output_dir, pattern, host):
+    """
+    Get the output file path of a host.
+
+    Args:
+        output_dir (str): Output directory.
+        pattern (str): Output file path pattern. See "render_inventory".
+        host (dict): Host.
+
+    Returns:
+        str: Output file path.
+
+    Raises:
+        ValueError: Path outside of the output directory.
+    """
+    path = _normpath(pattern % host)
+    if _isabs(path) or path == _pardir or path.startswith(_pardir + _sep):
+        raise ValueError(
+            'Inventory host %s: output file path outside of the output '
+            'directory: %s' % (host['hostname'], pattern % host))
+    return _join(output_dir, path)
+
+
+def _profile(host, configs, servers, config_names):
+    """
+    Get the host profile: Generation parameters, with values that do not
+    change the generated configuration normalized.
+
+    Args:
+        host (dict): Host.
+        configs (collections.abc.Mapping): Server software configurations.
+        servers (tuple of str): Servers names.
+        config_names (tuple of str): Configurations names.
+
+    Returns:
+        tuple: Server, configuration, server version, OpenSSL version, HSTS
+            and OCSP stapling. Usable as "ssl_config.generate" arguments.
+    """
+    server = host['server']
+    if server not in servers:
+        raise ValueError('Inventory host %s: unsupported server: %s' % (
+            host['hostname'], server))
+    server_cfg = configs[server]
+    if host['config'] not in config_names:
+        raise ValueError('Inventory host %s: unsupported config: %s' % (
+            host['hostname'], host['config']))
+    return (
+        server, host['config'],
+        host['server_version'] or server_cfg['latestVersion'],
+        host['openssl_version'] or configs['openssl']['latestVersion'],
+        host['hsts'] and server_cfg.get('supportsHsts', True),
+        host['ocsp'] and server_cfg.get('supportsOcspStapling', True))
+
+
+def _write(path, content, request, if_changed):
+    """
+    Write an output file, creating its parent directory if required.
+
+    Args:
+        path (str): Output file path.
+        content (str): Content.
+        request (dict): "ssl_config.generate" keyword arguments.
+        if_changed (bool): Only write the file if its content changed.
+
+    Returns:
+        bool: True if the file was written.
+    """
+    from ssl_config._output import update, write
+
+    for retry in (True, False):
+        try:
+            if if_changed:
+                return update(path, content, request)
+            write(path, content)
+            return True
+        except FileNotFoundError:
+            if not retry:
+                raise
+            _makedirs(_dirname(path), exist_ok=True)
+
+
+def render_inventory(inventory, output_dir='.', inventory_format=None,
+                     pattern=PATTERN, date=None, if_changed=False):
+    """
+    Generate configurations of all hosts of an inventory and write them to
+    files.
+
+    Hosts with the same profile share the same generated configuration: The
+    configuration is generated once and written to the file of each host. The
+    inventory is streamed, memory usage does not depend on its size.
+
+    Args:
+        inventory (str or file-like object): Inventory file path or text file
+            object. See "ssl_config._inventory.read".
+        output_dir (str): Output directory.
+        inventory_format (str): Inventory format, "csv" or "jsonl". Guessed
+            from the inventory file extension if not specified.
+        pattern (str): Output file path pattern, relative to the output
+            directory. Formatted with host fields, like "%(hostname)s".
+            Formatted paths must be in the output directory.
+        date (datetime.date or str): Generation date written in
+            configurations, as date or string in ISO format. Today if not
+            specified.
+        if_changed (bool): Only write files which content would change,
+            ignoring the generation date if "date" is not specified.
+
+    Yields:
+        dict: Result of each host, in inventory order: "hostname", output
+            file "path", "status" ("written", "unchanged" or "unsupported"),
+            "rendered" (True if the configuration was generated for this
+            host, False if shared with a previous host) and "error" message.
+
+    Raises:
+        ValueError: Invalid inventory or pattern, or output file path outside
+            of the output directory.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ssl_config import (
+        CONFIGS, SERVERS, _get_configs, _today, generate,
+        UnsupportedConfiguration)
+    from ssl_config._cache import LRUCache
+
+    check_pattern(pattern)
+
+    request_date = date
+    if date is None:
+        date = _today()
+    elif not isinstance(date, str):
+        date = date.isoformat()
+
+    configs = _get_configs()
+    profiles = LRUCache(maxsize=_MAX_PROFILES)
+
+    with ThreadPoolExecutor() as pool:
+        pending = _deque()
+        for host in read(inventory, inventory_format):
+            profile = _profile(host, configs, SERVERS, CONFIGS)
+            path = _output_path(output_dir, pattern, host)
+
+            output = profiles.get(profile)
+            rendered = output is None
+            if rendered:
+                try:
+                    output = generate(*profile, date=date)
+                except UnsupportedConfiguration as exception:
+                    output = exception
+                profiles.set(profile, output)
+
+            result = dict(hostname=host['hostname'], path=path,
+                          rendered=rendered, error=None)
+            if isinstance(output, UnsupportedConfiguration):
+                result.update(status='unsupported', error=str(output))
+                write = None
+            else:
+                request = dict(zip(
+                    ('server', 'config', 'server_version', 'openssl_version',
+                     'hsts', 'ocsp'), profile), date=request_date)
+                write = pool.submit(_write, path, output, request, if_changed)
+            pending.append((result, write))
+
+            if len(pending) >= _MAX_PENDING:
+                yield _result(*pending.popleft())
+
+        while pending:
+            yield _result(*pending.popleft())
+
+
+def _result(result, write):
+    """
+    Complete a host result once its file is written.
+
+    Args:
+        result (dict): Host result.
+        write (concurrent.futures.Future or None): File write.
+
+    Returns:
+        dict: Host result.
+    """
+    if write is not None:
+        result['status'] = 'written' if write.result() else 'unchanged'
+    return result
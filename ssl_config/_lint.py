@@ -0,0 +1,489 @@
+"""
+Existing server configuration files checking against the guidelines.
+"""
+from collections import deque as _deque
+from mmap import ACCESS_READ as _ACCESS_READ, mmap as _mmap
+from os import cpu_count as _cpu_count, walk as _walk
+from os.path import isdir as _isdir, join as _join
+from re import (
+    IGNORECASE as _IGNORECASE, MULTILINE as _MULTILINE, compile as _compile)
+
+#: TLS directives, by server name: Protocols, ciphers, TLS 1.3 cipher suites
+#: and server preferred order directives names
+DIRECTIVES = dict(
+    nginx=dict(protocols='ssl_protocols', ciphers='ssl_ciphers',
+               order='ssl_prefer_server_ciphers'),
+    apache=dict(protocols='sslprotocol', ciphers='sslciphersuite',
+                order='sslhonorcipherorder'),
+    haproxy=dict(protocols='ssl-default-bind-options',
+                 ciphers='ssl-default-bind-ciphers',
+                 ciphersuites='ssl-default-bind-ciphersuites'))
+
+#: Directives, with their value until ";" for nginx or until the end of line.
+#: Commented directives are not matched
+_DIRECTIVE = _compile(
+    rb'^[ \t]*(ssl_protocols|ssl_ciphers|ssl_prefer_server_ciphers)[ \t]+'
+    rb'([^;]*);'
+    rb'|^[ \t]*(sslprotocol|sslciphersuite|sslhonorcipherorder|'
+    rb'ssl-default-bind-options|ssl-default-bind-ciphers|'
+    rb'ssl-default-bind-ciphersuites)[ \t]+([^#\r\n]*)',
+    _MULTILINE | _IGNORECASE)
+
+#: Server name, by directive name
+_SERVERS = {directive: server for server, directives in DIRECTIVES.items()
+            for directive in directives.values()}
+
+#: Protocols, from oldest to newest
+_PROTOCOLS = ('SSLv2', 'SSLv3', 'TLSv1', 'TLSv1.1', 'TLSv1.2', 'TLSv1.3')
+
+#: Protocols names, by lower case name and server specific alias
+_PROTOCOLS_NAMES = {protocol.lower(): protocol for protocol in _PROTOCOLS}
+_PROTOCOLS_NAMES.update({'tlsv1.0': 'TLSv1', 'sslv3.0': 'SSLv3'})
+
+#: Apache "all" protocols
+_APACHE_ALL = ('SSLv3', 'TLSv1', 'TLSv1.1', 'TLSv1.2', 'TLSv1.3')
+
+#: HAProxy protocols enabled by default, and options disabling them
+_HAPROXY_DEFAULT = ('TLSv1', 'TLSv1.1', 'TLSv1.2', 'TLSv1.3')
+_HAPROXY_NO = {'no-sslv3': 'SSLv3', 'no-tlsv10': 'TLSv1',
+               'no-tlsv11': 'TLSv1.1', 'no-tlsv12': 'TLSv1.2',
+               'no-tlsv13': 'TLSv1.3'}
+
+#: Server preferred order when not configured, by server name
+_DEFAULT_ORDER = dict(nginx=False, apache=False, haproxy=True)
+
+#: Ciphers lists separators
+_SEPARATORS = _compile(r'[:, \t]+')
+
+#: Number of files checked by a single task
+_BATCH_SIZE = 64
+
+
+def check_version(version):
+    """
+    Check a software version.
+
+    Args:
+        version (str): Version.
+
+    Raises:
+        ValueError: Not a version: Versions start with a number.
+    """
+    if not version[:1].isdigit():
+        raise ValueError('Invalid version: %s' % version)
+
+
+def rules(config='intermediate', server=None, server_version=None,
+          openssl_version=None):
+    """
+    Get the guidelines rules of a configuration level, for each server
+    software that can be checked.
+
+    Args:
+        config (str): Configuration name.
+        server (str): Server name. All servers if not specified.
+        server_version (str): Server version, latest if not specified.
+            Requires "server", versions are specific to a server software.
+        openssl_version (str): OpenSSL version, latest if not specified.
+
+    Returns:
+        dict: Rules, by server name: "supported" configuration, allowed
+            "protocols", "required" protocols, allowed "ciphers" and
+            "ciphersuites", and "server_preferred_order".
+
+    Raises:
+        ValueError: Unsupported server, configuration name or version.
+    """
+    from ssl_config import GUIDELINES, SERVERS, capabilities, _get_index
+
+    if server is not None and (
+            server not in DIRECTIVES or server not in SERVERS):
+        raise ValueError('Unsupported server: %s' % server)
+    if server_version is not None:
+        if server is None:
+            raise ValueError('"server_version" requires "server"')
+        check_version(server_version)
+    if openssl_version is not None:
+        check_version(openssl_version)
+    try:
+        ssc = GUIDELINES['configurations'][config]
+    except KeyError:
+        raise ValueError('Unsupported config: %s' % config)
+
+    index = _get_index()
+    server_rules = dict()
+    for name in (server,) if server else DIRECTIVES:
+        if name not in SERVERS:
+            continue
+        server_capabilities = capabilities(
+            name, server_version, openssl_version)
+        entry = index[(name, config, server_capabilities['tls13'])]
+        server_rules[name] = dict(
+            supported=config in server_capabilities['configs'],
+            protocols=tuple(ssc['tls_versions']),
+            required=entry['protocols'],
+            ciphers=frozenset(entry['ciphers']),
+            ciphersuites=frozenset(ssc['ciphersuites']),
+            server_preferred_order=ssc['server_preferred_order'])
+    return server_rules
+
+
+def _protocols(server, value):
+    """
+    Get protocols enabled by a protocols directive.
+
+    Args:
+        server (str): Server name.
+        value (str): Directive value.
+
+    Returns:
+        set of str: Enabled protocols.
+    """
+    tokens = value.split()
+    if server == 'nginx':
+        return {_PROTOCOLS_NAMES.get(token.lower(), token) for token in tokens}
+
+    elif server == 'apache':
+        enabled = set()
+        for position, token in enumerate(tokens):
+            operator = token[0] if token[0] in '+-' else ''
+            name = token[len(operator):].lower()
+            protocols = _APACHE_ALL if name == 'all' else (
+                _PROTOCOLS_NAMES.get(name, token[len(operator):]),)
+            if operator == '-':
+                enabled.difference_update(protocols)
+            elif operator or position:
+                enabled.update(protocols)
+            else:
+                enabled = set(protocols)
+        return enabled
+
+    # HAProxy
+    enabled = set(_HAPROXY_DEFAULT)
+    tokens = iter(token.lower() for token in tokens)
+    for token in tokens:
+        if token in _HAPROXY_NO:
+            enabled.discard(_HAPROXY_NO[token])
+        elif token in ('ssl-min-ver', 'ssl-max-ver'):
+            bound = _PROTOCOLS_NAMES.get(next(tokens, ''))
+            if bound is None:
+                continue
+            bound_index = _PROTOCOLS.index(bound)
+            enabled = {
+                protocol for protocol in enabled
+                if (_PROTOCOLS.index(protocol) >= bound_index
+                    if token == 'ssl-min-ver' else
+                    _PROTOCOLS.index(protocol) <= bound_index)}
+    return enabled
+
+
+def _ciphers(value):
+    """
+    Get ciphers enabled by a ciphers directive.
+
+    Exclusions ("!", "-"), reordering ("+") and special ("@") elements are
+    ignored.
+
+    Args:
+        value (str): Directive value.
+
+    Returns:
+        list of str: Ciphers and ciphers keywords.
+    """
+    return [cipher for cipher in _SEPARATORS.split(value.strip('"\''))
+            if cipher and cipher[0] not in '!-+@']
+
+
+def _violation(violations, rule, message, line, directive, value):
+    """
+    Add a violation.
+
+    Args:
+        violations (list of dict): Violations.
+        rule (str): Violated rule name.
+        message (str): Message.
+        line (int or None): Line number.
+        directive (str or None): Directive name.
+        value (str or None): Directive value.
+    """
+    violations.append(dict(rule=rule, message=message, line=line,
+                           directive=directive, value=value))
+
+
+def _check_directive(server, kind, directive, value, line, server_rules,
+                     violations):
+    """
+    Check a directive against rules.
+
+    Args:
+        server (str): Server name.
+        kind (str): Directive kind.
+        directive (str): Directive name.
+        value (str): Directive value.
+        line (int): Line number.
+        server_rules (dict): Server rules.
+        violations (list of dict): Violations.
+    """
+    if kind == 'protocols':
+        enabled = _protocols(server, value)
+        for protocol in sorted(enabled - set(server_rules['protocols'])):
+            _violation(violations, 'protocol-not-allowed',
+                       '%s is not allowed' % protocol, line, directive, value)
+        for protocol in server_rules['required']:
+            if protocol not in enabled:
+                _violation(violations, 'protocol-missing',
+                           '%s is not enabled' % protocol, line, directive,
+                           value)
+        if server == 'haproxy':
+            order = 'prefer-client-ciphers' not in value.lower().split()
+            _check_order(order, server_rules, line, directive, value,
+                         violations)
+
+    elif kind == 'ciphers' or kind == 'ciphersuites':
+        tokens = value.split()
+        if server == 'apache' and len(tokens) > 1 and (
+                tokens[0].lower() == 'tlsv1.3'):
+            kind, value = 'ciphersuites', ' '.join(tokens[1:])
+        elif server == 'apache' and len(tokens) > 1 and (
+                tokens[0].upper() == 'SSL'):
+            value = ' '.join(tokens[1:])
+        for cipher in _ciphers(value):
+            if cipher not in server_rules[kind]:
+                _violation(violations, 'cipher-not-allowed',
+                           '%s is not allowed' % cipher, line, directive,
+                           value)
+
+    else:
+        _check_order(value.strip().lower() == 'on', server_rules, line,
+                     directive, value, violations)
+
+
+def _check_order(order, server_rules, line, directive, value, violations):
+    """
+    Check the server preferred order.
+
+    Args:
+        order (bool): Server preferred order.
+        server_rules (dict): Server rules.
+        line (int or None): Line number.
+        directive (str or None): Directive name.
+        value (str or None): Directive value.
+        violations (list of dict): Violations.
+    """
+    if order != server_rules['server_preferred_order']:
+        _violation(violations, 'server-preferred-order',
+                   'Server preferred order must be %s' % (
+                       'enabled' if server_rules['server_preferred_order']
+                       else 'disabled'), line, directive, value)
+
+
+def lint_file(path, server_rules, server=None):
+    """
+    Check a configuration file.
+
+    The file is memory-mapped and scanned for TLS directives, without being
+    fully loaded in memory.
+
+    Args:
+        path (str): File path.
+        server_rules (dict): Rules, by server name. See "rules".
+        server (str): Server name. Detected from directives if not
+            specified.
+
+    Returns:
+        dict: File "path", detected "server" (None if the file does not
+            contain TLS directives) and "violations". Violations have "rule"
+            name, "message", "line" number, "directive" name and "value".
+            "error" is set if the file can't be read.
+    """
+    result = dict(path=path, server=None, violations=[], error=None)
+    directives = []
+    try:
+        with open(path, 'rb') as file:
+            try:
+                mapped = _mmap(file.fileno(), 0, access=_ACCESS_READ)
+            except ValueError:
+                # Empty file
+                return result
+            with mapped:
+                line = 1
+                position = 0
+                for match in _DIRECTIVE.finditer(mapped):
+                    start = match.start()
+                    line += mapped[position:start].count(b'\n')
+                    position = start
+                    name = (match.group(1) or match.group(3)).decode(
+                        'latin-1').lower()
+                    value = (match.group(2) or match.group(4) or b'').decode(
+                        'utf-8', 'replace').strip()
+                    directives.append((name, value, line))
+    except OSError as exception:
+        result['error'] = str(exception)
+        return result
+
+    if server is None:
+        if not directives:
+            return result
+        server = _SERVERS[directives[0][0]]
+    result['server'] = server
+    directives = [directive for directive in directives
+                  if _SERVERS[directive[0]] == server]
+    if not directives:
+        return result
+
+    violations = result['violations']
+    server_rules = server_rules[server]
+    if not server_rules['supported']:
+        _violation(violations, 'unsupported-config', 'The configuration level '
+                   'is not supported by this server or OpenSSL version',
+                   None, None, None)
+        return result
+
+    kinds = DIRECTIVES[server]
+    names = {name: kind for kind, name in kinds.items()}
+    found = set()
+    for name, value, line in directives:
+        kind = names[name]
+        found.add(kind)
+        if not value:
+            # Not checked against server defaults: The empty value is likely
+            # not what was intended
+            _violation(violations, 'empty-directive',
+                       '"%s" has no value, server defaults apply' % name,
+                       line, name, value)
+            continue
+        _check_directive(server, kind, name, value, line, server_rules,
+                         violations)
+
+    for kind in ('protocols', 'ciphers'):
+        if kind not in found and (kind == 'protocols' or server_rules[kind]):
+            _violation(violations, 'missing-directive',
+                       '"%s" is not configured' % kinds[kind], None,
+                       kinds[kind], None)
+    if 'order' in kinds and 'order' not in found:
+        _check_order(_DEFAULT_ORDER[server], server_rules, None,
+                     kinds['order'], None, violations)
+
+    return result
+
+
+def _lint_files(paths, server_rules, server):
+    """
+    Check configuration files.
+
+    Args:
+        paths (list of str): Files paths.
+        server_rules (dict): Rules, by server name.
+        server (str): Server name.
+
+    Returns:
+        list of dict: Results.
+    """
+    return [lint_file(path, server_rules, server) for path in paths]
+
+
+def _files(paths):
+    """
+    List files, walking directories trees.
+
+    Args:
+        paths (iterable of str): Files or directories paths.
+
+    Yields:
+        str: File path.
+    """
+    for path in paths:
+        if not _isdir(path):
+            yield path
+            continue
+        for root, dirs, names in _walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                yield _join(root, name)
+
+
+def _batches(paths):
+    """
+    Group files in batches.
+
+    Args:
+        paths (iterable of str): Files paths.
+
+    Yields:
+        list of str: Files paths.
+    """
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) >= _BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def lint(paths, server=None, config='intermediate', server_version=None,
+         openssl_version=None, executor='process', max_workers=None):
+    """
+    Check existing server configuration files against the guidelines.
+
+    Protocols, ciphers and server preferred order directives of nginx, Apache
+    and HAProxy configuration files are checked. Files are checked in
+    parallel.
+
+    Directives without value are reported as "empty-directive", without
+    checking the server defaults that then apply. This is the case of the
+    HAProxy "ssl-default-bind-options" directive generated from templates
+    rendering no option.
+
+    Args:
+        paths (iterable of str): Configuration files or directories paths.
+            Directories are walked recursively.
+        server (str): Server name. Detected from directives of each file if
+            not specified.
+        config (str): Configuration name to check against.
+        server_version (str): Server version, latest if not specified.
+            Requires "server".
+        openssl_version (str): OpenSSL version, latest if not specified.
+        executor (str): "process" to use a pool of processes, "thread" to use
+            a pool of threads.
+        max_workers (int): Maximum number of workers. Default to the number
+            of CPU.
+
+    Yields:
+        dict: Result of each file. See "ssl_config._lint.lint_file".
+
+    Raises:
+        ValueError: Unsupported server, configuration, version, executor or
+            number of workers.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    server_rules = rules(config, server, server_version, openssl_version)
+
+    if max_workers is None:
+        max_workers = _cpu_count() or 1
+    elif max_workers < 1:
+        raise ValueError('"max_workers" must be greater than 0')
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers)
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers)
+    else:
+        raise ValueError('Unsupported executor: %s' % executor)
+
+    # Limit pending batches to not list the whole trees
+    window = max_workers * 4
+
+    with pool:
+        pending = _deque()
+        for batch in _batches(_files(paths)):
+            pending.append(pool.submit(
+                _lint_files, batch, server_rules, server))
+            if len(pending) >= window:
+                for result in pending.popleft().result():
+                    yield result
+
+        while pending:
+            for result in pending.popleft().result():
+                yield result
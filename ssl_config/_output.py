@@ -0,0 +1,168 @@
+"""
+Configuration files writing, only when their content changes.
+"""
+from os import (
+    chmod as _chmod, getpid as _getpid, replace as _replace, stat as _stat,
+    unlink as _unlink)
+from re import escape as _escape, fullmatch as _fullmatch
+from stat import S_IMODE as _S_IMODE
+
+from _thread import get_ident as _get_ident
+
+try:
+    from os import chown as _chown
+except ImportError:
+    # Windows, files have no owner
+    _chown = None
+
+#: Generation date placeholder, used to compare files ignoring their date
+_DATE_PLACEHOLDER = '\x00date\x00'
+
+#: Generation date written in configurations
+_DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+
+
+def _read(path):
+    """
+    Read an existing output file.
+
+    Args:
+        path (str): Output file path.
+
+    Returns:
+        str or None: Content, None if the file does not exist.
+    """
+    try:
+        with open(path, 'rt') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def write(path, content):
+    """
+    Write an output file atomically, to never let a partial configuration be
+    loaded by the server.
+
+    The file is replaced by a new file: Permissions and owner of the existing
+    file are applied to the new file before writing the content, to not make
+    readable a configuration that was private. The temporary file name is
+    unique to the process and thread, to allow concurrent writes of the same
+    file: The last write wins.
+
+    Args:
+        path (str): Output file path.
+        content (str): Content.
+    """
+    try:
+        stat = _stat(path)
+    except FileNotFoundError:
+        stat = None
+
+    tmp_path = '%s.%d-%d.tmp' % (path, _getpid(), _get_ident())
+    try:
+        with open(tmp_path, 'wt') as file:
+            if stat is not None:
+                _chmod(tmp_path, _S_IMODE(stat.st_mode))
+                if _chown is not None:
+                    try:
+                        _chown(tmp_path, stat.st_uid, stat.st_gid)
+                    except PermissionError:
+                        # Only privileged users can give files to other
+                        # users, keep at least the group if possible
+                        try:
+                            _chown(tmp_path, -1, stat.st_gid)
+                        except PermissionError:
+                            pass
+            file.write(content)
+        _replace(tmp_path, path)
+    except BaseException:
+        try:
+            _unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def is_unchanged(path, content, request):
+    """
+    Check if an output file already contains a generated configuration.
+
+    If the generation date is not specified, the date written in the file is
+    ignored: Regenerating the same configuration another day does not change
+    it.
+
+    Args:
+        path (str): Output file path.
+        content (str): Generated configuration file content.
+        request (dict): "ssl_config.generate" keyword arguments used to
+            generate the content.
+
+    Returns:
+        bool: True if the file exists with the same content.
+    """
+    existing = _read(path)
+    if existing is None:
+        return False
+    elif existing == content:
+        return True
+    elif request.get('date') is not None:
+        return False
+
+    from ssl_config import generate
+    parts = generate(**dict(request, date=_DATE_PLACEHOLDER)).split(
+        _DATE_PLACEHOLDER)
+    return _fullmatch(
+        _DATE_PATTERN.join(_escape(part) for part in parts),
+        existing) is not None
+
+
+def update(path, content, request):
+    """
+    Write an output file, only if its content changed.
+
+    Args:
+        path (str): Output file path.
+        content (str): Generated configuration file content.
+        request (dict): "ssl_config.generate" keyword arguments used to
+            generate the content.
+
+    Returns:
+        bool: True if the file was written.
+    """
+    if is_unchanged(path, content, request):
+        return False
+    write(path, content)
+    return True
+
+
+def write_if_changed(path, server, config='intermediate', server_version=None,
+                     openssl_version=None, hsts=True, ocsp=True, date=None):
+    """
+    Generate configuration and write it to a file, only if the file content
+    would change.
+
+    This avoids needless server reloads when configurations are regenerated
+    periodically. If the date is not specified, a file only differing by its
+    generation date is not changed.
+
+    Args:
+        path (str): Output file path.
+        server (str): Server name.
+        config (str): Configuration name.
+        server_version (str): Server version, latest if not specified.
+        openssl_version (str): OpenSSL version, latest if not specified.
+        hsts (bool): Enable HTTP Strict Transport Security.
+        ocsp (bool): Enable OCSP stapling.
+        date (datetime.date or str): Generation date written in the
+            configuration, as date or string in ISO format. Today if not
+            specified.
+
+    Returns:
+        bool: True if the file was written.
+    """
+    from ssl_config import generate
+    request = dict(
+        server=server, config=config, server_version=server_version,
+        openssl_version=openssl_version, hsts=hsts, ocsp=ocsp, date=date)
+    return update(path, generate(**request), request)
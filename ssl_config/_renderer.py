@@ -0,0 +1,694 @@
+"""
+Native renderer for the Handlebars subset used by configuration templates.
+
+Templates are compiled to Python closures that render with direct data access,
+without the Pybars runtime. Only templates using supported constructs are
+compiled: Text, comments, escaped and unescaped expressions, helpers calls and
+subexpressions with string, integer, boolean and null literals, and "if",
+"unless" and "each" blocks (Also inverted, with "else"). Paths are resolved
+from the current context only ("this", "@index", "@first", "@last", "@key",
+"@root" and dotted paths, with the ".length" of arrays).
+
+The output is identical to Pybars, including its whitespace control and
+escaping. Other templates must be rendered with Pybars.
+"""
+from re import compile as _compile
+
+#: Pybars whitespace control, removing "~" marks and spaces around standalone
+#: block tags
+_WHITESPACE_CONTROL = _compile(
+    r'~}}\s*|\s*{{~|'
+    r'(?<=\n)([ \t]*{{(#[^{}]+|/[^{}]+|![^{}]+|else|else if [^{}]+)}}'
+    r'[ \t]*)+\r?\n|'
+    r'^([ \t]*{{(#[^{}]+|![^{}]+)}}[ \t]*)+\r?\n|'
+    r'\r?\n([ \t]*{{(/[^{}]+|![^{}]+)}}[ \t]*)+$')
+
+#: Pybars whitespace control marks cleanup
+_WHITESPACE_CLEANUP = _compile(r'(?<={{)~|~(?=}})|(?<=}})[ \t]+(?={{)')
+
+#: Symbol (Helper, block or path segment name)
+_SYMBOL = _compile(r'[A-Za-z0-9_@-]+')
+
+#: Keyword parameter
+_KWPARAM = _compile(r'\[?[A-Za-z_][A-Za-z0-9_]+\]?=')
+
+#: Integer literal
+_INTEGER = _compile(r'-?[0-9]+')
+
+#: "{{else}}" or "{{^}}"
+_ALT = _compile(r'{{\s*(\^|else)\s*}}')
+
+#: "else" or "^", followed by "}}", that is not a symbol
+_ALT_INNER = _compile(r'\s*(\^|else)\s*}}')
+
+#: Whitespaces and line breaks at the beginning of a text
+_TEXT_START = _compile(r'(?:[ \t]+|\r?\n)*')
+
+#: Spaces separating arguments
+_SPACES = _compile(r'[ \t\r\n]+')
+
+#: Keyword literals values
+_KEYWORDS = (('true', True), ('false', False), ('null', None),
+             ('undefined', None))
+
+#: Pybars built-in helpers, not supported in expressions
+_BUILTINS = frozenset((
+    'blockHelperMissing', 'each', 'helperMissing', 'if', 'log', 'lookup',
+    'unless', 'with'))
+
+#: Pybars escaping
+_ESCAPE = str.maketrans({
+    '&': '&amp;', '"': '&quot;', "'": '&#x27;', '`': '&#x60;', '<': '&lt;',
+    '>': '&gt;'})
+
+
+class _Unsupported(Exception):
+    """The template uses an unsupported construct"""
+
+
+class _Scope:
+    """
+    Render context.
+
+    Args:
+        this: Current context value.
+        root: Root context value.
+        index (int): "@index" in "each" blocks.
+        first (bool): "@first" in "each" blocks.
+        last (bool): "@last" in "each" blocks.
+        key: "@key" in "each" blocks.
+    """
+    __slots__ = ('this', 'root', 'index', 'first', 'last', 'key')
+
+    def __init__(self, this, root, index=None, first=None, last=None,
+                 key=None):
+        self.this = this
+        self.root = root
+        self.index = index
+        self.first = first
+        self.last = last
+        self.key = key
+
+
+def _pick(context, name):
+    """
+    Get a value from a context, like Pybars.
+
+    Args:
+        context: Context.
+        name (str): Name.
+
+    Returns:
+        object: Value or None.
+    """
+    try:
+        return context[name]
+    except (KeyError, TypeError, AttributeError):
+        if hasattr(context, name):
+            return getattr(context, name)
+        if hasattr(context, 'get'):
+            return context.get(name)
+        return None
+
+
+def _prepare(value, should_escape):
+    """
+    Convert a value to text, like Pybars.
+
+    Args:
+        value: Value.
+        should_escape (bool): If True, HTML escape the text.
+
+    Returns:
+        str: Text.
+    """
+    if value is None:
+        return ''
+    value_type = type(value)
+    if value_type is not str:
+        if value_type is bool:
+            value = 'true' if value else 'false'
+        else:
+            value = str(value)
+    if should_escape:
+        return value.translate(_ESCAPE)
+    return value
+
+
+def _run(nodes, scope, helpers, out):
+    """
+    Render nodes.
+
+    Args:
+        nodes (tuple of function): Compiled nodes.
+        scope (_Scope): Context.
+        helpers (dict): Helpers.
+        out (list of str): Output, updated in place.
+    """
+    for node in nodes:
+        node(scope, helpers, out)
+
+
+class _Parser:
+    """
+    Template parser, following the Pybars grammar.
+
+    Args:
+        source (str): Template source, after whitespace control.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._pos = 0
+
+    def parse(self):
+        """
+        Parse the template.
+
+        Returns:
+            list of tuple: Nodes.
+        """
+        nodes = self._template()
+        if self._pos != len(self._source):
+            raise _Unsupported()
+        return nodes
+
+    def _startswith(self, prefix):
+        return self._source.startswith(prefix, self._pos)
+
+    def _expect(self, prefix):
+        if not self._startswith(prefix):
+            raise _Unsupported()
+        self._pos += len(prefix)
+
+    def _skip_spaces(self):
+        source = self._source
+        pos = self._pos
+        while pos < len(source) and source[pos].isspace():
+            pos += 1
+        self._pos = pos
+
+    def _is_alt(self):
+        return _ALT.match(self._source, self._pos) is not None
+
+    def _template(self):
+        """
+        Parse text and tags until a closing tag, "else" or the end.
+
+        Returns:
+            list of tuple: Nodes.
+        """
+        source = self._source
+        nodes = []
+        while self._pos < len(source):
+            pos = self._pos
+            if not self._startswith('{{'):
+                end = source.find('{{', pos)
+                if end == -1:
+                    end = len(source)
+                # Like Pybars, converts line breaks at the beginning of text
+                # to line feeds
+                start = _TEXT_START.match(source, pos, end).end()
+                nodes.append(('text', source[pos:start].replace(
+                    '\r\n', '\n') + source[start:end]))
+                self._pos = end
+
+            elif self._startswith('{{/') or self._is_alt():
+                break
+
+            elif self._startswith('{{!'):
+                end = source.find('}}', pos + 3)
+                if end == -1:
+                    raise _Unsupported()
+                self._pos = end + 2
+
+            elif self._startswith('{{#') or self._startswith('{{^'):
+                nodes.append(self._block())
+
+            elif self._startswith('{{{{') or self._startswith('{{>'):
+                raise _Unsupported()
+
+            elif self._startswith('{{{'):
+                self._pos += 3
+                nodes.append(('expand', False) + self._expression())
+                self._expect('}')
+
+            elif self._startswith('{{&'):
+                self._pos += 3
+                nodes.append(('expand', False) + self._expression())
+
+            else:
+                self._pos += 2
+                nodes.append(('expand', True) + self._expression())
+
+        return nodes
+
+    def _symbol(self):
+        """
+        Parse a symbol.
+
+        Returns:
+            str: Symbol.
+        """
+        match = _SYMBOL.match(self._source, self._pos)
+        if match is None or _ALT_INNER.match(self._source, self._pos):
+            raise _Unsupported()
+        self._pos = match.end()
+        if (self._pos < len(self._source) and
+                self._source[self._pos].isalnum()):
+            # Non ASCII symbol
+            raise _Unsupported()
+        return match.group()
+
+    def _path(self):
+        """
+        Parse a path.
+
+        Returns:
+            list of str: Segments, "." and "/" separators as "".
+        """
+        source = self._source
+        if self._startswith('[') or self._startswith('.') or \
+                self._startswith('/') or self._startswith('@../'):
+            raise _Unsupported()
+
+        segments = []
+        while self._pos < len(source):
+            char = source[self._pos]
+            if char in './':
+                if self._startswith('../'):
+                    raise _Unsupported()
+                segments.append('')
+                self._pos += 1
+            elif char == '[':
+                raise _Unsupported()
+            elif _SYMBOL.match(char) or char.isalnum():
+                segment = self._symbol()
+                if segment.startswith('@@'):
+                    raise _Unsupported()
+                segments.append(segment)
+            else:
+                break
+
+        if not segments:
+            raise _Unsupported()
+        return segments
+
+    def _argument(self):
+        """
+        Parse an argument.
+
+        Returns:
+            tuple: Argument node.
+        """
+        source = self._source
+        pos = self._pos
+
+        if _KWPARAM.match(source, pos):
+            raise _Unsupported()
+
+        if source[pos] in '"\'':
+            end = source.find(source[pos], pos + 1)
+            if end == -1:
+                raise _Unsupported()
+            value = source[pos + 1:end]
+            if '\\' in value or '\n' in value or '\r' in value:
+                raise _Unsupported()
+            self._pos = end + 1
+            node = ('literal', value)
+
+        elif source[pos] == '(':
+            self._pos += 1
+            self._skip_spaces()
+            name = self._path()
+            if len(name) != 1 or name[0] in ('this', '') or \
+                    name[0] in _BUILTINS:
+                raise _Unsupported()
+            arguments = self._arguments()
+            self._skip_spaces()
+            self._expect(')')
+            return 'subexpr', name[0], arguments
+
+        else:
+            match = _INTEGER.match(source, pos)
+            if match:
+                node = ('literal', int(match.group()))
+                self._pos = match.end()
+            else:
+                for keyword, value in _KEYWORDS:
+                    if self._startswith(keyword):
+                        node = ('literal', value)
+                        self._pos += len(keyword)
+                        break
+                else:
+                    return ('path', self._path())
+
+        # Literals must be followed by the end of the argument
+        if self._pos < len(source) and source[self._pos] not in ' \t\r\n)}':
+            raise _Unsupported()
+        return node
+
+    def _arguments(self):
+        """
+        Parse arguments.
+
+        Returns:
+            list of tuple: Arguments nodes.
+        """
+        source = self._source
+        arguments = []
+        while True:
+            match = _SPACES.match(source, self._pos)
+            if match is None or match.end() == len(source) or \
+                    source[match.end()] in ')}':
+                return arguments
+            self._pos = match.end()
+            arguments.append(self._argument())
+
+    def _expression(self):
+        """
+        Parse an expression, up to the closing "}}".
+
+        Returns:
+            tuple: Path segments, arguments.
+        """
+        self._skip_spaces()
+        path = self._path()
+        arguments = self._arguments()
+        self._skip_spaces()
+        self._expect('}}')
+        return path, arguments
+
+    def _block(self):
+        """
+        Parse a block.
+
+        Returns:
+            tuple: Block node.
+        """
+        inverted = self._startswith('{{^')
+        self._pos += 3
+        self._skip_spaces()
+        if self._startswith('['):
+            raise _Unsupported()
+        name = self._symbol()
+        arguments = self._arguments()
+        self._skip_spaces()
+        self._expect('}}')
+
+        body = self._template()
+        alt = None
+        match = _ALT.match(self._source, self._pos)
+        if match:
+            self._pos = match.end()
+            alt = self._template()
+        self._expect('{{/%s}}' % name)
+
+        if name not in ('if', 'unless', 'each') or len(arguments) != 1:
+            raise _Unsupported()
+        if inverted:
+            body, alt = alt, body
+        return 'block', name, arguments[0], body, alt
+
+
+def _compile_resolver(segments):
+    """
+    Compile a path resolution.
+
+    Args:
+        segments (list of str): Path segments.
+
+    Returns:
+        function: Function returning the value from a scope.
+    """
+    names = [segment for segment in segments if segment not in ('', 'this')]
+    if not names:
+        if len(segments) != 1:
+            raise _Unsupported()
+        return lambda scope: scope.this
+
+    first, rest = names[0], tuple(names[1:])
+    if first == '@_parent':
+        raise _Unsupported()
+
+    if first == '@root':
+        def get_first(scope):
+            return scope.root
+    elif first in ('@index', '@first', '@last', '@key'):
+        attribute = first[1:]
+
+        def get_first(scope):
+            value = getattr(scope, attribute)
+            if value is None:
+                return _pick(scope.this, first)
+            return value
+    else:
+        def get_first(scope):
+            return _pick(scope.this, first)
+
+    if not rest:
+        return get_first
+
+    def resolve(scope):
+        value = get_first(scope)
+        for segment in rest:
+            if value is None:
+                return None
+            if type(value) in (list, tuple):
+                if segment == 'length':
+                    return len(value)
+                value = value[int(segment)]
+            else:
+                value = _pick(value, segment)
+        return value
+
+    return resolve
+
+
+def _compile_argument(argument):
+    """
+    Compile an argument.
+
+    Args:
+        argument (tuple): Argument node.
+
+    Returns:
+        function: Function returning the argument value from a scope and
+            helpers.
+    """
+    kind = argument[0]
+    if kind == 'literal':
+        value = argument[1]
+        return lambda scope, helpers: value
+
+    elif kind == 'path':
+        resolver = _compile_resolver(argument[1])
+        return lambda scope, helpers: resolver(scope)
+
+    name = argument[1]
+    arguments = tuple(_compile_argument(arg) for arg in argument[2])
+
+    def subexpr(scope, helpers):
+        try:
+            helper = helpers[name]
+        except KeyError:
+            raise ValueError('Could not find property %s' % name)
+        return helper(scope, *(arg(scope, helpers) for arg in arguments))
+
+    return subexpr
+
+
+def _compile_expand(should_escape, segments, arguments):
+    """
+    Compile an expression.
+
+    Args:
+        should_escape (bool): HTML escape the value.
+        segments (list of str): Path segments.
+        arguments (list of tuple): Arguments nodes.
+
+    Returns:
+        function: Node.
+    """
+    arguments = tuple(_compile_argument(argument) for argument in arguments)
+    resolver = _compile_resolver(segments)
+
+    if len(segments) == 1:
+        # Simple names can be helpers
+        name = '' if segments[0] == 'this' else segments[0]
+        if name in _BUILTINS:
+            raise _Unsupported()
+
+        def expand(scope, helpers, out):
+            value = helpers.get(name)
+            if value is None:
+                value = resolver(scope)
+            if callable(value):
+                value = value(
+                    scope, *(arg(scope, helpers) for arg in arguments))
+            elif value is None and arguments:
+                raise ValueError('Could not find property %s' % name)
+            out.append(_prepare(value, should_escape))
+
+    else:
+        def expand(scope, helpers, out):
+            value = resolver(scope)
+            if callable(value):
+                value = value(
+                    scope, *(arg(scope, helpers) for arg in arguments))
+            out.append(_prepare(value, should_escape))
+
+    return expand
+
+
+def _compile_block(name, argument, body, alt):
+    """
+    Compile a block.
+
+    Args:
+        name (str): Block helper name.
+        argument (tuple): Argument node.
+        body (list of tuple or None): Nodes rendered by the helper.
+        alt (list of tuple or None): Nodes rendered by the helper inverse.
+
+    Returns:
+        function: Node.
+    """
+    argument = _compile_argument(argument)
+    body = None if body is None else _compile_nodes(body)
+    alt = None if alt is None else _compile_nodes(alt)
+
+    if name == 'if':
+        def block(scope, helpers, out):
+            value = argument(scope, helpers)
+            if callable(value):
+                value = value(scope)
+            nodes = body if value else alt
+            if nodes:
+                _run(nodes, scope, helpers, out)
+
+    elif name == 'unless':
+        def block(scope, helpers, out):
+            # Like Pybars, "unless" ignores "else"
+            if not argument(scope, helpers) and body:
+                _run(body, scope, helpers, out)
+
+    else:
+        def block(scope, helpers, out):
+            value = argument(scope, helpers)
+            try:
+                last_index = len(value) - 1
+                if last_index < 0:
+                    raise IndexError()
+            except (TypeError, IndexError):
+                if alt:
+                    _run(alt, scope, helpers, out)
+                return
+
+            if not body:
+                return
+
+            has_keys = hasattr(value, 'keys')
+            root = scope.root
+            for index, item in enumerate(value):
+                key = None
+                if has_keys:
+                    key = item
+                    item = value[item]
+                item_out = []
+                try:
+                    _run(body, _Scope(item, root, index, index == 0,
+                                      index == last_index, key),
+                         helpers, item_out)
+                except TypeError:
+                    continue
+                out.extend(item_out)
+
+    return block
+
+
+def _compile_nodes(nodes):
+    """
+    Compile nodes.
+
+    Args:
+        nodes (list of tuple): Nodes.
+
+    Returns:
+        tuple of function: Compiled nodes.
+    """
+    compiled = []
+    text = []
+    for node in nodes:
+        if node[0] == 'text':
+            text.append(node[1])
+            continue
+
+        if text:
+            compiled.append(_compile_text(''.join(text)))
+            text = []
+
+        if node[0] == 'expand':
+            compiled.append(_compile_expand(*node[1:]))
+        else:
+            compiled.append(_compile_block(*node[1:]))
+
+    if text:
+        compiled.append(_compile_text(''.join(text)))
+    return tuple(compiled)
+
+
+def _compile_text(text):
+    """
+    Compile text.
+
+    Args:
+        text (str): Text.
+
+    Returns:
+        function: Node.
+    """
+    def write(scope, helpers, out):
+        out.append(text)
+    return write
+
+
+def whitespace_control(source):
+    """
+    Apply Pybars whitespace control.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        str: Processed source.
+    """
+    return _WHITESPACE_CONTROL.sub(
+        lambda match: _WHITESPACE_CLEANUP.sub('', match.group(0).strip()),
+        source)
+
+
+def compile_template(source):
+    """
+    Compile a template.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        function or None: Template rendering function, with the same signature
+            as Pybars templates: "render(context, helpers=None)". Helpers
+            receive the render scope as first argument. None if the template
+            uses constructs that are not supported.
+    """
+    try:
+        nodes = _compile_nodes(_Parser(whitespace_control(source)).parse())
+    except _Unsupported:
+        return None
+
+    def render(context, helpers=None):
+        out = []
+        _run(nodes, _Scope(context, context), helpers or {}, out)
+        return ''.join(out)
+
+    return render
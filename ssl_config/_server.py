@@ -0,0 +1,270 @@
+"""
+HTTP server generating configurations.
+"""
+from http.server import (
+    BaseHTTPRequestHandler as _BaseHTTPRequestHandler,
+    ThreadingHTTPServer as _ThreadingHTTPServer)
+from json import dumps as _dumps
+from threading import Lock as _Lock
+from time import perf_counter as _perf_counter
+from urllib.parse import parse_qs as _parse_qs, urlsplit as _urlsplit
+
+#: Boolean query parameters values
+_BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+#: Endpoints paths. Requests to other paths are recorded as "other" in metrics
+_ENDPOINTS = ('/config', '/metrics')
+
+
+class _Metrics:
+    """
+    Requests metrics.
+    """
+
+    def __init__(self):
+        self._lock = _Lock()
+        self._endpoints = dict()
+
+    def record(self, endpoint, status, duration):
+        """
+        Record a request.
+
+        Args:
+            endpoint (str): Endpoint path.
+            status (int): Response HTTP status.
+            duration (float): Request handling duration in seconds.
+        """
+        with self._lock:
+            try:
+                metrics = self._endpoints[endpoint]
+            except KeyError:
+                metrics = self._endpoints[endpoint] = dict(
+                    requests=0, statuses=dict(), latency_total=0.0,
+                    latency_max=0.0)
+            metrics['requests'] += 1
+            metrics['statuses'][status] = metrics['statuses'].get(
+                status, 0) + 1
+            metrics['latency_total'] += duration
+            metrics['latency_max'] = max(metrics['latency_max'], duration)
+
+    def snapshot(self):
+        """
+        Get metrics.
+
+        Returns:
+            dict: Requests metrics by endpoint and caches metrics.
+        """
+        from ssl_config import cache_info
+
+        with self._lock:
+            endpoints = {
+                endpoint: dict(
+                    requests=metrics['requests'],
+                    statuses={str(status): count for status, count in
+                              metrics['statuses'].items()},
+                    latency_mean=metrics['latency_total'] /
+                    metrics['requests'],
+                    latency_max=metrics['latency_max'])
+                for endpoint, metrics in self._endpoints.items()}
+
+        caches = cache_info()
+        for info in caches.values():
+            lookups = info['hits'] + info['misses']
+            info['hit_rate'] = info['hits'] / lookups if lookups else None
+
+        return dict(endpoints=endpoints, caches=caches)
+
+
+def _parse_query(query):
+    """
+    Parse "/config" query parameters.
+
+    Args:
+        query (str): Query string.
+
+    Returns:
+        dict: "ssl_config.generate" keyword arguments.
+
+    Raises:
+        ValueError: Invalid parameters.
+    """
+    from datetime import date
+    from ssl_config import CONFIGS, SERVERS, _today
+
+    params = {key: values[-1] for key, values in _parse_qs(query).items()}
+    unknown = set(params) - {'server', 'config', 'server_version',
+                             'openssl_version', 'hsts', 'ocsp', 'date'}
+    if unknown:
+        raise ValueError('Unknown parameters: %s' % ', '.join(sorted(unknown)))
+
+    request = dict(
+        server=params.get('server'),
+        config=params.get('config', 'intermediate'),
+        server_version=params.get('server_version'),
+        openssl_version=params.get('openssl_version'),
+        date=params.get('date') or _today())
+
+    if request['server'] not in SERVERS:
+        raise ValueError('"server" must be one of: %s' % ', '.join(SERVERS))
+    if request['config'] not in CONFIGS:
+        raise ValueError('"config" must be one of: %s' % ', '.join(CONFIGS))
+
+    try:
+        date.fromisoformat(request['date'])
+    except ValueError:
+        raise ValueError('"date" must be in ISO format (YYYY-MM-DD)')
+
+    for key in ('hsts', 'ocsp'):
+        try:
+            request[key] = _BOOLEANS[params.get(key, 'true').lower()]
+        except KeyError:
+            raise ValueError('"%s" must be "true" or "false"' % key)
+
+    return request
+
+
+def _etag_matches(if_none_match, etag):
+    """
+    Check if an entity tag matches an "If-None-Match" header, using the weak
+    comparison.
+
+    Args:
+        if_none_match (str): "If-None-Match" header value.
+        etag (str): Entity tag.
+
+    Returns:
+        bool: True if matching.
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class _Handler(_BaseHTTPRequestHandler):
+    """
+    HTTP requests handler.
+    """
+    # Keep-alive connections
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """
+        Handle GET requests.
+        """
+        start = _perf_counter()
+        url = _urlsplit(self.path)
+        if url.path == '/config':
+            status = self._get_config(url.query)
+        elif url.path == '/metrics':
+            status = self._send(200, _dumps(self.server.metrics.snapshot()),
+                                'application/json')
+        else:
+            status = self._send(404, 'Not found')
+        self.server.metrics.record(
+            url.path if url.path in _ENDPOINTS else 'other', status,
+            _perf_counter() - start)
+
+    def _get_config(self, query):
+        """
+        Generate configuration.
+
+        Args:
+            query (str): Query string.
+
+        Returns:
+            int: HTTP status.
+        """
+        from hashlib import sha256
+        from ssl_config import (
+            _get_fingerprint, generate, UnsupportedConfiguration)
+
+        try:
+            request = _parse_query(query)
+        except ValueError as exception:
+            return self._send(400, str(exception))
+
+        etag = '"%s"' % sha256(repr((
+            _get_fingerprint(),
+            sorted(request.items()))).encode()).hexdigest()
+
+        if _etag_matches(self.headers.get('If-None-Match', ''), etag):
+            return self._send(304, None, etag=etag)
+
+        try:
+            output = generate(**request)
+        except UnsupportedConfiguration as exception:
+            return self._send(422, str(exception))
+        return self._send(200, output, etag=etag)
+
+    def _send(self, status, body, content_type='text/plain', etag=None):
+        """
+        Send response.
+
+        Args:
+            status (int): HTTP status.
+            body (str): Response body.
+            content_type (str): Body content type.
+            etag (str): Entity tag.
+
+        Returns:
+            int: HTTP status.
+        """
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        if body is None:
+            self.end_headers()
+            return status
+
+        content = body.encode()
+        self.send_header('Content-Type', '%s; charset=utf-8' % content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        return status
+
+    def log_message(self, *args):
+        """
+        Log requests, if not quiet.
+        """
+        if not self.server.quiet:
+            _BaseHTTPRequestHandler.log_message(self, *args)
+
+
+def make_server(host='127.0.0.1', port=8000, quiet=False):
+    """
+    Create the HTTP server.
+
+    Data is loaded and templates are compiled before returning.
+
+    Endpoints:
+        GET /config: Generated configuration. Query parameters are
+            "ssl_config.generate" arguments: "server" (Required), "config",
+            "server_version", "openssl_version", "hsts", "ocsp" and "date".
+            Returns an ETag derived from parameters and current data
+            version that can be used with "If-None-Match".
+        GET /metrics: Requests latency and caches hit rates, as JSON.
+            Requests to unknown paths are counted together as "other".
+
+    Args:
+        host (str): Host to listen on.
+        port (int): Port to listen on.
+        quiet (bool): If True, do not log requests.
+
+    Returns:
+        http.server.ThreadingHTTPServer: Server.
+    """
+    from ssl_config import warmup
+
+    warmup(freeze=False)
+    server = _ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.metrics = _Metrics()
+    server.quiet = quiet
+    return server
@@ -0,0 +1,85 @@
+"""
+Per-stage timing statistics.
+
+Stages of the "ssl_config" module are timed by explicit "ssl_config._timing"
+hooks, that only create "Timing" contexts while statistics are enabled.
+"""
+from _thread import allocate_lock as _allocate_lock
+from time import perf_counter as _perf_counter
+
+#: Stages names. Stages durations are inclusive: A stage includes stages it
+#: calls
+STAGES = ('bundle', 'configs', 'index', 'state', 'template', 'compile_native',
+          'load_compiled', 'compile', 'render', 'generate')
+
+#: Calls count and cumulative duration in seconds, by stage name
+_COUNTERS = {stage: [0, 0.0] for stage in STAGES}
+
+#: Lock protecting counters updates
+_LOCK = _allocate_lock()
+
+
+class Timing:
+    """
+    Context timing a stage.
+
+    Args:
+        stage (str): Stage name.
+    """
+    __slots__ = ('_counter', '_start')
+
+    def __init__(self, stage):
+        self._counter = _COUNTERS[stage]
+        self._start = None
+
+    def __enter__(self):
+        self._start = _perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        duration = _perf_counter() - self._start
+        counter = self._counter
+        with _LOCK:
+            counter[0] += 1
+            counter[1] += duration
+        return False
+
+
+def snapshot(reset=False):
+    """
+    Timing statistics snapshot.
+
+    Args:
+        reset (bool): Reset statistics after the snapshot.
+
+    Returns:
+        dict: Statistics by stage name: "calls" count, "total" and "mean"
+            durations in seconds.
+    """
+    with _LOCK:
+        stages = {stage: dict(calls=calls, total=total,
+                              mean=total / calls if calls else 0.0)
+                  for stage, (calls, total) in _COUNTERS.items()}
+        if reset:
+            for counter in _COUNTERS.values():
+                counter[:] = 0, 0.0
+    return stages
+
+
+def format_stats(stats):
+    """
+    Format timing statistics as a table.
+
+    Args:
+        stats (dict): Statistics from "ssl_config.stats".
+
+    Returns:
+        str: Table.
+    """
+    lines = ['%-14s %8s %12s %12s' % ('stage', 'calls', 'total (ms)',
+                                      'mean (ms)')]
+    for stage, values in stats['stages'].items():
+        lines.append('%-14s %8d %12.3f %12.3f' % (
+            stage, values['calls'], values['total'] * 1e3,
+            values['mean'] * 1e3))
+    return '\n'.join(lines)
@@ -1,107 +1,164 @@
 """
 Basic version comparison that try to match semantic versioning as possible.
 """
+from functools import lru_cache as _lru_cache
 from re import compile as _compile
 
+# Semantic version regex
+_RE = _compile(
+    # Handle proper "major.minor.patch",
+    # but also 'major' or 'major.minor' cases
+    r'^(?P<major>0|[1-9]\d*)?'
+    r'(?P<minor>\.(0|[1-9]\d*))?'
+    r'(?P<patch>\.(0|[1-9]\d*))?'
+    # Handle properly formatted prereleases and builds
+    r'(?P<prerelease>-(0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)'
+    r'(\.(0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*)?'
+    r'(?P<build>\+[0-9a-zA-Z-]+(\.[0-9a-zA-Z-]+)*)?'
+    # Keep extra trailling non semantic versionning characters.
+    r'(?P<trail>.*)?$')
+
+# Prerelease and build characters filter
+_FILTER = _compile(r'[^a-zA-Z0-9-.]')
+
+# Prerelease comparison behavior
+_PRE_COMPARE = {
+    # Use an empty value to to ensure stable < prerelease
+    True: (),
+    # Use an ASCII table late character to ensure stable > prerelease
+    False: ('~', )}
+
+
+def _parse_prerelease(value):
+    """
+    Parse prerelease.
+
+    Args:
+        value (str): Prerelease.
+
+    Returns:
+        tuple of str: Prerelease elements.
+    """
+    return tuple(element.lstrip('0') for element in
+                 _FILTER.sub('', value).strip('-.').split('.'))
+
+
+def _parse_build(value):
+    """
+    Parse build information.
+
+    Args:
+        value (str): Build information.
+
+    Returns:
+        tuple of str: Build elements.
+    """
+    return tuple(_FILTER.sub('', value).strip('.').split('.'))
+
+
+@_lru_cache(maxsize=1024)
+def _parse(version):
+    """
+    Parse version.
+
+    Results are cached since the same versions are parsed many times when
+    rendering templates.
+
+    Args:
+        version (str): Version.
+
+    Returns:
+        tuple: major (int), minor (int), patch (int),
+            prerelease (tuple of str or None), build (tuple of str or None).
+    """
+    parts = {key: value for key, value in
+             _RE.match(version).groupdict().items() if value}
+
+    # Get core version number as integers
+    major, minor, patch = (int(parts.get(key, '0').lstrip('.'))
+                           for key in ('major', 'minor', 'patch'))
+
+    # Remove delimiters
+    prerelease, build = (
+        tuple(parts[key][1:].split('.')) if key in parts else None
+        for key in ('prerelease', 'build'))
+
+    # Try to handle trailing characters that does not match semantic version
+    # as prerelease or build information to allow comparison
+    try:
+        trail = parts['trail']
+    except KeyError:
+        pass
+    else:
+        # Get build information if any
+        if build is None:
+            try:
+                trail, trail_build = trail.split('+', 1)
+            except ValueError:
+                pass
+            else:
+                build = _parse_build(trail_build)
+
+        prerelease = _parse_prerelease('.'.join(prerelease or ()) + trail)
+
+    return major, minor, patch, prerelease, build
+
 
 class Version:
     """
     Version.
 
+    Versions are immutable, and can be used as dictionary keys.
+
     Args:
         version (str): Version..
         pre (bool): If True, and no prerelease specified, is always
             lower than any other prerelease when comparing.
     """
-    # Semantic version regex
-    _RE = _compile(
-        # Handle proper "major.minor.patch",
-        # but also 'major' or 'major.minor' cases
-        r'^(?P<major>0|[1-9]\d*)?'
-        r'(?P<minor>\.(0|[1-9]\d*))?'
-        r'(?P<patch>\.(0|[1-9]\d*))?'
-        # Handle properly formatted prereleases and builds
-        r'(?P<prerelease>-(0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)'
-        r'(\.(0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*)?'
-        r'(?P<build>\+[0-9a-zA-Z-]+(\.[0-9a-zA-Z-]+)*)?'
-        # Keep extra trailling non semantic versionning characters.
-        r'(?P<trail>.*)?$')
-
-    # Prerelease and build characters filter
-    _FILTER = _compile(r'[^a-zA-Z0-9-.]')
-
-    # Prerelease comparison behavior
-    _PRE_COMPARE = {
-        # Use an empty value to to ensure stable < prerelease
-        True: (),
-        # Use an ASCII table late character to ensure stable > prerelease
-        False: ('~', )}
+    __slots__ = ('_major', '_minor', '_patch', '_prerelease', '_build',
+                 '_key')
 
     def __init__(self, version, pre=False):
-        self._version = parts = {
-            key: value for key, value in
-            self._RE.match(version).groupdict().items() if value}
-
-        # Set if this version should be before or after prereleases
-        self._pre = pre
+        (self._major, self._minor, self._patch, self._prerelease,
+         self._build) = _parse(version)
 
-        # Get core version number as integers
-        for key in ('major', 'minor', 'patch'):
-            parts[key] = int(parts.get(key, '0').lstrip('.'))
-
-        # Remove delimiters
-        for key in ('prerelease', 'build'):
-            try:
-                parts[key] = tuple(parts[key][1:].split('.'))
-            except KeyError:
-                continue
-
-        # Try to handle trailing characters that does not match semantic version
-        # as prerelease or build information to allow comparison
-        try:
-            prerelease = parts.pop('trail')
-        except KeyError:
-            pass
-        else:
-            # Get build information if any
-            if 'build' not in parts:
-                try:
-                    prerelease, build = prerelease.split('+', 1)
-                except ValueError:
-                    pass
-                else:
-                    self.build = build
-
-            self.prerelease = '.'.join(parts.get('prerelease', ())) + prerelease
+        # Comparable version, with stable versions before or after
+        # prereleases
+        self._key = (self._major, self._minor, self._patch,
+                     self._prerelease or _PRE_COMPARE[pre])
 
     def __lt__(self, other):
-        return self._compare() < other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key < other._key
 
     def __le__(self, other):
-        return self._compare() <= other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key <= other._key
 
     def __eq__(self, other):
-        return self._compare() == other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key == other._key
 
     def __ge__(self, other):
-        return self._compare() >= other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key >= other._key
 
     def __gt__(self, other):
-        return self._compare() > other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key > other._key
 
     def __ne__(self, other):
-        return self._compare() != other._compare()
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key != other._key
 
-    def _compare(self):
-        """
-        Comparable version.
-
-        Returns:
-            tuple: Comparable version.
-        """
-        ver = self._version
-        return (ver['major'], ver['minor'], ver['patch'],
-                ver.get('prerelease', self._PRE_COMPARE[self._pre]))
+    def __hash__(self):
+        return hash(self._key)
 
     @property
     def major(self):
@@ -111,17 +168,7 @@ class Version:
         Returns:
             int: Major version.
         """
-        return self._version['major']
-
-    @major.setter
-    def major(self, value):
-        """
-        Major version
-
-        Args:
-            value (int): New value.
-        """
-        self._version['major'] = int(value)
+        return self._major
 
     @property
     def minor(self):
@@ -131,17 +178,7 @@ class Version:
         Returns:
             int: Minor version.
         """
-        return self._version['minor']
-
-    @minor.setter
-    def minor(self, value):
-        """
-        Minor version
-
-        Args:
-            value (int): New value.
-        """
-        self._version['minor'] = int(value)
+        return self._minor
 
     @property
     def patch(self):
@@ -151,17 +188,7 @@ class Version:
         Returns:
             int: Patch version.
         """
-        return self._version['patch']
-
-    @patch.setter
-    def patch(self, value):
-        """
-        Patch version
-
-        Args:
-            value (int): New value.
-        """
-        self._version['patch'] = int(value)
+        return self._patch
 
     @property
     def prerelease(self):
@@ -171,19 +198,7 @@ class Version:
         Returns:
             str: Prerelease version.
         """
-        return '.'.join(self._version.get('prerelease', ()))
-
-    @prerelease.setter
-    def prerelease(self, value):
-        """
-        Prerelease version
-
-        Args:
-            value (str): New value.
-        """
-        self._version['prerelease'] = tuple(
-            element.lstrip('0')
-            for element in self._FILTER.sub('', value).strip('-.').split('.'))
+        return '.'.join(self._prerelease or ())
 
     @property
     def build(self):
@@ -193,15 +208,4 @@ class Version:
         Returns:
             str: Build version.
         """
-        return '.'.join(self._version.get('build', ()))
-
-    @build.setter
-    def build(self, value):
-        """
-        Build information.
-
-        Args:
-            value (str): New value.
-        """
-        self._version['build'] = tuple(self._FILTER.sub(
-            '', value).strip('.').split('.'))
+        return '.'.join(self._build or ())
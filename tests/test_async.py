@@ -0,0 +1,82 @@
+# coding=utf-8
+"""
+Test asyncio configurations generation
+"""
+import pytest
+
+
+def test_agenerate(monkeypatch):
+    """
+    Test asyncio generation, in flight renders sharing and errors propagation.
+    """
+    from asyncio import ensure_future, gather, run, sleep
+    from threading import Event
+    import ssl_config
+    from ssl_config import (
+        agenerate, agenerate_many, generate, UnsupportedConfiguration)
+    from ssl_config._async import _LOOPS
+
+    date = '2020-01-02'
+    calls = []
+    release = Event()
+
+    def blocking_generate(*args):
+        """Count calls, and wait to be released"""
+        calls.append(args)
+        release.wait(10)
+        if args[0] == 'error':
+            raise RuntimeError('error')
+        return generate(*args)
+
+    async def shared():
+        """Concurrent calls with the same arguments"""
+        tasks = [agenerate('nginx', date=date) for _ in range(5)]
+        tasks.append(agenerate('nginx', 'old', date=date))
+        future = gather(*tasks)
+        await sleep(0.1)
+        release.set()
+        return await future
+
+    async def cancelled():
+        """Cancelling a caller does not cancel other callers"""
+        release.clear()
+        callers = [ensure_future(
+            agenerate('apache', date=date)) for _ in range(2)]
+        await sleep(0.1)
+        callers[0].cancel()
+        release.set()
+        return await callers[1]
+
+    async def errors():
+        """Errors are raised to all callers"""
+        return await gather(*(agenerate('error', date=date) for _ in range(3)),
+                            return_exceptions=True)
+
+    monkeypatch.setattr(ssl_config, 'generate', blocking_generate)
+
+    outputs = run(shared())
+    assert outputs == [generate('nginx', date=date)] * 5 + [
+        generate('nginx', 'old', date=date)]
+    assert len(calls) == 2
+
+    assert run(cancelled()) == generate('apache', date=date)
+    assert len(calls) == 3
+
+    exceptions = run(errors())
+    assert len(calls) == 4
+    assert [str(exception) for exception in exceptions] == ['error'] * 3
+    assert all(isinstance(exception, RuntimeError)
+               for exception in exceptions)
+
+    # In flight renders are forgotten once done
+    assert all(not state['in_flight'] for state in _LOOPS.values())
+    monkeypatch.undo()
+
+    # Unsupported configurations
+    with pytest.raises(UnsupportedConfiguration):
+        run(agenerate('aws', 'modern', date=date))
+    outputs = run(agenerate_many([
+        dict(server='aws', config='modern', date=date),
+        dict(server='nginx', date=date)], max_concurrency=1))
+    assert isinstance(outputs[0], UnsupportedConfiguration)
+    assert outputs[1] == generate('nginx', date=date)
@@ -0,0 +1,104 @@
+# coding=utf-8
+"""
+Test batch configurations generation
+"""
+import pytest
+
+
+def test_generate_many():
+    """
+    Test batch generation.
+    """
+    from ssl_config import generate, generate_many, UnsupportedConfiguration
+
+    requests = [dict(server=server, config=config, date='2020-01-01')
+                for server in ('nginx', 'apache')
+                for config in ('old', 'modern')]
+    requests.append(dict(server='nginx', config='modern',
+                         server_version='1.12.0', date='2020-01-01'))
+    expected = [generate(**request) for request in requests[:-1]]
+
+    for executor in ('process', 'thread'):
+        results = list(generate_many(
+            iter(requests), executor=executor, max_workers=2))
+        assert results[:-1] == expected
+        assert isinstance(results[-1], UnsupportedConfiguration)
+
+    # Requests are consumed as results are yielded, results keep their order
+    consumed = []
+
+    def lazy_requests():
+        """Record consumed requests"""
+        for index in range(50):
+            consumed.append(index)
+            yield requests[index % 4]
+
+    results = generate_many(lazy_requests(), executor='thread', max_workers=2)
+    assert next(results) == expected[0]
+    assert len(consumed) == 8
+    assert list(results) == (expected * 13)[1:50]
+    assert list(generate_many([], executor='thread')) == []
+
+    with pytest.raises(ValueError):
+        list(generate_many(requests, executor='unknown'))
+
+
+def test_batch_command(tmp_path):
+    """
+    Test command line batch generation.
+    """
+    from json import dumps
+    from ssl_config import generate
+    from ssl_config.__main__ import _load_manifest, _run_batch
+
+    manifest = tmp_path / 'manifest.json'
+    entries = [
+        dict(server='nginx', output=str(tmp_path / 'a' / 'b' / 'nginx.conf')),
+        dict(server='apache', config='old', hsts=False,
+             output=str(tmp_path / 'apache.conf')),
+        dict(server='nginx', config='modern', server_version='1.12.0',
+             output=str(tmp_path / 'unsupported.conf'))]
+    manifest.write_text(dumps(entries))
+    assert _load_manifest(str(manifest)) == entries
+
+    defaults = dict(hsts=True, ocsp=True, date='2020-01-01')
+    summary, unsupported, written = _run_batch(entries, defaults)
+    assert (unsupported, written) == (1, 2)
+    assert 'unsupported.conf: unsupported' in summary
+    assert (tmp_path / 'a' / 'b' / 'nginx.conf').read_text() == generate(
+        'nginx', date='2020-01-01')
+    assert (tmp_path / 'apache.conf').read_text() == generate(
+        'apache', 'old', hsts=False, date='2020-01-01')
+    assert not (tmp_path / 'unsupported.conf').exists()
+
+    # Only changed files are written
+    summary, unsupported, written = _run_batch(entries, defaults, True)
+    assert (unsupported, written) == (1, 0)
+    assert 'apache.conf: unchanged' in summary
+
+    for invalid in ({}, [[]], [dict(server='nginx')],
+                    [dict(output='a.conf')],
+                    [dict(server='openssl', output='a.conf')],
+                    [dict(server='nginx', config='x', output='a.conf')],
+                    [dict(server='nginx', output='a.conf', unknown=1)],
+                    [dict(server='nginx', output='a.conf'),
+                     dict(server='apache', output='a.conf')],
+                    [dict(server='nginx', output='a.conf', hsts='false')],
+                    [dict(server='nginx', output='a.conf', ocsp=0)],
+                    [dict(server='nginx', output='a.conf', date='garbage')],
+                    [dict(server='nginx', output='a.conf', date=20200101)],
+                    [dict(server='nginx', output='a.conf',
+                          server_version=1.1)],
+                    [dict(server='nginx', output='a.conf',
+                          openssl_version='latest')]):
+        manifest.write_text(dumps(invalid))
+        with pytest.raises(ValueError):
+            _load_manifest(str(manifest))
+
+    # Invalid entries are reported with their index
+    manifest.write_text(dumps([
+        dict(server='nginx', output='a.conf', server_version=None,
+             date='2020-01-01', hsts=False),
+        dict(server='nginx', output='b.conf', date='2020-02-30')]))
+    with pytest.raises(ValueError, match='Manifest entry 1: invalid "date"'):
+        _load_manifest(str(manifest))
@@ -0,0 +1,37 @@
+# coding=utf-8
+"""
+Test versions breakpoints
+"""
+
+
+def test_analyze():
+    """
+    Test breakpoints extraction from templates.
+    """
+    from ssl_config._breakpoints import (
+        analyze, sort_versions, thresholds, version_class)
+
+    breakpoints = analyze(
+        '{{!-- {{serverVersion}} --}}\n'
+        '# {{output.link}}\n'
+        '{{#if (minver "1.13.0" form.serverVersion)}}a{{/if}}\n'
+        '{{#unless (minpatchver "1.3.7" form.serverVersion)}}b{{/unless}}\n'
+        '{{#if (minver \'1.1.1\' form.opensslVersion)}}c{{/if}}\n')
+    assert breakpoints == dict(
+        server_version={'1.13.0', '1.3.7', '1.3', '1.4'},
+        openssl_version={'1.1.1'})
+
+    versions = sort_versions(breakpoints['server_version'])
+    assert versions == ('1.3', '1.3.7', '1.4', '1.13.0')
+
+    versions_thresholds = thresholds(versions)
+    assert version_class(versions_thresholds, '1.2.9') == 0
+    assert version_class(versions_thresholds, '1.3.7-rc1') == 2
+    assert version_class(versions_thresholds, '1.3.8') == 2
+    assert version_class(versions_thresholds, '1.3.100') == 2
+    assert version_class(versions_thresholds, '1.25.3') == 4
+
+    # Versions used in other ways does not allow equivalence classes
+    assert analyze('{{#if (eq form.serverVersion "1.0")}}a{{/if}}') is None
+    assert analyze('{{minver form.serverVersion "1.0"}}') is None
+    assert analyze('{{replace output.link "a" "b"}}') is None
@@ -0,0 +1,73 @@
+# coding=utf-8
+"""
+Test precompiled data bundle
+"""
+
+
+def test_bundle(tmp_path, monkeypatch):
+    """
+    Test the bundle is only used if matching data files.
+    """
+    import hashlib
+    from os import utime
+    from os.path import join
+    from shutil import copytree
+    import ssl_config
+    from ssl_config import _DATA_DIR, _get_bundle
+    from update_config import BUNDLE, build_bundle
+
+    data_dir = str(tmp_path / 'data')
+    copytree(_DATA_DIR, data_dir)
+    monkeypatch.setattr(ssl_config, '_DATA_DIR', data_dir)
+    monkeypatch.setattr(ssl_config, '_BUNDLE', dict())
+
+    def bundle():
+        """Load the bundle again"""
+        ssl_config._BUNDLE.clear()
+        return _get_bundle()
+
+    assert build_bundle(data_dir) in ('created', 'updated', None)
+    assert build_bundle(data_dir) is None
+    loaded = bundle()
+    assert sorted(loaded['index']['digests']) == [
+        'configs.js', 'guidelines.json', 'templates/apache.hbs',
+        'templates/aws.hbs', 'templates/haproxy.hbs', 'templates/nginx.hbs']
+    assert 'ffdhe' not in loaded
+
+    # Files are not hashed if their signature did not change
+    with monkeypatch.context() as patch:
+        patch.setattr(hashlib, 'sha256', None)
+        assert bundle() is not None
+
+    # Modified, added or removed data files
+    template = tmp_path / 'data' / 'templates' / 'aws.hbs'
+    source = template.read_text()
+    template.write_text(source + '\n')
+    assert bundle() is None
+    template.write_text(source)
+    assert bundle() is not None
+
+    # Same content with another modification time
+    utime(join(data_dir, 'configs.js'), ns=(0, 0))
+    assert bundle() is not None
+
+    (tmp_path / 'data' / 'templates' / 'new.hbs').write_text('')
+    assert bundle() is None
+    (tmp_path / 'data' / 'templates' / 'new.hbs').unlink()
+    assert bundle() is not None
+
+    template.unlink()
+    assert bundle() is None
+    template.write_text(source)
+
+    with open(join(data_dir, 'configs.js'), 'at') as file:
+        file.write('\n')
+    assert bundle() is None
+    assert build_bundle(data_dir) == 'updated'
+    assert bundle() is not None
+
+    # Bundle alone, and no bundle
+    (tmp_path / 'data' / 'templates').rename(tmp_path / 'templates')
+    assert bundle() is not None
+    (tmp_path / 'data' / BUNDLE).unlink()
+    assert bundle() is None
@@ -0,0 +1,98 @@
+# coding=utf-8
+"""
+Test caches
+"""
+
+
+def test_lru_cache():
+    """
+    Test LRU cache.
+    """
+    from ssl_config._cache import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    assert cache.get('a') is None
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    # Least recently used entry is evicted
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.info() == dict(hits=3, misses=1, size=2, maxsize=2)
+
+    cache.invalidate('a')
+    assert 'a' not in cache
+
+    cache.clear()
+    assert cache.info() == dict(hits=0, misses=0, size=0, maxsize=2)
+
+
+def test_warmup():
+    """
+    Test warm up before first use.
+    """
+    import gc
+    import ssl_config
+
+    ssl_config.clear_cache()
+    ssl_config.warmup(freeze=False)
+    assert ssl_config.cache_info()['templates']['size'] == len(
+        ssl_config.SERVERS)
+
+    ssl_config.warmup()
+    try:
+        assert gc.get_freeze_count()
+    finally:
+        gc.unfreeze()
+
+
+def test_clear_cache():
+    """
+    Test all in-memory caches are cleared.
+    """
+    import ssl_config
+    from ssl_config._helpers import _minpatchver, _minver, _sameminorver
+    from ssl_config._versions import _parse
+
+    ssl_config.generate('nginx', date='2020-01-01')
+    functions = (_parse, _minpatchver, _minver, _sameminorver)
+    assert all(function.cache_info().currsize for function in functions)
+
+    ssl_config.clear_cache()
+    assert not any(function.cache_info().currsize for function in functions)
+    assert not any(info['size'] for info in ssl_config.cache_info().values())
+
+
+def test_disk_cache(tmp_path):
+    """
+    Test on-disk cache.
+    """
+    import ssl_config
+    from ssl_config._disk_cache import DiskCache
+
+    cache = DiskCache(str(tmp_path), maxsize=256 * 100)
+    assert cache.get(('a',)) is None
+    cache.set(('a',), 'value')
+    assert DiskCache(str(tmp_path)).get(('a',)) == 'value'
+
+    # Shards are evicted to their part of the maximum size
+    for index in range(2000):
+        cache.set((index,), 'x' * 50)
+    assert cache.info()['size'] <= 256 * 100 + 256 * 50
+
+    cache.clear()
+    assert cache.info() == dict(hits=0, misses=0, size=0, maxsize=25600)
+    assert not list(tmp_path.iterdir())
+
+    ssl_config.enable_disk_cache(str(tmp_path))
+    try:
+        output = ssl_config.generate('nginx', date='2020-01-01')
+        ssl_config.clear_cache()
+        assert ssl_config.generate('nginx', date='2020-01-01') == output
+        assert ssl_config.cache_info()['disk']['hits'] == 1
+        assert ssl_config.cache_info()['templates']['size'] == 0
+    finally:
+        ssl_config.disable_disk_cache()
@@ -0,0 +1,76 @@
+# coding=utf-8
+"""
+Test capabilities classification
+"""
+
+
+def test_capabilities():
+    """
+    Test capabilities classification.
+    """
+    from ssl_config._capabilities import build, classify
+    from ssl_config._index import build as build_index
+
+    guidelines = dict(configurations=dict(
+        modern=dict(tls_versions=['TLSv1.3'], ciphers=dict(openssl=[])),
+        old=dict(tls_versions=['TLSv1', 'TLSv1.3'],
+                 ciphers=dict(openssl=[]))))
+    configs = dict(
+        nginx=dict(name='nginx', tls13='1.13.0', latestVersion='1.17.7'),
+        apache=dict(name='Apache', latestVersion='2.4.41'),
+        openssl=dict(tls13='1.1.1', latestVersion='1.1.1d'))
+    index = build_index(guidelines, configs, '/data')
+    table = build(configs, index, ('modern', 'old'))
+
+    modern, old, old_openssl, latest, apache = classify(table, configs, (
+        ('nginx', '1.13.0', '1.1.1'),
+        ('nginx', '1.12.9', '1.1.1'),
+        ('nginx', '1.13.0', '1.1.0'),
+        ['nginx', None, None],
+        ('apache', '2.4.41', '1.1.1')))
+    assert modern == dict(tls13=True, configs=('modern', 'old'))
+    assert old == old_openssl == apache == dict(tls13=False, configs=('old',))
+    assert latest is modern
+
+
+def test_classify():
+    """
+    Test classification of mixed inventories matches per host capabilities
+    and generation.
+    """
+    from itertools import product
+    from random import Random
+    from ssl_config import (
+        _get_state, capabilities, classify, generate, CONFIGS, SERVERS,
+        UnsupportedConfiguration)
+
+    versions = (None, '0.9.8', '1.0.1', '1.1.0', '1.1.1-pre1', '1.1.1',
+                '1.1.1d', '1.12.9', '1.13.0', '1.17.7', '2.4.35', '2.4.36',
+                '3.0.0')
+    hosts = list(product(SERVERS, versions, versions))
+
+    # Shuffled, with duplicates and lists
+    random = Random(0)
+    inventory = hosts + [list(random.choice(hosts)) for _ in range(500)]
+    random.shuffle(inventory)
+
+    results = classify(inventory)
+    assert len(results) == len(inventory)
+    for host, result in zip(inventory, results):
+        assert result == capabilities(*host), host
+
+    # Same configurations as generation, same TLS 1.3 support as render state
+    for host, result in zip(hosts, classify(iter(hosts))):
+        server, server_version, openssl_version = host
+        configs = []
+        for config in CONFIGS:
+            try:
+                generate(server, config, server_version, openssl_version,
+                         date='2020-01-02')
+            except UnsupportedConfiguration:
+                continue
+            configs.append(config)
+        assert result['configs'] == tuple(configs), host
+        assert result['tls13'] == ('TLSv1.3' in _get_state(
+            server, 'intermediate', server_version,
+            openssl_version)['output']['protocols']), host
@@ -0,0 +1,61 @@
+# coding=utf-8
+"""
+Test ahead of time compiled templates
+"""
+
+
+def test_compiled_templates(tmp_path, monkeypatch):
+    """
+    Test ahead of time compiled templates build and use.
+    """
+    from hashlib import sha256
+    from os.path import join
+    from shutil import copytree
+    from pybars import Compiler
+    import ssl_config
+    from ssl_config import _DATA_DIR, _get_state, _load_compiled, generate
+    from ssl_config._helpers import HELPERS
+    from update_config import COMPILED, build_compiled
+
+    data_dir = str(tmp_path / 'data')
+    copytree(_DATA_DIR, data_dir)
+    monkeypatch.setattr(ssl_config, '_DATA_DIR', data_dir)
+    compiled_dir = tmp_path / 'data' / COMPILED
+
+    # Only changed modules are written, modules of removed templates removed
+    build_compiled(data_dir)
+    (compiled_dir / 'removed.py').write_text('')
+    assert build_compiled(data_dir) == {
+        join(COMPILED, 'removed.py'): 'removed'}
+    assert build_compiled(data_dir) == dict()
+
+    state = _get_state('nginx', date='2020-01-02')
+    with open(join(data_dir, 'templates', 'nginx.hbs'), 'rb') as file:
+        source = file.read()
+    digest = sha256(source).hexdigest()
+
+    template = _load_compiled('nginx', digest)
+    assert template is not None
+    assert template(state, helpers=HELPERS) == Compiler().compile(
+        source.decode())(state, helpers=HELPERS)
+
+    # Modules not matching the template source are not used
+    assert _load_compiled('nginx', sha256(b'').hexdigest()) is None
+    (compiled_dir / 'nginx.py').unlink()
+    assert _load_compiled('nginx', digest) is None
+    assert build_compiled(data_dir) == {join(COMPILED, 'nginx.py'): 'created'}
+
+    # Compiled modules are used if the native renderer is not available
+    def fail(_):
+        """Compilation at runtime is not expected"""
+        raise AssertionError('Template compiled at runtime')
+
+    expected = generate('apache', date='2020-01-02')
+    monkeypatch.setattr(ssl_config, '_compile_native', lambda _: None)
+    monkeypatch.setattr(ssl_config, '_compile', fail)
+    ssl_config.clear_cache()
+    try:
+        assert generate('apache', date='2020-01-02') == expected
+    finally:
+        monkeypatch.undo()
+        ssl_config.clear_cache()
@@ -0,0 +1,85 @@
+# coding=utf-8
+"""
+Test "configs.js" parsing
+"""
+
+#: "configs.js" sample
+CONFIGS_JS = """const noSupportedVersion = '10000.0.0';
+
+module.exports = {
+  aws: {
+    cipherFormat: 'iana',  // comment
+    supportedCiphers: ['TLS_A', 'TLS_B'],
+    tls13: noSupportedVersion,
+  },
+  openssl: {
+    latestVersion: '1.1.1d',
+    tls13: '1.1.1',
+  },
+};
+"""
+
+
+def test_parse_configs():
+    """
+    Test "configs.js" parsing and freezing.
+    """
+    from ssl_config._configs import parse, freeze
+    import pytest
+
+    configs = parse(CONFIGS_JS)
+    assert configs == {
+        'aws': {'cipherFormat': 'iana', 'supportedCiphers': ['TLS_A', 'TLS_B'],
+                'tls13': None},
+        'openssl': {'latestVersion': '1.1.1d', 'tls13': '1.1.1'}}
+
+    frozen = freeze(configs)
+    assert frozen['aws']['supportedCiphers'] == ('TLS_A', 'TLS_B')
+    with pytest.raises(TypeError):
+        frozen['aws']['tls13'] = '1.0.0'
+
+
+def test_configs_reload(tmp_path, monkeypatch):
+    """
+    Test configurations and derived caches are reloaded when "configs.js"
+    changes.
+    """
+    from os import utime
+    from shutil import copytree
+    import ssl_config
+    from ssl_config import _DATA_DIR, clear_cache, generate, SERVER_CONFIGS
+
+    data_dir = tmp_path / 'data'
+    copytree(_DATA_DIR, str(data_dir))
+    (data_dir / 'bundle.json').unlink()
+    monkeypatch.setattr(ssl_config, '_DATA_DIR', str(data_dir))
+    monkeypatch.setattr(ssl_config, '_BUNDLE', dict())
+    configs_js = data_dir / 'configs.js'
+    source = configs_js.read_text()
+    latest = SERVER_CONFIGS['nginx']['latestVersion']
+
+    clear_cache()
+    try:
+        output = generate('nginx', date='2020-01-02')
+        assert latest in output
+        generation = ssl_config._CONFIGS['generation']
+
+        # Modification time changed, but not content
+        utime(str(configs_js), ns=(0, 0))
+        assert generate('nginx', date='2020-01-02') == output
+        assert ssl_config._CONFIGS['generation'] == generation
+
+        # Content changed with the same size, then size changed
+        for index, version in enumerate(('1.99.0', '1.100.0')):
+            configs_js.write_text(source.replace(latest, version))
+            utime(str(configs_js), ns=(index + 1, index + 1))
+            new_output = generate('nginx', date='2020-01-02')
+            assert version in new_output
+            assert latest not in new_output
+            assert SERVER_CONFIGS['nginx']['latestVersion'] == version
+            assert ssl_config._CONFIGS['generation'] == generation + index + 1
+            assert ssl_config.cache_info()['states']['size'] == 1
+    finally:
+        monkeypatch.undo()
+        clear_cache()
+    assert SERVER_CONFIGS['nginx']['latestVersion'] == latest
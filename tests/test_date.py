@@ -0,0 +1,67 @@
+# coding=utf-8
+"""
+Test generation date and render states memoization
+"""
+
+
+def test_date(monkeypatch):
+    """
+    Test generation date parameter.
+    """
+    from datetime import date
+    import ssl_config
+    from ssl_config import generate
+
+    output = generate('nginx', date='2020-01-02')
+    assert '2020-01-02' in output
+    assert generate('nginx', date=date(2020, 1, 2)) == output
+    assert generate('nginx', date='2020-01-03') == output.replace(
+        '2020-01-02', '2020-01-03')
+
+    # Today by default
+    monkeypatch.setattr(ssl_config, '_today', lambda: '2020-01-02')
+    assert generate('nginx') == output
+
+
+def test_states_cache():
+    """
+    Test render states memoization.
+    """
+    from ssl_config import cache_info, clear_cache, generate
+
+    clear_cache()
+    output = generate('apache', 'old', date='2020-01-02')
+    states = cache_info()['states']
+    assert (states['hits'], states['misses'], states['size']) == (0, 1, 1)
+
+    assert generate('apache', 'old', date='2020-01-02') == output
+    assert cache_info()['states']['hits'] == 1
+
+    # All parameters, including the date, are part of the key
+    generate('apache', 'old', date='2020-01-03')
+    generate('apache', 'old', hsts=False, date='2020-01-02')
+    generate('apache', 'old', server_version='2.4.8', date='2020-01-02')
+    assert cache_info()['states']['size'] == 4
+
+    clear_cache()
+    assert cache_info()['states']['size'] == 0
+
+
+def test_date_command():
+    """
+    Test command line generation date.
+    """
+    from subprocess import run, PIPE
+    import sys
+    from ssl_config import generate
+
+    command = [sys.executable, '-m', 'ssl_config', '--server', 'nginx',
+               '--date']
+    result = run(command + ['2020-01-02'], stdout=PIPE,
+                 universal_newlines=True, check=True)
+    assert result.stdout == generate('nginx', date='2020-01-02') + '\n'
+
+    result = run(command + ['2020-13-45'], stderr=PIPE,
+                 universal_newlines=True)
+    assert result.returncode == 2
+    assert 'invalid date' in result.stderr
@@ -0,0 +1,64 @@
+# coding=utf-8
+"""
+Test configurations export
+"""
+import pytest
+
+
+def test_export(tmp_path):
+    """
+    Test configurations export to all formats.
+    """
+    from io import BytesIO
+    from json import loads
+    from tarfile import open as open_tar
+    from zipfile import ZipFile
+    from ssl_config import export, generate, SERVERS
+    from ssl_config._export import guess_format, matrix
+
+    date = '2020-01-02'
+    requests = matrix(date)
+    assert {request['server'] for request in requests} == set(SERVERS)
+
+    index = export(str(tmp_path / 'dir'), date=date, executor='thread')
+    assert len(index['configurations']) + len(index['unsupported']) == len(
+        requests)
+    assert index['date'] == date
+    assert loads((tmp_path / 'dir' / 'index.json').read_text()) == index
+    for entry in index['configurations']:
+        path = tmp_path.joinpath('dir', *entry['path'].split('/'))
+        assert path.read_text() == generate(
+            entry['server'], entry['config'], entry['server_version'],
+            entry['openssl_version'], date=date)
+
+    files = {entry['path']: (tmp_path / 'dir' / entry['path']).read_bytes()
+             for entry in index['configurations']}
+    files['index.json'] = (tmp_path / 'dir' / 'index.json').read_bytes()
+
+    for name in ('export.tar', 'export.tar.gz', 'export.tgz', 'export.zip'):
+        path = str(tmp_path / name)
+        assert export(path, date=date, executor='thread') == index
+        if name.endswith('.zip'):
+            with ZipFile(path) as archive:
+                assert {info.filename: archive.read(info)
+                        for info in archive.infolist()} == files
+                assert archive.infolist()[0].date_time == (
+                    2020, 1, 2, 0, 0, 0)
+        else:
+            with open_tar(path) as archive:
+                assert {info.name: archive.extractfile(info).read()
+                        for info in archive.getmembers()} == files
+                assert archive.getmembers()[0].mtime == 1577923200
+
+    # Streamed archive
+    stream = BytesIO()
+    export(stream, 'tar.gz', date=date, executor='thread')
+    with open_tar(fileobj=BytesIO(stream.getvalue())) as archive:
+        assert archive.extractfile('index.json').read() == files['index.json']
+
+    assert guess_format('a/b') == 'dir'
+    for args in ((str(tmp_path / 'a.tar'), None, '2020-13-45'),
+                 (str(tmp_path / 'a.tar'), 'rar', date),
+                 (BytesIO(), None, date)):
+        with pytest.raises(ValueError):
+            export(*args, executor='thread')
@@ -0,0 +1,20 @@
+# coding=utf-8
+"""
+Test package import
+"""
+
+
+def test_lazy_import():
+    """
+    Test data and dependencies are not loaded on package import.
+    """
+    from subprocess import run, PIPE
+    import sys
+
+    result = run([sys.executable, '-c', (
+        'import sys, ssl_config\n'
+        'print(" ".join(sorted(sys.modules)))')],
+        stdout=PIPE, universal_newlines=True, check=True)
+    modules = result.stdout.split()
+    assert 'pybars' not in modules
+    assert 'json' not in modules
@@ -0,0 +1,47 @@
+# coding=utf-8
+"""
+Test guidelines index
+"""
+
+
+def test_build():
+    """
+    Test guidelines index building.
+    """
+    from ssl_config._index import build
+
+    guidelines = dict(configurations=dict(
+        modern=dict(
+            tls_versions=['TLSv1.3'],
+            ciphers=dict(openssl=[], iana=[])),
+        intermediate=dict(
+            tls_versions=['TLSv1.2', 'TLSv1.3'], dh_param_size=2048,
+            ciphers=dict(
+                openssl=['ECDHE-RSA-AES128-GCM-SHA256',
+                         'DHE-RSA-AES128-GCM-SHA256'],
+                iana=['TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256',
+                      'TLS_DHE_RSA_WITH_AES_128_GCM_SHA256']))))
+    configs = dict(
+        nginx=dict(name='nginx'),
+        aws=dict(name='AWS', cipherFormat='iana', supportedCiphers=(
+            'TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256',)),
+        openssl=dict(tls13='1.1.1'))
+
+    index = build(guidelines, configs, '/data')
+    assert len(index) == 8
+
+    entry = index[('nginx', 'intermediate', True)]
+    assert entry['ciphers'] == (
+        'ECDHE-RSA-AES128-GCM-SHA256', 'DHE-RSA-AES128-GCM-SHA256')
+    assert entry['protocols'] == ('TLSv1.2', 'TLSv1.3')
+    assert entry['uses_dhe']
+    assert entry['dh_command'] == 'cat /data/ffdhe2048.txt'
+    assert index[('nginx', 'intermediate', False)]['protocols'] == ('TLSv1.2',)
+
+    entry = index[('aws', 'intermediate', True)]
+    assert entry['ciphers'] == ('TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256',)
+    assert not entry['uses_dhe']
+
+    entry = index[('nginx', 'modern', False)]
+    assert entry['protocols'] == ()
+    assert entry['dh_command'] == ''
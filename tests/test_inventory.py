@@ -0,0 +1,79 @@
+# coding=utf-8
+"""
+Test inventory configurations generation
+"""
+import pytest
+
+
+def test_render_inventory(tmp_path):
+    """
+    Test inventory configurations generation.
+    """
+    from io import StringIO
+    from ssl_config import generate, render_inventory
+    from ssl_config._inventory import read
+
+    inventory = tmp_path / 'hosts.csv'
+    inventory.write_text(
+        'hostname,server,server_version,config,hsts\n'
+        'a,nginx,1.10.0,,\n'
+        'b,nginx,1.10.0,intermediate,true\n'
+        'c,nginx,1.10.0,modern,\n'
+        'd,apache,,old,0\n')
+
+    results = list(render_inventory(
+        str(inventory), str(tmp_path / 'out'), date='2020-01-01'))
+    assert [result['status'] for result in results] == [
+        'written', 'written', 'unsupported', 'written']
+    assert [result['rendered'] for result in results] == [
+        True, False, True, True]
+    assert (tmp_path / 'out' / 'b.conf').read_text() == generate(
+        'nginx', server_version='1.10.0', date='2020-01-01')
+    assert (tmp_path / 'out' / 'd.conf').read_text() == generate(
+        'apache', 'old', hsts=False, date='2020-01-01')
+
+    results = render_inventory(
+        str(inventory), str(tmp_path / 'out'), date='2020-01-01',
+        if_changed=True)
+    assert next(results)['status'] == 'unchanged'
+
+    hosts = list(read(StringIO(
+        '{"hostname": "a", "server": "nginx", "ocsp": false}\n\n'), 'jsonl'))
+    assert hosts == [dict(
+        hostname='a', server='nginx', server_version=None,
+        openssl_version=None, config='intermediate', hsts=True, ocsp=False)]
+
+    for line in ('{"hostname": "../a", "server": "nginx"}',
+                 '{"hostname": "a"}', '{"hostname": "a", "server": "nginx", '
+                 '"hsts": "maybe"}'):
+        with pytest.raises(ValueError):
+            list(read(StringIO(line), 'jsonl'))
+
+    # Invalid servers and output file path patterns
+    inventory.write_text('hostname,server\na,openssl\n')
+    with pytest.raises(ValueError):
+        list(render_inventory(str(inventory), str(tmp_path / 'out')))
+
+    for pattern in ('%(unknown)s.conf', '%(hostname)d', '%(hostname'):
+        with pytest.raises(ValueError):
+            next(render_inventory(str(inventory), pattern=pattern))
+
+    # Output file paths must be in the output directory
+    output_dir = tmp_path / 'out' / 'escape'
+    for server_version, pattern in (
+            ('../../escaped', '%(hostname)s/%(server_version)s.conf'),
+            ('/tmp/escaped', '%(server_version)s.conf'),
+            ('..', '%(server_version)s')):
+        inventory.write_text('hostname,server,server_version\na,nginx,%s\n' %
+                             server_version)
+        with pytest.raises(ValueError):
+            list(render_inventory(str(inventory), str(output_dir),
+                                  date='2020-01-02', pattern=pattern))
+    assert not (tmp_path / 'escaped.conf').exists()
+    assert not output_dir.exists()
+
+    inventory.write_text('hostname,server,server_version\na,nginx,1.2/../3\n')
+    result, = render_inventory(
+        str(inventory), str(output_dir), date='2020-01-02',
+        pattern='%(server_version)s/%(hostname)s.conf')
+    assert result['path'] == str(output_dir / '3' / 'a.conf')
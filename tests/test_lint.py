@@ -0,0 +1,100 @@
+# coding=utf-8
+"""
+Test server configuration files linting
+"""
+import pytest
+
+
+def test_lint(tmp_path):
+    """
+    Test server configuration files linting.
+    """
+    from ssl_config import lint
+    from ssl_config._lint import rules
+
+    ciphers = 'ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256'
+    sites = tmp_path / 'sites'
+    sites.mkdir()
+    (sites / 'good.conf').write_text(
+        'server {\n'
+        '    # ssl_protocols SSLv3;\n'
+        '    ssl_protocols TLSv1.2 TLSv1.3;\n'
+        '    ssl_ciphers %s;\n'
+        '    ssl_prefer_server_ciphers off;\n'
+        '}\n' % ciphers)
+    (sites / 'bad.conf').write_text(
+        'server {\n'
+        '    ssl_protocols TLSv1 TLSv1.2\n'
+        '                  TLSv1.3;\n'
+        '    ssl_ciphers "%s:DES-CBC3-SHA";\n'
+        '}\n' % ciphers)
+    (sites / 'ssl.conf').write_text(
+        'SSLProtocol all -SSLv3 -TLSv1 -TLSv1.1\n'
+        'SSLCipherSuite %s\n'
+        'SSLHonorCipherOrder on\n' % ciphers)
+    (sites / 'haproxy.cfg').write_text(
+        'global\n'
+        '    ssl-default-bind-ciphers %s\n'
+        '    ssl-default-bind-options prefer-client-ciphers no-sslv3 '
+        'no-tlsv10 no-tlsv11\n' % ciphers)
+    (sites / 'other.txt').write_text('Not a configuration file\n')
+    (sites / 'empty').write_text('')
+
+    results = {result['path']: result for result in lint(
+        [str(sites)], executor='thread')}
+    assert sorted(results) == sorted(
+        str(path) for path in sites.iterdir())
+
+    def violations(name):
+        """Violations rules and lines of a file"""
+        result = results[str(sites / name)]
+        assert result['error'] is None
+        return [(violation['rule'], violation['line'])
+                for violation in result['violations']]
+
+    assert violations('good.conf') == []
+    assert results[str(sites / 'good.conf')]['server'] == 'nginx'
+    assert sorted(violations('bad.conf')) == [
+        ('cipher-not-allowed', 4), ('protocol-not-allowed', 2)]
+    assert violations('ssl.conf') == [('server-preferred-order', 3)]
+    assert violations('haproxy.cfg') == []
+    assert results[str(sites / 'other.txt')]['server'] is None
+    assert violations('other.txt') == violations('empty') == []
+
+    # Forced server and configuration level
+    result, = lint([str(sites / 'good.conf')], server='nginx',
+                   config='modern', executor='thread')
+    assert [violation['message'] for violation in result['violations']] == [
+        'TLSv1.2 is not allowed', 'ECDHE-ECDSA-AES128-GCM-SHA256 is not '
+        'allowed', 'ECDHE-RSA-AES128-GCM-SHA256 is not allowed']
+
+    # Missing files are reported as errors
+    result, = lint([str(tmp_path / 'missing.conf')], server='nginx',
+                   executor='thread')
+    assert result['error']
+
+    # Versions are specific to a server software
+    assert rules(server='nginx', server_version='1.12.0') == dict(
+        nginx=dict(rules(server='nginx')['nginx'], required=('TLSv1.2',)))
+    assert 'TLSv1.3' in rules(openssl_version='1.1.1')['apache']['required']
+
+    # The default process pool gives the same results
+    assert list(lint([str(sites)], max_workers=2)) == list(lint(
+        [str(sites)], executor='thread'))
+
+    # Empty directives are reported once, without checking server defaults
+    (sites / 'haproxy.cfg').write_text(
+        'global\n'
+        '    ssl-default-bind-ciphers %s\n'
+        '    ssl-default-bind-options \n' % ciphers)
+    result, = lint([str(sites / 'haproxy.cfg')], executor='thread')
+    assert [(violation['rule'], violation['line'])
+            for violation in result['violations']] == [('empty-directive', 3)]
+
+    for kwargs in (dict(config='unknown'), dict(server='openssl'),
+                   dict(server_version='1.12.0'),
+                   dict(server='nginx', server_version='banana'),
+                   dict(openssl_version=''), dict(max_workers=0),
+                   dict(executor='unknown')):
+        with pytest.raises(ValueError):
+            list(lint([str(sites)], **kwargs))
@@ -0,0 +1,84 @@
+# coding=utf-8
+"""
+Test output files writing
+"""
+import pytest
+
+
+def test_write(tmp_path):
+    """
+    Test output files writing, keeping permissions of existing files.
+    """
+    import os
+    from os import chmod, stat
+    from stat import S_IMODE
+    from ssl_config._output import write
+
+    path = tmp_path / 'site.conf'
+    write(str(path), 'a')
+    assert path.read_text() == 'a'
+
+    chmod(str(path), 0o600)
+    write(str(path), 'b')
+    assert path.read_text() == 'b'
+    assert S_IMODE(stat(str(path)).st_mode) == 0o600
+    assert [child.name for child in tmp_path.iterdir()] == ['site.conf']
+
+    # Concurrent writes of the same file
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda index: write(str(path), str(index % 2)),
+                          range(200)))
+    assert path.read_text() in ('0', '1')
+    assert [child.name for child in tmp_path.iterdir()] == ['site.conf']
+
+    # Temporary file is removed on failure
+    (tmp_path / 'directory').mkdir()
+    with pytest.raises(OSError):
+        write(str(tmp_path / 'directory'), 'a')
+    assert sorted(child.name for child in tmp_path.iterdir()) == [
+        'directory', 'site.conf']
+
+    # Owner is kept if possible (Only privileged users can change it)
+    if getattr(os, 'geteuid', lambda: None)() == 0:
+        os.chown(str(path), 1, 1)
+        write(str(path), 'c')
+        assert (stat(str(path)).st_uid, stat(str(path)).st_gid) == (1, 1)
+
+
+def test_write_if_changed(tmp_path):
+    """
+    Test output files writing only if their content changed.
+    """
+    from os import chmod, stat
+    from stat import S_IMODE
+    from ssl_config import generate, write_if_changed
+    from ssl_config._output import is_unchanged, update
+
+    path = str(tmp_path / 'site.conf')
+    request = dict(server='nginx', config='intermediate', server_version=None,
+                   openssl_version=None, hsts=True, ocsp=True, date=None)
+    content = generate(**dict(request, date='2020-01-01'))
+
+    assert not is_unchanged(path, content, request)
+    assert update(path, content, request)
+    assert is_unchanged(path, content, request)
+    assert not update(path, content, request)
+    chmod(path, 0o640)
+
+    # Only the generation date differs: Unchanged if date is not specified
+    other_day = generate(**dict(request, date='2021-02-03'))
+    assert other_day != content
+    assert is_unchanged(path, other_day, request)
+    assert not write_if_changed(path, 'nginx')
+    assert not is_unchanged(path, other_day, dict(request, date='2021-02-03'))
+    assert write_if_changed(path, 'nginx', date='2021-02-03')
+    with open(path, 'rt') as file:
+        assert file.read() == other_day
+    assert S_IMODE(stat(path).st_mode) == 0o640
+
+    # Other changes are detected
+    assert not is_unchanged(path, content, dict(request, hsts=False))
+    assert write_if_changed(path, 'nginx', hsts=False)
+    assert not write_if_changed(path, 'nginx', hsts=False)
+    assert write_if_changed(path, 'nginx', config='old')
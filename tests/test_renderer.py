@@ -0,0 +1,107 @@
+# coding=utf-8
+"""
+Test native templates renderer
+"""
+
+#: Template using all supported constructs
+TEMPLATE = '''{{!-- comment --}}
+# {{title}}, {{{title}}}, {{&title}} {{missing}} {{flag}} {{number}}
+{{#if (minver "1.5.9" version)}}
+  new {{version}}
+{{else}}
+  old {{version}}
+{{/if}}
+{{#unless flag}}
+  unless
+{{else}}
+  unless-else
+{{/unless}}
+{{^if flag}}inverted{{else}}not inverted{{/if}}
+list {{join items ", "}} {{items.length}} {{last items}}
+{{#each items}}
+  - {{@index}} {{this}}{{#unless @last}},{{/unless}} {{@first}}
+{{/each}}
+{{#each empty}}never{{else}}empty{{/each}}
+{{#each mapping}}
+  {{@key}}={{this}} {{@root.title}}
+{{/each}}
+{{#if (includes "b" items)}}has b{{/if}} {{#if (eq number 3)}}three{{/if}}
+{{#if (sameminorver "1.5" version)}}same{{/if}} {{~ title ~}}   !
+{{#if nested.value.length}}{{nested.value}}{{/if}} {{replace title "<" "["}}
+'''
+
+#: Templates using constructs that are not supported
+UNSUPPORTED = (
+    '{{> partial}}',
+    '{{#with item}}{{this}}{{/with}}',
+    '{{#each items}}{{../title}}{{/each}}',
+    '{{helper key=value}}',
+    '{{join items "\\n"}}',
+    '{{#if}}a{{/if}}',
+    '{{else}}',
+    '{{#if a}}b{{/unless}}',
+)
+
+
+def test_renderer():
+    """
+    Test native renderer output is identical to Pybars.
+    """
+    from pybars import Compiler
+    from ssl_config._helpers import HELPERS
+    from ssl_config._renderer import compile_template
+
+    context = dict(
+        title='<a & "b">', flag=False, number=3, version='1.5.10',
+        items=['a', 'b', 'c'], empty=[], mapping=dict(x=1, y=True),
+        nested=dict(value='v'))
+
+    template = compile_template(TEMPLATE)
+    assert template is not None
+    for flag in (False, True):
+        context['flag'] = flag
+        assert template(context, helpers=HELPERS) == Compiler().compile(
+            TEMPLATE)(context, helpers=HELPERS)
+
+    for source in UNSUPPORTED:
+        assert compile_template(source) is None
+
+
+def test_bundled_templates():
+    """
+    Test native renderer output is identical to Pybars for all bundled
+    templates, configurations and versions equivalence classes.
+    """
+    from itertools import product
+    from pybars import Compiler
+    from ssl_config import (
+        _get_state, _get_template_source, version_breakpoints, CONFIGS,
+        SERVERS, UnsupportedConfiguration)
+    from ssl_config._export import _previous
+    from ssl_config._helpers import HELPERS
+    from ssl_config._renderer import compile_template
+
+    for server in SERVERS:
+        source = _get_template_source(server)
+        template = compile_template(source)
+        assert template is not None, server
+        reference = Compiler().compile(source)
+
+        # Latest, breakpoints, versions just below them and old versions
+        versions = dict(server_version={None, '1.0'},
+                        openssl_version={None, '0.9.8', '1.0.1'})
+        for name, breakpoints in (version_breakpoints(server) or {}).items():
+            for breakpoint in breakpoints:
+                versions[name].update((breakpoint, _previous(breakpoint)))
+
+        for config, server_version, openssl_version, hsts, ocsp in product(
+                CONFIGS, versions['server_version'],
+                versions['openssl_version'], (True, False), (True, False)):
+            try:
+                state = _get_state(server, config, server_version,
+                                   openssl_version, hsts, ocsp, '2020-01-02')
+            except UnsupportedConfiguration:
+                continue
+            assert template(state, helpers=HELPERS) == reference(
+                state, helpers=HELPERS), (
+                    server, config, server_version, openssl_version)
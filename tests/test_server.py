@@ -0,0 +1,76 @@
+# coding=utf-8
+"""
+Test HTTP server
+"""
+
+
+def test_server(monkeypatch):
+    """
+    Test HTTP server endpoints and ETag handling.
+    """
+    from http.client import HTTPConnection
+    from json import loads
+    from threading import Thread
+    import ssl_config
+    from ssl_config import generate
+    from ssl_config._server import make_server
+
+    server = make_server(port=0, quiet=True)
+    Thread(target=server.serve_forever, daemon=True).start()
+    connection = HTTPConnection(*server.server_address[:2])
+
+    def get(path, etag=None):
+        """Status, ETag and body of a response"""
+        connection.request('GET', path, headers=dict(
+            {'If-None-Match': etag} if etag else {}))
+        response = connection.getresponse()
+        return (response.status, response.getheader('ETag'),
+                response.read().decode())
+
+    try:
+        path = '/config?server=nginx&date=2020-01-02&hsts=false'
+        status, etag, body = get(path)
+        assert status == 200
+        assert etag
+        assert body == generate('nginx', hsts=False, date='2020-01-02')
+
+        # Same ETag for the same parameters, and not modified responses
+        assert get(path)[1] == etag
+        assert get(path, etag) == (304, etag, '')
+        assert get(path, '"other", W/%s' % etag)[0] == 304
+        assert get(path, '*')[0] == 304
+        assert get(path, etag[:-2] + '"')[0] == 200
+        assert get(path, etag + 'x')[0] == 200
+        assert get(path + '&config=old')[1] != etag
+        assert get(path + '&config=old', etag)[0] == 200
+
+        # The ETag changes with data
+        monkeypatch.setattr(ssl_config, '_get_fingerprint', lambda: 'new')
+        status, new_etag, _ = get(path, etag)
+        assert status == 200
+        assert new_etag != etag
+        assert get(path, new_etag)[0] == 304
+        monkeypatch.undo()
+        assert get(path, etag)[0] == 304
+
+        # Errors
+        assert get('/config?server=openssl')[0] == 400
+        assert get('/config?server=nginx&unknown=1')[0] == 400
+        assert get('/config?server=nginx&hsts=maybe')[0] == 400
+        assert get('/config?server=nginx&date=garbage')[0] == 400
+        assert get('/config?server=nginx&date=2020-13-45')[0] == 400
+        assert get('/config?server=aws&config=modern')[0] == 422
+        assert get('/unknown')[0] == 404
+        assert get('/other/path?a=1')[0] == 404
+
+        status, _, body = get('/metrics')
+        assert status == 200
+        endpoints = loads(body)['endpoints']
+        assert endpoints['/config']['statuses'] == {
+            '200': 7, '304': 5, '400': 5, '422': 1}
+        assert sorted(endpoints) == ['/config', 'other']
+        assert endpoints['other']['statuses'] == {'404': 2}
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
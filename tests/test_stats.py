@@ -0,0 +1,43 @@
+# coding=utf-8
+"""
+Test timing statistics
+"""
+
+
+def test_stats():
+    """
+    Test timing statistics collection.
+    """
+    import ssl_config
+    from ssl_config import generate
+    from ssl_config._stats import STAGES, format_stats
+
+    ssl_config.stats(reset=True)
+    assert ssl_config.stats()['enabled'] is False
+
+    ssl_config.enable_stats()
+    try:
+        ssl_config.clear_cache()
+        # References taken before enabling statistics are timed
+        generate('nginx', date='2020-01-01')
+        generate('nginx', date='2020-01-01')
+        snapshot = ssl_config.stats(reset=True)
+    finally:
+        ssl_config.disable_stats()
+
+    assert snapshot['enabled'] is True
+    assert tuple(snapshot['stages']) == STAGES
+    stages = snapshot['stages']
+    assert stages['generate']['calls'] == 2
+    assert stages['state']['calls'] == 1
+    assert stages['index']['calls'] == 1
+    assert stages['render']['calls'] == 1
+    assert 0 < stages['render']['total'] <= stages['generate']['total']
+    assert stages['generate']['mean'] == stages['generate']['total'] / 2
+    assert format_stats(snapshot).splitlines()[-1].startswith('generate')
+
+    # Statistics were reset, and are not collected while disabled
+    generate('apache', date='2020-01-01')
+    snapshot = ssl_config.stats()
+    assert snapshot['enabled'] is False
+    assert all(stage['calls'] == 0 for stage in snapshot['stages'].values())
@@ -0,0 +1,77 @@
+# coding=utf-8
+"""
+Test thread safety
+"""
+import pytest
+
+
+@pytest.mark.parametrize('bundle', (True, False), ids=('bundle', 'files'))
+def test_generate_clear_cache(bundle, monkeypatch):
+    """
+    Test concurrent generations while caches are cleared.
+
+    Args:
+        bundle (bool): If False, use data files instead of the bundle.
+    """
+    from random import Random
+    import sys
+    from threading import Event, Thread
+    import ssl_config
+    from ssl_config import clear_cache, generate, UnsupportedConfiguration
+
+    if not bundle:
+        monkeypatch.setattr(ssl_config, '_BUNDLE', dict(value=None))
+
+    def run(key):
+        """Generated configuration, or None if unsupported"""
+        try:
+            return generate(*key, date='2020-01-02')
+        except UnsupportedConfiguration:
+            return None
+
+    keys = [(server, config, server_version, openssl_version)
+            for server in ssl_config.SERVERS for config in ssl_config.CONFIGS
+            for server_version in (None, '1.2.0', '1.13.0', '2.4.36')
+            for openssl_version in (None, '1.0.1')]
+    expected = {key: run(key) for key in keys}
+
+    errors = []
+    clears = []
+    stop = Event()
+
+    def generator(seed):
+        """Generate random configurations and check them"""
+        random = Random(seed)
+        for _ in range(300):
+            key = random.choice(keys)
+            try:
+                if run(key) != expected[key]:
+                    errors.append(key)
+            except Exception as exception:  # pragma: no cover
+                errors.append(exception)
+
+    def clearer():
+        """Clear caches continuously"""
+        while not stop.is_set():
+            clear_cache()
+            clears.append(None)
+
+    # Switch threads often, to interleave generations and cache clearing
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    threads = [Thread(target=generator, args=(seed,)) for seed in range(8)]
+    clearing = Thread(target=clearer)
+    try:
+        clearing.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+        clearing.join()
+        sys.setswitchinterval(interval)
+        clear_cache()
+
+    assert errors == []
+    assert len(clears) > 1
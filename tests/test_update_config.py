@@ -0,0 +1,120 @@
+# coding=utf-8
+"""
+Test data synchronization from the Mozilla repository
+"""
+
+
+def test_update(tmp_path, monkeypatch):
+    """
+    Test incremental synchronization.
+    """
+    from os import utime
+    from os.path import join
+    from shutil import copyfile
+    from subprocess import run
+    from ssl_config import _DATA_DIR
+    import update_config
+    from update_config import BUNDLE, COMPILED, update
+
+    # Upstream Git repository
+    src_dir = tmp_path / 'src'
+    for directory in ('static/guidelines', 'js', 'templates/partials'):
+        (src_dir / directory).mkdir(parents=True)
+    sources = {
+        'guidelines.json': 'static/guidelines/5.3.json',
+        'configs.js': 'js/configs.js',
+        'ffdhe2048.txt': 'static/ffdhe2048.txt',
+        'ffdhe4096.txt': 'static/ffdhe4096.txt'}
+    for server in ('apache', 'nginx'):
+        sources['templates/%s.hbs' % server] = (
+            'templates/partials/%s.hbs' % server)
+    for name, source in sources.items():
+        copyfile(join(_DATA_DIR, name), str(src_dir / source))
+    (src_dir / 'static/guidelines/latest.json').write_text('{}')
+    (src_dir / 'templates/partials/header.hbs').write_text('')
+
+    def git(*args):
+        """Run a Git command in the upstream repository"""
+        run(('git', '-c', 'user.name=test', '-c', 'user.email=test@test') +
+            args, cwd=str(src_dir), check=True, capture_output=True)
+
+    git('init')
+    git('add', '.')
+    git('commit', '-m', 'initial')
+
+    # Count hashed files and builds
+    hashed = []
+    builds = []
+    file_digest = update_config._file_digest
+    build_bundle = update_config.build_bundle
+    monkeypatch.setattr(update_config, '_file_digest', lambda path: (
+        hashed.append(path), file_digest(path))[1])
+    monkeypatch.setattr(update_config, 'build_bundle', lambda path: (
+        builds.append(path), build_bundle(path))[1])
+
+    dst_dir = tmp_path / 'data'
+
+    def sync():
+        """Synchronize, return changes"""
+        del hashed[:], builds[:]
+        return update(str(src_dir), str(dst_dir), pull=False)
+
+    changed = sync()
+    assert {name: changed[name] for name in sources} == {
+        name: 'created' for name in sources}
+    assert changed[BUNDLE] == 'created'
+    assert changed[join(COMPILED, 'nginx.py')] == 'created'
+    for name in sources:
+        assert (dst_dir / name).read_bytes() == (
+            src_dir / sources[name]).read_bytes()
+
+    # Nothing changed: Nothing hashed nor built
+    assert sync() == dict()
+    assert hashed == builds == []
+
+    # Data files touched without content change: Hashed, not copied nor built
+    utime(str(dst_dir / 'configs.js'), ns=(0, 0))
+    assert sync() == dict()
+    assert hashed == [str(dst_dir / 'configs.js')]
+    assert builds == []
+    assert sync() == dict()
+    assert hashed == []
+
+    # Upstream content change, detected by digest
+    configs_js = src_dir / 'js/configs.js'
+    configs_js.write_text(configs_js.read_text().replace('1.17.4', '1.99.0'))
+    assert sync() == {'configs.js': 'updated', BUNDLE: 'updated'}
+    assert str(configs_js) in hashed
+    assert builds == [str(dst_dir)]
+    assert '1.99.0' in (dst_dir / 'configs.js').read_text()
+
+    # Data file modified: Restored from upstream, without building again
+    # since build inputs are unchanged
+    (dst_dir / 'ffdhe2048.txt').write_bytes(b'changed\n')
+    assert sync() == {'ffdhe2048.txt': 'updated'}
+    assert builds == []
+    assert (dst_dir / 'ffdhe2048.txt').read_bytes() == (
+        src_dir / 'static/ffdhe2048.txt').read_bytes()
+
+    # Untracked upstream files are checked
+    git('add', '.')
+    git('commit', '-m', 'update')
+    git('rm', '--cached', 'templates/partials/apache.hbs')
+    git('commit', '-m', 'untrack')
+    sync()
+    (src_dir / 'templates/partials/apache.hbs').write_text('untracked\n')
+    assert sync() == {'templates/apache.hbs': 'updated', BUNDLE: 'updated',
+                      join(COMPILED, 'apache.py'): 'updated'}
+    assert (dst_dir / 'templates/apache.hbs').read_text() == 'untracked\n'
+
+    # Removed upstream files are removed
+    (src_dir / 'templates/partials/apache.hbs').unlink()
+    changed = sync()
+    assert changed == {
+        'templates/apache.hbs': 'removed', BUNDLE: 'updated',
+        join(COMPILED, 'apache.py'): 'removed'}
+    assert not (dst_dir / 'templates/apache.hbs').exists()
+
+    # Modified generated files are built again
+    (dst_dir / BUNDLE).write_text('{}')
+    assert sync() == {BUNDLE: 'updated'}
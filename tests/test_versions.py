@@ -0,0 +1,32 @@
+# coding=utf-8
+"""
+Test versions comparison
+"""
+import pytest
+
+
+def test_version():
+    """
+    Test version parsing and comparison.
+    """
+    from ssl_config._versions import Version
+
+    assert Version('1.1.1d') > Version('1.1.1c')
+    assert Version('1.1.1d') > Version('1.1.1', pre=True)
+    assert Version('1.1.1') > Version('1.1.1-pre9')
+    assert Version('1.1.1-pre9') >= Version('1.1.1', pre=True)
+    assert Version('1.2') == Version('1.2.0')
+    assert hash(Version('1.2')) == hash(Version('1.2.0'))
+    assert sorted((Version('2.0'), Version('1.10'), Version('1.9'))) == [
+        Version('1.9'), Version('1.10'), Version('2.0')]
+
+    version = Version('1.0.2k-fips+build.1')
+    assert (version.major, version.minor, version.patch) == (1, 0, 2)
+    assert version.prerelease == 'k-fips'
+    assert version.build == 'build.1'
+
+    # Versions are immutable
+    for name in ('major', 'minor', 'patch', 'prerelease', 'build', 'other'):
+        with pytest.raises(AttributeError):
+            setattr(version, name, '1')
+    assert version == Version('1.0.2k-fips')
@@ -1,27 +1,61 @@
 #! /usr/bin/env python3
 """Synchronize configuration from Mozilla git repository"""
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from os import listdir, makedirs, remove, walk
-from os.path import dirname, join, relpath
+from json import dumps, loads
+from os import listdir, makedirs, remove, replace, sep, stat, walk
+from os.path import dirname, join, normpath, relpath, splitext
 from shutil import copyfile
 from subprocess import run
 
+#: Precompiled data bundle file name
+BUNDLE = 'bundle.json'
 
-def update():
+#: Precompiled data bundle format version
+BUNDLE_FORMAT = 1
+
+#: Ahead of time compiled templates directory name
+COMPILED = 'compiled'
+
+#: Synchronization manifest file name
+SYNC_MANIFEST = '.sync.json'
+
+#: Size of chunks read when hashing files
+CHUNK_SIZE = 1 << 16
+
+
+def update(src_dir=None, dst_dir=None, pull=True):
     """
     Update configuration.
 
+    Files are only hashed if their size or modification time changed since the
+    previous synchronization, and upstream files are not checked at all if Git
+    reports them unchanged since the previously synchronized commit.
+
+    Args:
+        src_dir (str): "mozilla/ssl-config-generator" sources directory.
+            Default to the "ssl-config-generator" Git submodule.
+        dst_dir (str): Data directory. Default to the "ssl_config" package
+            data directory.
+        pull (bool): If True, pull the upstream Git repository before
+            synchronizing.
+
     Returns:
         dict: Changed files, status.
     """
     root = dirname(__file__)
-    src_dir = join(root, 'ssl-config-generator/src')
-    dst_dir = join(root, 'ssl_config', '_data')
+    if src_dir is None:
+        src_dir = join(root, 'ssl-config-generator/src')
+    if dst_dir is None:
+        dst_dir = join(root, 'ssl_config', '_data')
     files = dict()
     changed = dict()
 
     # Ensure "mozilla/ssl-config-generator" Git repository is up to date
-    run(['git', 'pull'], check=True, capture_output=True, cwd=src_dir)
+    if pull:
+        run(['git', 'pull'], check=True, capture_output=True, cwd=src_dir)
+    commit = run(['git', 'rev-parse', 'HEAD'], check=True, capture_output=True,
+                 cwd=src_dir).stdout.decode().strip()
 
     # Get latest guidelines
     guidelines = join(src_dir, 'static/guidelines')
@@ -45,30 +79,362 @@ def update():
     # Ensure destination exists
     makedirs(join(dst_dir, 'templates'), exist_ok=True)
 
-    # Load manifest file
-    manifest = dict()
+    sync_path = join(dst_dir, SYNC_MANIFEST)
+    sync = _load_sync_manifest(sync_path)
+
+    # Upstream files not changed since the previous synchronized commit
+    git_changes = _git_changes(src_dir, sync['commit'])
+    if git_changes is None:
+        trusted = ()
+    else:
+        trusted = {dst for dst, src in files.items()
+                   if relpath(src, src_dir) not in git_changes}
+
+    # Data files (Ignoring files generated from synchronized files)
+    data = dict()
     for walk_root, _, walk_files in walk(dst_dir):
         for walk_file in walk_files:
             path = join(walk_root, walk_file)
-            with open(path, 'rb') as file:
-                manifest[relpath(path, dst_dir)] = sha256(
-                    file.read()).hexdigest()
+            rel_path = relpath(path, dst_dir)
+            if not _is_generated(rel_path):
+                data[rel_path] = path
 
-    # Copy new and changed files
-    for dst, src in files.items():
-        with open(src, 'rb') as src_file:
-            src_digest = sha256(src_file.read()).hexdigest()
-        dst_digest = manifest.get(dst)
+    with ThreadPoolExecutor() as pool:
+        sources = _digests(files, sync['sources'], pool, trusted)
+        manifest = _digests(data, sync['files'], pool)
 
-        if dst_digest != src_digest:
-            copyfile(src, join(dst_dir, dst))
-            changed[dst] = 'created' if not dst_digest else 'updated'
+        # Copy new and changed files
+        copies = dict()
+        for dst, src in files.items():
+            dst_entry = manifest.get(dst)
+            if not dst_entry or dst_entry[2] != sources[dst][2]:
+                copies[dst] = pool.submit(copyfile, src, join(dst_dir, dst))
+                changed[dst] = 'created' if not dst_entry else 'updated'
+
+        for dst, copy in copies.items():
+            copy.result()
+            manifest[dst] = _stat_entry(join(dst_dir, dst)) + [
+                sources[dst][2]]
 
     # Remove absent files
     for dst in set(manifest.keys()) - set(files.keys()):
         remove(join(dst_dir, dst))
+        del manifest[dst]
         changed[dst] = 'removed'
 
+    # Build precompiled data bundle and compile templates ahead of time, only
+    # if data files changed since the previous build, or generated files were
+    # modified
+    built = {name: entry[2] for name, entry in manifest.items()}
+    generated = _generated_entries(dst_dir)
+    if (built != sync['built'] or not generated or
+            generated != sync['generated']):
+        status = build_bundle(dst_dir)
+        if status:
+            changed[BUNDLE] = status
+        changed.update(build_compiled(dst_dir))
+        generated = _generated_entries(dst_dir)
+
+    _write_if_changed(sync_path, dumps(dict(
+        commit=commit, sources=sources, files=manifest, built=built,
+        generated=generated),
+        sort_keys=True, indent=1).encode())
+
+    return changed
+
+
+def _is_generated(rel_path):
+    """
+    Check if a data file is generated from synchronized files.
+
+    Args:
+        rel_path (str): File path relative to data directory.
+
+    Returns:
+        bool: True if generated.
+    """
+    return rel_path in (BUNDLE, SYNC_MANIFEST) or rel_path.startswith(
+        COMPILED + sep) or rel_path.endswith('.tmp')
+
+
+def _load_sync_manifest(path):
+    """
+    Load the manifest of the previous synchronization.
+
+    Args:
+        path (str): Manifest path.
+
+    Returns:
+        dict: Synchronized commit, and size, modification time and digest of
+            upstream files ("sources") and data files ("files"), digests of
+            data files used to build generated files ("built"), and size and
+            modification time of generated files ("generated"), by relative
+            path.
+    """
+    sync = dict(commit=None, sources=dict(), files=dict(), built=dict(),
+                generated=dict())
+    try:
+        with open(path, 'rb') as file:
+            sync.update(loads(file.read()))
+    except (FileNotFoundError, ValueError):
+        pass
+    return sync
+
+
+def _git_changes(src_dir, commit):
+    """
+    Get upstream files changed since a commit, including uncommitted changes
+    and untracked files.
+
+    Args:
+        src_dir (str): Upstream sources directory.
+        commit (str): Commit.
+
+    Returns:
+        set of str or None: Changed files paths relative to sources directory.
+            None if unknown.
+    """
+    if not commit:
+        return None
+    paths = set()
+    for command in (('diff', '--name-only', '--relative', commit),
+                    ('ls-files', '--others')):
+        result = run(('git',) + command, capture_output=True, cwd=src_dir)
+        if result.returncode:
+            return None
+        paths.update(
+            normpath(path) for path in result.stdout.decode().splitlines())
+    return paths
+
+
+def _stat_entry(path):
+    """
+    Get file stat data that changes when the file is modified.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        list: Size, modification time in nanoseconds.
+    """
+    file_stat = stat(path)
+    return [file_stat.st_size, file_stat.st_mtime_ns]
+
+
+def _file_digest(path):
+    """
+    Compute a file SHA-256 digest, reading it by chunks.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _digests(paths, known, pool, trusted=()):
+    """
+    Get files digests, only hashing files that changed.
+
+    Args:
+        paths (dict): Files paths, by relative path.
+        known (dict): Previously known size, modification time and digest, by
+            relative path.
+        pool (concurrent.futures.Executor): Executor used to hash files.
+        trusted (container of str): Relative paths of files known to be
+            unchanged, that are not checked if their digest is known.
+
+    Returns:
+        dict: Size, modification time and digest, by relative path.
+    """
+    entries = dict()
+    to_hash = dict()
+    for name, path in paths.items():
+        entry = known.get(name)
+        if entry and name in trusted:
+            entries[name] = entry
+            continue
+
+        stat_entry = _stat_entry(path)
+        if entry and entry[:2] == stat_entry:
+            entries[name] = entry
+        else:
+            to_hash[name] = stat_entry
+
+    for (name, stat_entry), digest in zip(to_hash.items(), pool.map(
+            _file_digest, (paths[name] for name in to_hash))):
+        entries[name] = stat_entry + [digest]
+
+    return entries
+
+
+def _generated_entries(data_dir):
+    """
+    Get size and modification time of generated files.
+
+    Args:
+        data_dir (str): Data directory.
+
+    Returns:
+        dict: Size and modification time, by relative path.
+    """
+    names = [BUNDLE]
+    try:
+        names.extend(join(COMPILED, name) for name in listdir(
+            join(data_dir, COMPILED)) if name.endswith('.py'))
+    except FileNotFoundError:
+        pass
+
+    entries = dict()
+    for name in names:
+        try:
+            entries[name] = _stat_entry(join(data_dir, name))
+        except FileNotFoundError:
+            continue
+    return entries
+
+
+def _write_if_changed(path, content):
+    """
+    Write a generated file, only if its content changed.
+
+    Args:
+        path (str): File path.
+        content (bytes): File content.
+
+    Returns:
+        str or None: "created" or "updated" if the file changed, else None.
+    """
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == content:
+                return None
+    except FileNotFoundError:
+        status = 'created'
+    else:
+        status = 'updated'
+
+    # Write atomically to never let a partial file be loaded
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(content)
+    replace(tmp_path, path)
+    return status
+
+
+def build_bundle(data_dir):
+    """
+    Build the precompiled data bundle.
+
+    The bundle contains all data required at runtime, already parsed and
+    normalized, to allow loading it with a single read: Guidelines, server
+    software configurations and templates sources. DH parameters files are
+    not included: Configurations only reference their paths.
+
+    Digests and signatures (Modification time, size) of source files are
+    stored to allow "ssl_config" to detect a bundle outdated by source files
+    changes, only hashing source files which signature changed.
+
+    Args:
+        data_dir (str): Data directory.
+
+    Returns:
+        str or None: "created" or "updated" if the bundle changed, else None.
+    """
+    from ssl_config._configs import parse
+
+    digests = dict()
+    signatures = dict()
+
+    def read(name):
+        """
+        Read a data file and compute its digest and signature.
+
+        Args:
+            name (str): File path relative to data directory.
+
+        Returns:
+            str: File content.
+        """
+        with open(join(data_dir, name), 'rb') as file:
+            content = file.read()
+            file_stat = stat(file.fileno())
+        digests[name] = sha256(content).hexdigest()
+        signatures[name] = file_stat.st_mtime_ns, file_stat.st_size
+        return content.decode()
+
+    guidelines = loads(read('guidelines.json'))
+    server_configs = parse(read('configs.js'))
+
+    templates = {
+        splitext(name)[0]: read('templates/' + name)
+        for name in sorted(listdir(join(data_dir, 'templates')))}
+
+    content = dumps(dict(
+        format=BUNDLE_FORMAT,
+        index=dict(
+            guidelines_version=guidelines['version'],
+            servers=sorted(templates),
+            configs=sorted(guidelines['configurations']),
+            digests=digests, signatures=signatures),
+        guidelines=guidelines,
+        server_configs=server_configs,
+        templates=templates), sort_keys=True, separators=(',', ':')).encode()
+
+    return _write_if_changed(join(data_dir, BUNDLE), content)
+
+
+def build_compiled(data_dir):
+    """
+    Compile templates ahead of time to Python modules.
+
+    Modules are loaded by "ssl_config" instead of compiling templates at
+    runtime, if their source digest match the template.
+
+    Args:
+        data_dir (str): Data directory.
+
+    Returns:
+        dict: Changed files, status.
+    """
+    from pybars import Compiler
+
+    templates_dir = join(data_dir, 'templates')
+    compiled_dir = join(data_dir, COMPILED)
+    makedirs(compiled_dir, exist_ok=True)
+    changed = dict()
+
+    modules = set()
+    for name in sorted(listdir(templates_dir)):
+        with open(join(templates_dir, name), 'rb') as file:
+            source = file.read()
+
+        module = splitext(name)[0] + '.py'
+        modules.add(module)
+        content = (
+            '# Generated by "update_config.py" from "templates/%s", '
+            'do not edit\n'
+            'SOURCE_DIGEST = %r\n\n%s') % (
+            name, sha256(source).hexdigest(),
+            Compiler().precompile(source.decode()))
+
+        status = _write_if_changed(
+            join(compiled_dir, module), content.encode())
+        if status:
+            changed[join(COMPILED, module)] = status
+
+    # Remove modules of removed templates
+    for module in listdir(compiled_dir):
+        if module.endswith('.py') and module not in modules:
+            remove(join(compiled_dir, module))
+            changed[join(COMPILED, module)] = 'removed'
+
     return changed
 
 